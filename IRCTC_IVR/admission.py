@@ -0,0 +1,166 @@
+"""
+IRCTC Conversational IVR - Admission Control
+Keeps calls in progress responsive when more calls arrive than the server
+can answer (the Tatkal booking window opening, say):
+
+    IVR_MAX_IN_FLIGHT=200 IVR_MAX_LOOP_LAG=0.25 python main.py
+
+Two signals mean overload: the number of requests being handled (in
+flight) and event-loop lag, i.e. how late a timer set every `interval`
+seconds actually fires. Past either threshold:
+
+    POST /voice without a session         → shed: the pre-rendered "high call
+                                            volume, please call back" TwiML
+                with one                  → admitted: a call in progress sent
+                                            back to the menu (invalid input,
+                                            timeouts redirect to /voice)
+    POST /handle-*, /ivr/* with a session → admitted: the call is in progress
+                           without one    → shed, like a new call
+    anything else (/health, /metrics …)   → admitted
+
+Without shedding, every request queues behind every other until responses
+take longer than Twilio's 15 s webhook timeout, and then every caller,
+old and new, hears Twilio's application error.
+"""
+
+import asyncio
+import time
+from typing import Awaitable, Callable, Optional
+
+from fastpath import parse_form_fields, read_body
+
+_CALL_SID = frozenset({b"CallSid"})
+SHED_KINDS = ("new_call", "no_session")
+SHED_REASONS = ("in_flight", "loop_lag")
+
+
+class AdmissionController:
+    """
+    Overload state shared by the admission middlewares of one process.
+    A threshold of 0 disables that signal. Lag is measured by run(), which
+    the app starts with its lifespan; until then only in-flight counts.
+    """
+
+    def __init__(self, max_in_flight: int = 200, max_lag: float = 0.25, interval: float = 0.05):
+        self.max_in_flight = max_in_flight
+        self.max_lag = max_lag
+        self.interval = interval
+        self.in_flight = 0
+        self.lag = 0.0                              # seconds, last measurement
+        self._tick: Optional[float] = None          # monotonic time the monitor last slept
+        self.shed = {(kind, reason): 0 for kind in SHED_KINDS for reason in SHED_REASONS}
+        self.in_progress_admitted = 0               # admitted while overloaded
+
+    async def run(self) -> None:
+        """Measure event-loop lag until cancelled."""
+        try:
+            while True:
+                self._tick = time.monotonic()
+                await asyncio.sleep(self.interval)
+                self.lag = max(0.0, time.monotonic() - self._tick - self.interval)
+        finally:
+            self._tick = None
+
+    def current_lag(self) -> float:
+        """The last measurement, or more if the monitor's timer is overdue now."""
+        if self._tick is None:
+            return 0.0
+        return max(self.lag, time.monotonic() - self._tick - self.interval)
+
+    def overload(self) -> Optional[str]:
+        """Why new calls should be shed right now (a SHED_REASONS entry), or None."""
+        if self.max_in_flight and self.in_flight >= self.max_in_flight:
+            return "in_flight"
+        if self.max_lag and self.current_lag() >= self.max_lag:
+            return "loop_lag"
+        return None
+
+    def stats(self) -> dict:
+        return {
+            "in_flight":            self.in_flight,
+            "lag":                  round(self.current_lag(), 4),
+            "shed":                 sum(self.shed.values()),
+            "in_progress_admitted": self.in_progress_admitted,
+        }
+
+
+class AdmissionMiddleware:
+    """
+    Pure ASGI middleware applying an AdmissionController. `has_session`
+    resolves to whether a CallSid belongs to a call in progress (asked only
+    while overloaded); `busy` returns the encoded TwiML sent to shed
+    requests.
+    """
+
+    def __init__(
+        self,
+        app,
+        controller: AdmissionController,
+        has_session: Callable[[str], Awaitable[bool]],
+        busy: Callable[[], bytes],
+    ):
+        self.app = app
+        self.controller = controller
+        self.has_session = has_session
+        self.busy = busy
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        controller = self.controller
+        kind = _call_kind(scope)
+        reason = controller.overload() if kind is not None else None
+        if reason is not None:
+            body = await read_body(receive)
+            call_sid = parse_form_fields(body, _CALL_SID)["CallSid"]
+            if not call_sid or not await self.has_session(call_sid):
+                await self._shed("new_call" if kind == "new_call" else "no_session", reason, send)
+                return
+            controller.in_progress_admitted += 1
+            receive = _replay(body, receive)
+
+        controller.in_flight += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            controller.in_flight -= 1
+
+    async def _shed(self, kind: str, reason: str, send) -> None:
+        self.controller.shed[(kind, reason)] += 1
+        body = self.busy()
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [(b"content-length", str(len(body)).encode()),
+                        (b"content-type", b"application/xml")],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+
+def _call_kind(scope) -> Optional[str]:
+    """
+    Kind of webhook: "new_call" (/voice: a new call, or one redirected back
+    to the menu), "call" (a call's later webhooks) or None.
+    """
+    if scope["method"] != "POST":
+        return None
+    path = scope["path"]
+    if path == "/voice":
+        return "new_call"
+    if path.startswith("/handle-") or path.startswith("/ivr/"):
+        return "call"
+    return None
+
+
+def _replay(body: bytes, receive):
+    """A receive channel that yields the already-read `body` first."""
+    pending = [{"type": "http.request", "body": body, "more_body": False}]
+
+    async def replay():
+        if pending:
+            return pending.pop()
+        return await receive()
+
+    return replay
@@ -0,0 +1,1296 @@
+"""
+IRCTC Conversational IVR - Micro-benchmarks
+Local, dependency-free timing harness for the hot paths of the backend.
+
+Usage:
+    python bench.py twiml        # compiled templates vs. string builders
+    python bench.py sessions     # ordered session expiry vs. full scans
+    python bench.py memory       # slotted session records vs. dicts
+    python bench.py cluster      # requests/s vs. number of workers
+    python bench.py metrics      # cost of recording one observation
+    python bench.py fastpath     # raw ASGI webhook routing vs. FastAPI
+    python bench.py index        # station queries on a full-size timetable
+    python bench.py store        # memory-mapped store vs. loading dumps into dicts
+    python bench.py feed         # PNR reads while 10k updates/s stream in
+    python bench.py prompts      # TTS characters per response with pre-synthesized prompts
+    python bench.py speech       # normalized, paged schedules: cached vs. uncached
+    python bench.py rendered     # rendered-response cache vs. rendering every result
+    python bench.py nlu          # speech intents: batching, event-loop stalls
+    python bench.py journal      # call journal: webhook overhead, stalled disk, drops
+    python bench.py bookings     # caller's booking offered + prefetched vs. keyed PNR entry
+    python bench.py coldstart    # serverless handler vs. main.py: import to first response
+    python bench.py overload     # call surge with and without admission control
+    python bench.py corrections  # "did you mean" lookups over 1M PNRs; webhooks saved
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import multiprocessing
+import os
+import random
+import re
+import tempfile
+import time
+import timeit
+import tracemalloc
+from typing import Optional
+
+from data_store import _PNR_DB, _TRAIN_DB, RailwayIndex, station_key
+import bulk_loader
+import data_store
+import ivr_logic
+from session_manager import SessionManager, SessionRecord
+
+
+def _per_call_us(stmt, number: int) -> float:
+    """Best-of-5 wall time of `stmt` in microseconds per call."""
+    return min(timeit.repeat(stmt, number=number, repeat=5)) / number * 1e6
+
+
+# ─────────────────────────────────────────────
+# TwiML rendering
+# ─────────────────────────────────────────────
+
+def bench_twiml(number: int) -> None:
+    pnr, pnr_rec = "2154673890", _PNR_DB["2154673890"]
+    num, train_rec = "12216", _TRAIN_DB["12216"]
+    rows = [
+        ("pnr result",   lambda: ivr_logic.build_pnr_result_twiml(pnr, pnr_rec).encode("utf-8"),
+                         lambda: ivr_logic.render_pnr_result(pnr, pnr_rec)),
+        ("train result", lambda: ivr_logic.build_train_result_twiml(num, train_rec).encode("utf-8"),
+                         lambda: ivr_logic.render_train_result(num, train_rec)),
+        ("main menu",    lambda: ivr_logic.build_main_menu_twiml().encode("utf-8"),
+                         lambda: ivr_logic.static_responses.get("main_menu")),
+    ]
+    print(f"{'response':<14}{'builder µs':>12}{'compiled µs':>13}{'speed-up':>10}")
+    for label, builder, compiled in rows:
+        before = _per_call_us(builder, number)
+        after = _per_call_us(compiled, number)
+        print(f"{label:<14}{before:>12.2f}{after:>13.2f}{before / after:>9.1f}x")
+
+
+# ─────────────────────────────────────────────
+# Session expiry
+# ─────────────────────────────────────────────
+
+class _ScanningSessionManager:
+    """The original full-scan expiry, kept as the benchmark baseline."""
+
+    def __init__(self, ttl_seconds: float = 30 * 60):
+        self._ttl = ttl_seconds
+        self._store: dict[str, dict] = {}
+
+    def create_session(self, call_sid: str, caller=None) -> dict:
+        now = time.time()
+        session = {
+            "created_at": now, "updated_at": now, "caller": caller,
+            "flow": None, "last_menu": None, "last_digit": None,
+            "last_pnr": None, "last_train": None, "stops_page": None, "booking_pnr": None,
+            "suggestion": None, "ended": False,
+        }
+        self._store[call_sid] = session
+        self._purge_stale()
+        return session
+
+    def _purge_stale(self) -> None:
+        cutoff = time.time() - self._ttl
+        stale = [sid for sid, s in self._store.items() if s["updated_at"] < cutoff]
+        for sid in stale:
+            del self._store[sid]
+
+    def active_sessions(self) -> int:
+        self._purge_stale()
+        return sum(1 for s in self._store.values() if not s.get("ended"))
+
+
+def _time_creates(manager, count: int) -> float:
+    start = time.perf_counter()
+    for i in range(count):
+        manager.create_session(f"CA{i:032d}", caller="+919800000000")
+    return time.perf_counter() - start
+
+
+def bench_sessions(count: int, scan_max: int) -> None:
+    """
+    Create `count` sessions back to back (the Tatkal-hour shape: many live
+    calls, none expired yet). The scanning baseline is quadratic, so it is
+    only run up to `scan_max` sessions.
+    """
+    sizes = sorted({n for n in (count // 20, count // 10, count // 4, count) if n})
+    print(f"{'sessions':>9}{'scan total s':>14}{'scan µs/op':>12}"
+          f"{'ordered total s':>17}{'ordered µs/op':>15}")
+    for n in sizes:
+        ordered = _time_creates(SessionManager(), n)
+        if n <= scan_max:
+            scan = _time_creates(_ScanningSessionManager(), n)
+            scan_cols = f"{scan:>14.3f}{scan / n * 1e6:>12.2f}"
+        else:
+            scan_cols = f"{'skipped':>14}{'':>12}"
+        print(f"{n:>9}{scan_cols}{ordered:>17.3f}{ordered / n * 1e6:>15.2f}")
+
+    # Expiry cost is proportional to what actually expires.
+    manager = SessionManager(ttl_seconds=0.5)
+    _time_creates(manager, count)
+    time.sleep(0.6)
+    start = time.perf_counter()
+    manager.create_session("CA-trigger")
+    purge = time.perf_counter() - start
+    print(f"expiring {count} sessions in one purge: {purge * 1e3:.1f} ms; "
+          f"active now {manager.active_sessions()}")
+
+
+# ─────────────────────────────────────────────
+# Session memory
+# ─────────────────────────────────────────────
+
+def _dict_session(now: float, i: int) -> dict:
+    return {
+        "created_at": now, "updated_at": now, "caller": f"+9198{i:08d}",
+        "flow": "pnr", "last_menu": "main", "last_digit": "1",
+        "last_pnr": None, "last_train": None, "stops_page": None, "booking_pnr": None,
+        "suggestion": None, "ended": False,
+    }
+
+
+def _slotted_session(now: float, i: int) -> SessionRecord:
+    session = SessionRecord(now, f"+9198{i:08d}")
+    session.update(flow="pnr", last_menu="main", last_digit="1")
+    return session
+
+
+def _traced_bytes(factory, count: int) -> int:
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    now = time.time()
+    store = {f"CA{i:032d}": factory(now + i, i) for i in range(count)}
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del store
+    return after - before
+
+
+def bench_memory(count: int) -> None:
+    """Traced allocation for `count` sessions (keys and caller strings included)."""
+    old = _traced_bytes(_dict_session, count)
+    new = _traced_bytes(_slotted_session, count)
+    print(f"{'layout':<16}{'total MiB':>11}{'bytes/session':>15}")
+    print(f"{'dict':<16}{old / 2**20:>11.1f}{old / count:>15.0f}")
+    print(f"{'SessionRecord':<16}{new / 2**20:>11.1f}{new / count:>15.0f}")
+    print(f"saving: {(1 - new / old) * 100:.0f}%")
+
+
+# ─────────────────────────────────────────────
+# Multi-worker scaling
+# ─────────────────────────────────────────────
+
+_CALL_SCRIPT = [
+    ("/voice",              {"From": "+919800000001"}),
+    ("/handle-menu",        {"Digits": "1"}),
+    ("/handle-pnr",         {"Digits": "2154673890"}),
+    ("/handle-pnr-options", {"Digits": "9"}),
+]
+
+
+async def _drive_calls(port: int, duration: float, concurrency: int, seed: int) -> int:
+    from http_pool import HttpConnectionPool
+
+    pool = HttpConnectionPool("127.0.0.1", port, max_connections=concurrency)
+    headers = {"Content-Type": "application/x-www-form-urlencoded"}
+    deadline = time.monotonic() + duration
+    done = 0
+
+    async def caller(n: int) -> None:
+        nonlocal done
+        call = 0
+        while time.monotonic() < deadline:
+            call_sid = f"CA{seed:04d}{n:04d}{call:08d}"
+            for path, form in _CALL_SCRIPT:
+                body = "&".join(
+                    f"{k}={v}" for k, v in {"CallSid": call_sid, **form}.items()
+                ).encode()
+                status, _, _ = await pool.request("POST", path, body, headers)
+                if status == 200:
+                    done += 1
+            call += 1
+
+    await asyncio.gather(*(caller(n) for n in range(concurrency)))
+    await pool.close()
+    return done
+
+
+def _driver_process(args: tuple) -> int:
+    return asyncio.run(_drive_calls(*args))
+
+
+def bench_cluster(max_workers: int, duration: float, concurrency: int, drivers: int) -> None:
+    """
+    Start the sharded cluster with 1, 2, 4 … workers and measure webhook
+    throughput from `drivers` load processes. Scaling is only meaningful
+    with spare cores for the drivers and routers.
+    """
+    from cluster import start_cluster
+
+    counts = [n for n in (1, 2, 4, 8, 16, 32) if n <= max_workers]
+    print(f"cores: {os.cpu_count()}")
+    print(f"{'workers':>8}{'requests':>10}{'req/s':>10}")
+    ctx = multiprocessing.get_context("spawn")
+    for n in counts:
+        cluster = start_cluster(n, host="127.0.0.1", port=9000, base_port=9100)
+        try:
+            with ctx.Pool(drivers) as pool:
+                jobs = [(9000, duration, concurrency, seed) for seed in range(drivers)]
+                total = sum(pool.map(_driver_process, jobs))
+        finally:
+            cluster.stop()
+        print(f"{n:>8}{total:>10}{total / duration:>10.0f}")
+
+
+# ─────────────────────────────────────────────
+# Instrumentation overhead
+# ─────────────────────────────────────────────
+
+def bench_metrics(number: int) -> None:
+    """Per-call cost of each recording primitive used on the webhook path."""
+    from metrics import Metrics
+
+    registry = Metrics()
+
+    def timed_block():
+        with registry.timed("render"):
+            pass
+
+    rows = [
+        ("histogram observe", lambda: registry.observe_phase("lookup", 0.0004)),
+        ("request observe",   lambda: registry.observe_request("/handle-pnr", 0.0004, 200)),
+        ("timed() block",     timed_block),
+        ("invalid counter",   lambda: registry.count_invalid_input("/handle-menu")),
+    ]
+    print(f"{'primitive':<20}{'µs/call':>9}")
+    for label, stmt in rows:
+        print(f"{label:<20}{_per_call_us(stmt, number):>9.3f}")
+
+
+# ─────────────────────────────────────────────
+# Fast-path routing
+# ─────────────────────────────────────────────
+
+async def _asgi_post(app, path: str, body: bytes, content_type: bytes) -> tuple:
+    """One in-process request; returns (status, headers, body)."""
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": "POST", "scheme": "http", "path": path, "raw_path": path.encode(),
+        "query_string": b"", "root_path": "", "server": ("bench", 80),
+        "client": ("127.0.0.1", 0),
+        "headers": [(b"content-type", content_type),
+                    (b"content-length", str(len(body)).encode())],
+    }
+    pending = [{"type": "http.request", "body": body, "more_body": False}]
+    out = {"status": None, "headers": None, "body": b""}
+
+    async def receive():
+        if pending:
+            return pending.pop()
+        await asyncio.Event().wait()
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            out["status"], out["headers"] = message["status"], message["headers"]
+        else:
+            out["body"] += message.get("body", b"")
+
+    await app(scope, receive, send)
+    return out["status"], sorted(out["headers"]), out["body"]
+
+
+_FORM = b"application/x-www-form-urlencoded"
+
+_FASTPATH_CASES = [
+    ("/voice",                b"CallSid=CAfp&From=%2B919800000001", _FORM),
+    ("/handle-menu",          b"CallSid=CAfp&Digits=1", _FORM),
+    ("/handle-pnr",           b"CallSid=CAfp&Digits=2154673890", _FORM),
+    ("/handle-pnr",           b"CallSid=CAfp&Digits=0000000000", _FORM),
+    ("/handle-pnr",           b"CallSid=CAfp&Digits=12", _FORM),
+    ("/handle-pnr",           b"CallSid=CAfp&Digits=+2154673890+", _FORM),
+    ("/handle-pnr-options",   b"CallSid=CAfp&Digits=2", _FORM),
+    ("/handle-menu",          b"CallSid=CAfp&Digits=2", _FORM),
+    ("/handle-train",         b"CallSid=CAfp&Digits=12952", _FORM),
+    ("/handle-train",         b"CallSid=CAfp&Digits=1295", _FORM),
+    ("/handle-train-options", b"CallSid=CAfp&Digits=7", _FORM),
+    ("/handle-menu",          b"CallSid=CAfp&Digits=", _FORM),
+    ("/handle-menu",          b"CallSid=&Digits=1", _FORM),
+    ("/handle-menu",          b"Digits=5&Digits=9&CallSid=CAfp", _FORM),
+    ("/handle-menu",          b"", _FORM),
+    ("/handle-menu",          b"CallSid=CAfp&Digits=1", b"application/x-www-form-urlencoded; charset=UTF-8"),
+    ("/handle-menu",          b'{"Digits": "1"}', b"application/json"),
+    ("/nowhere",              b"CallSid=CAfp", _FORM),
+    ("/handle-train-options", b"CallSid=CAfp&Digits=9", _FORM),
+]
+
+
+def bench_fastpath(number: int) -> None:
+    import main
+
+    async def run() -> None:
+        script = _FASTPATH_CASES[:11]
+        print(f"{'app':<10}{'µs/request':>12}")
+        results = {}
+        for label, app in (("fastapi", main.app), ("fastpath", main.fast_app)):
+            best = float("inf")
+            for _ in range(5):
+                start = time.perf_counter()
+                for i in range(number // len(script)):
+                    for path, body, content_type in script:
+                        await _asgi_post(app, path, body, content_type)
+                best = min(best, time.perf_counter() - start)
+            results[label] = best / (number // len(script) * len(script)) * 1e6
+            print(f"{label:<10}{results[label]:>12.1f}")
+        print(f"speed-up: {results['fastapi'] / results['fastpath']:.1f}x")
+
+    asyncio.run(run())
+
+
+# ─────────────────────────────────────────────
+# Timetable indexes
+# ─────────────────────────────────────────────
+
+def _synthetic_timetable(trains: int, stations: int, seed: int = 7) -> tuple[dict, dict]:
+    """
+    A timetable shaped like Indian Railways: `trains` runs over `stations`
+    stations, 2-40 calls each, with traffic skewed towards big junctions.
+    Also one PNR per 10 trains' worth of seats, spread over all trains.
+    """
+    rng = random.Random(seed)
+    names = [f"Station {i} Junction" for i in range(stations)]
+    cum_weights = list(itertools.accumulate(1 / (rank + 1) ** 0.8 for rank in range(stations)))
+    train_db = {}
+    for i in range(trains):
+        length = rng.randint(2, 40)
+        route: list[str] = []
+        while len(route) < length:
+            station = rng.choices(names, cum_weights=cum_weights)[0]
+            if station not in route:
+                route.append(station)
+        number = f"{10000 + i:05d}"
+        train_db[number] = {
+            "number": number, "name": f"Express {number}",
+            "source": route[0], "destination": route[-1],
+            "stops": [{"station": s, "arrival": "", "departure": ""} for s in route[1:-1]],
+        }
+    numbers = list(train_db)
+    pnr_db = {
+        f"{i:010d}": {"pnr": f"{i:010d}", "train_number": rng.choice(numbers)}
+        for i in range(trains * 10)
+    }
+    return train_db, pnr_db
+
+
+def _scan_between(train_db: dict, origin: str, destination: str) -> list:
+    """Baseline: walk every train's route."""
+    origin, destination = station_key(origin), station_key(destination)
+    found = []
+    for record in train_db.values():
+        route = [station_key(record["source"])]
+        route += [station_key(s["station"]) for s in record["stops"]]
+        route.append(station_key(record["destination"]))
+        if origin in route and destination in route[route.index(origin) + 1:]:
+            found.append(record)
+    return found
+
+
+def bench_index(trains: int, stations: int, queries: int) -> None:
+    train_db, pnr_db = _synthetic_timetable(trains, stations)
+    start = time.perf_counter()
+    index = RailwayIndex(train_db, pnr_db)
+    build = time.perf_counter() - start
+    calls = sum(len(r["stops"]) + 2 for r in train_db.values())
+    print(f"{trains} trains, {stations} stations, {calls} calls, {len(pnr_db)} PNRs; "
+          f"index built in {build:.2f}s")
+
+    rng = random.Random(1)
+    names = sorted({r["source"] for r in train_db.values()})
+    pairs = [(rng.choice(names), rng.choice(names)) for _ in range(queries)]
+    hubs = [f"Station {i} Junction" for i in range(5)]
+    numbers = list(train_db)
+
+    def drain(iterator) -> int:
+        return sum(1 for _ in iterator)
+
+    rows = [
+        ("trains_between (random)", lambda: [drain(index.trains_between(a, b)) for a, b in pairs]),
+        ("trains_between (hubs)",
+         lambda: [drain(index.trains_between(a, b)) for a in hubs for b in hubs if a != b]),
+        ("trains_halting_at (hub)", lambda: [drain(index.trains_halting_at(h)) for h in hubs]),
+        ("trains_from (random)", lambda: [drain(index.trains_from(a)) for a, _ in pairs]),
+        ("pnrs_for_train", lambda: [drain(index.pnrs_for_train(n)) for n in numbers[:queries]]),
+    ]
+    per_call = {"trains_between (random)": len(pairs), "trains_between (hubs)": 20,
+                "trains_halting_at (hub)": len(hubs), "trains_from (random)": len(pairs),
+                "pnrs_for_train": min(queries, len(numbers))}
+    print(f"{'query (results fully drained)':<32}{'µs/query':>10}")
+    for label, stmt in rows:
+        print(f"{label:<32}{_per_call_us(stmt, 1) / per_call[label]:>10.1f}")
+
+    start = time.perf_counter()
+    _scan_between(train_db, *pairs[0])
+    print(f"{'full scan baseline':<32}{(time.perf_counter() - start) * 1e6:>10.1f}")
+
+
+# ─────────────────────────────────────────────
+# Bulk-loaded store
+# ─────────────────────────────────────────────
+
+def _synthetic_pnrs(count: int, seed: int = 11):
+    """`count` PNR records shaped like data_store's, streamed."""
+    rng = random.Random(seed)
+    template = next(iter(_PNR_DB.values()))
+    for i in range(count):
+        pnr = f"{rng.randrange(10**10):010d}"
+        yield {**template, "pnr": pnr, "train_number": f"{rng.randrange(10000, 100000)}",
+               "berth_number": str(i % 72 + 1)}
+
+
+def bench_store(count: int, lookups: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        dump = os.path.join(tmp, "pnrs.jsonl")
+        with open(dump, "w", encoding="utf-8") as fh:
+            for record in _synthetic_pnrs(count):
+                fh.write(json.dumps(record) + "\n")
+
+        start = time.perf_counter()
+        report = bulk_loader.build_store(os.path.join(tmp, "ivr.store"),
+                                         bulk_loader.read_records(dump), _TRAIN_DB.values())
+        build = time.perf_counter() - start
+        print(f"{report['pnrs']} PNRs, {report['bytes'] / 2**20:.0f} MiB store "
+              f"built in {build:.1f}s")
+
+        start = time.perf_counter()
+        store = bulk_loader.MappedStore(os.path.join(tmp, "ivr.store"))
+        opened = time.perf_counter() - start
+
+        start = time.perf_counter()
+        loaded = {r["pnr"]: r for r in bulk_loader.read_records(dump)}
+        load = time.perf_counter() - start
+        # Heap cost of the dicts, traced on a sample (tracing slows loading ~5x).
+        sample = min(count, 100_000)
+        tracemalloc.start()
+        partial = {r["pnr"]: r
+                   for r in itertools.islice(bulk_loader.read_records(dump), sample)}
+        heap = tracemalloc.get_traced_memory()[0] * count / sample
+        tracemalloc.stop()
+        del partial
+
+        rng = random.Random(3)
+        keys = rng.sample(list(loaded), min(lookups, len(loaded)))
+        misses = [f"{rng.randrange(10**10):010d}" for _ in range(lookups)]
+
+        print(f"{'':<28}{'mapped store':>14}{'dict':>14}")
+        print(f"{'startup':<28}{opened * 1e3:>12.2f}ms{load * 1e3:>12.0f}ms")
+        print(f"{'python heap':<28}{'~0':>12}MB{heap / 2**20:>12.0f}MB")
+        for label, mapped, plain in (
+            ("lookup (hit)", lambda: [store.pnrs.get(k) for k in keys],
+             lambda: [loaded.get(k) for k in keys]),
+            ("contains (miss)", lambda: [k in store.pnrs for k in misses],
+             lambda: [k in loaded for k in misses]),
+        ):
+            print(f"{label:<28}{_per_call_us(mapped, 1) / len(keys):>12.2f}µs"
+                  f"{_per_call_us(plain, 1) / len(keys):>12.2f}µs")
+        store.close()
+
+
+# ─────────────────────────────────────────────
+# PNR change feed
+# ─────────────────────────────────────────────
+
+async def _feed_run(pnrs: list, readers: int, duration: float, rate: int, log: str) -> dict:
+    from change_feed import ChangeFeed
+    from data_backend import DataService, InMemoryBackend
+    from ivr_logic import render_pnr_result
+
+    service = DataService(InMemoryBackend())
+    feed = ChangeFeed()
+    rng = random.Random(5)
+    latencies: list[float] = []
+    deadline = time.perf_counter() + duration
+
+    async def reader() -> None:
+        while time.perf_counter() < deadline:
+            pnr = rng.choice(pnrs)
+            start = time.perf_counter()
+            render_pnr_result(pnr, await service.get_pnr_status(pnr))
+            latencies.append(time.perf_counter() - start)
+            await asyncio.sleep(0)
+
+    async def writer() -> None:
+        sequence, begun = 0, time.perf_counter()
+        with open(log, "a", encoding="utf-8") as fh:
+            while time.perf_counter() < deadline:
+                lines = []
+                for _ in range(int((time.perf_counter() - begun) * rate) - sequence):
+                    sequence += 1
+                    lines.append(json.dumps({"pnr": rng.choice(pnrs),
+                                             "status": f"RAC {sequence}"}) + "\n")
+                fh.write("".join(lines))
+                fh.flush()
+                await asyncio.sleep(0.01)
+
+    tailer = asyncio.ensure_future(feed.tail(log, interval=0.1)) if rate else None
+    started = time.perf_counter()
+    await asyncio.gather(writer(), *(reader() for _ in range(readers)))
+    elapsed = time.perf_counter() - started
+    while tailer is not None and feed.applied < sum(1 for _ in open(log)):
+        await asyncio.sleep(0.05)
+    if tailer is not None:
+        tailer.cancel()
+
+    latencies.sort()
+    return {
+        "reads": len(latencies) / elapsed, "applied": feed.applied / elapsed,
+        "p50": latencies[len(latencies) // 2], "p99": latencies[int(len(latencies) * 0.99)],
+        "max": latencies[-1],
+    }
+
+
+def bench_feed(count: int, readers: int, duration: float, rate: int) -> None:
+    template = next(iter(_PNR_DB.values()))
+    pnrs = [f"{8_000_000_000 + i:010d}" for i in range(count)]
+    for pnr in pnrs:
+        data_store.put_pnr({**template, "pnr": pnr, "status": "RAC 0"})
+
+    print(f"{count} PNRs, {readers} concurrent readers, {duration:.0f}s per run")
+    print(f"{'updates':<16}{'applied/s':>10}{'reads/s':>10}"
+          f"{'p50 µs':>9}{'p99 µs':>9}{'max ms':>9}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, target in (("none", 0), (f"{rate}/s", rate)):
+            r = asyncio.run(_feed_run(pnrs, readers, duration, target,
+                                      os.path.join(tmp, f"log-{target}.jsonl")))
+            print(f"{label:<16}{r['applied']:>10.0f}{r['reads']:>10.0f}"
+                  f"{r['p50'] * 1e6:>9.0f}{r['p99'] * 1e6:>9.0f}{r['max'] * 1e3:>9.1f}")
+
+
+# ─────────────────────────────────────────────
+# Prompt audio
+# ─────────────────────────────────────────────
+
+_SAY_BODY = re.compile(rb"<Say[^>]*>(.*?)</Say>", re.S)
+
+
+def _prompt_responses() -> dict[str, bytes]:
+    responses = {name: ivr_logic.static_responses.get(name)
+                 for name in ivr_logic.static_responses._builders}
+    for name in ivr_logic.MENU_STRUCTURE:
+        responses[f"menu:{name}"] = ivr_logic.build_menu_twiml(name).encode()
+    record = next(iter(_PNR_DB.values()))
+    responses["pnr result"] = ivr_logic.render_pnr_result(record["pnr"], record)
+    responses["pnr not found"] = ivr_logic.render_pnr_result("0000000000", None)
+    return responses
+
+
+def bench_prompts() -> None:
+    import prompt_audio
+
+    before = _prompt_responses()
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        report = prompt_audio.build_prompts(tmp, prompt_audio.StubEngine())
+        print(f"{report['prompts']} static prompts synthesized (stub engine) "
+              f"in {time.perf_counter() - start:.2f}s")
+        prompt_audio.PromptLibrary(tmp).install()
+        try:
+            after = _prompt_responses()
+        finally:
+            ivr_logic.set_prompt_audio(None)
+
+    print(f"{'response':<24}{'TTS chars':>11}{'with audio':>12}")
+    for name in before:
+        chars = [sum(len(text) for text in _SAY_BODY.findall(responses[name]))
+                 for responses in (before, after)]
+        print(f"{name:<24}{chars[0]:>11}{chars[1]:>12}")
+
+
+# ─────────────────────────────────────────────
+# Spoken schedules
+# ─────────────────────────────────────────────
+
+def bench_speech(number: int, halts: int) -> None:
+    import speech
+
+    stations = ["New Delhi", "Ghaziabad Jn", "Kanpur Central", "Prayagraj Jn", "Mughal Sarai",
+                "Gaya Jn", "Asansol Jn", "Durgapur", "Bardhaman Jn", "Howrah Jn"]
+    train = {
+        "name": "Rajdhani Exp", "source": "New Delhi", "destination": "Howrah Jn",
+        "departure": "16:55", "arrival": "09:55 (next day)", "days": "Mon, Wed, Fri",
+        "stops": [{"station": stations[i % len(stations)],
+                   "arrival": f"{i % 24:02d}:{i * 7 % 60:02d}",
+                   "departure": f"{i % 24:02d}:{(i * 7 + 2) % 60:02d}"}
+                  for i in range(halts)],
+    }
+    spoken = speech.speak_train("12301", train)
+    first = len(spoken.text(0))
+    unpaged = len(spoken.intro) + sum(len(page) + 1 for page in spoken.pages)
+    print(f"{halts} halts: {spoken.page_count} pages; first response {first} TTS chars "
+          f"(unpaged {unpaged})")
+
+    # A caller paging through the schedule: every page needs the whole record
+    # normalized unless the result is cached.
+    def uncached():
+        for page in range(spoken.page_count):
+            ivr_logic.build_train_result_twiml("12301", train, page=page)
+
+    def cached():
+        for page in range(spoken.page_count):
+            ivr_logic.render_train_result("12301", train, page=page)
+
+    before = _per_call_us(uncached, number)
+    after = _per_call_us(cached, number)
+    print(f"{'all pages':<14}{'uncached µs':>12}{'cached µs':>11}{'speed-up':>10}")
+    print(f"{'':<14}{before:>12.1f}{after:>11.1f}{before / after:>9.1f}x")
+    print(f"speech cache: {speech.speech_cache.stats()}")
+
+
+# ─────────────────────────────────────────────
+# Rendered-response cache
+# ─────────────────────────────────────────────
+
+def bench_rendered(number: int, max_bytes: int) -> None:
+    cache = ivr_logic.RenderedResultCache(max_bytes)
+    pnr, pnr_rec = "2154673890", _PNR_DB["2154673890"]
+    num, train_rec = "12952", _TRAIN_DB["12952"]
+    rows = [
+        ("pnr result",   lambda: ivr_logic.render_pnr_result(pnr, pnr_rec),
+                         lambda: cache.pnr(pnr, pnr_rec, data_store.pnr_version(pnr))),
+        ("train result", lambda: ivr_logic.render_train_result(num, train_rec),
+                         lambda: cache.train(num, train_rec, data_store.train_version(num))),
+    ]
+    print(f"{'response':<14}{'render µs':>11}{'cached µs':>11}{'speed-up':>10}")
+    for label, render, cached in rows:
+        before = _per_call_us(render, number)
+        after = _per_call_us(cached, number)
+        print(f"{label:<14}{before:>11.2f}{after:>11.2f}{before / after:>9.1f}x")
+
+    # Zipf-like traffic over 100k PNRs, with the cache bounded to max_bytes.
+    rng = random.Random(5)
+    records = {f"{i:010d}": {**pnr_rec, "pnr": f"{i:010d}"} for i in range(100_000)}
+    keys = list(records)
+    weights = list(itertools.accumulate(1 / (rank + 1) for rank in range(len(keys))))
+    stream = rng.choices(keys, cum_weights=weights, k=number * 10)
+    cache = ivr_logic.RenderedResultCache(max_bytes)
+    start = time.perf_counter()
+    for key in stream:
+        cache.pnr(key, records[key], (0, 0))
+    elapsed = time.perf_counter() - start
+    stats = cache.stats()
+    print(f"zipf traffic over {len(keys)} PNRs: hit rate "
+          f"{stats['hits'] / (stats['hits'] + stats['misses']):.1%}, "
+          f"{stats['size']} entries in {stats['bytes'] / 2**20:.1f} MiB "
+          f"(limit {max_bytes / 2**20:.0f} MiB), {elapsed / len(stream) * 1e6:.2f} µs/response")
+
+
+# ─────────────────────────────────────────────
+# Speech intents
+# ─────────────────────────────────────────────
+
+# Utterances of a mixed call load (not in nlu.INTENT_EXAMPLES).
+_NLU_TEXTS = [
+    "I want to check my PNR", "P N R status please", "is my ticket confirmed or still waiting",
+    "what is my berth", "my PNR is four five two one nine eight seven six three zero",
+    "2154673890", "Rajdhani timing", "when does the Shatabdi leave",
+    "train schedule for one two nine five two", "twelve nine fifty two",
+    "arrival time of the Duronto", "double two four three nine", "next stops",
+    "tell me the remaining stops", "take me back to the main menu", "start over",
+    "no thank you, bye", "that's all", "what's the weather like", "hello",
+]
+
+
+async def _nlu_load(service, texts: list[str], concurrency: int) -> tuple[float, float, float]:
+    """
+    Classify `texts` from `concurrency` concurrent callers. Returns seconds
+    taken, event-loop thread CPU seconds, and the worst loop stall.
+    """
+    stall, running = 0.0, True
+
+    async def ticker():
+        nonlocal stall
+        while running:
+            start = time.perf_counter()
+            await asyncio.sleep(0.001)
+            stall = max(stall, time.perf_counter() - start - 0.001)
+
+    async def caller(offset: int):
+        for text in texts[offset::concurrency]:
+            await service(text)
+
+    tick = asyncio.ensure_future(ticker())
+    start, cpu = time.perf_counter(), time.thread_time()
+    await asyncio.gather(*(caller(i) for i in range(concurrency)))
+    elapsed, cpu = time.perf_counter() - start, time.thread_time() - cpu
+    running = False
+    await tick
+    return elapsed, cpu, stall
+
+
+def bench_nlu(count: int, concurrency: int) -> None:
+    import nlu
+
+    model = nlu.IntentModel()
+    texts = _NLU_TEXTS * (count // len(_NLU_TEXTS))
+    per_call = _per_call_us(lambda: model.classify(texts[8]), 2_000)
+    print(f"classify: {per_call:.1f} µs per utterance")
+
+    async def inline(text):
+        await asyncio.sleep(0)
+        model.classify(text)
+
+    async def run():
+        rows = [("on the event loop", inline, None)]
+        for label, batch in (("pool, unbatched", 1), ("pool, micro-batched", 32)):
+            service = nlu.IntentService(workers=1, max_batch=batch)
+            service.start()
+            await service.classify("warm up")
+            rows.append((label, service.classify, service))
+        print(f"{len(texts)} utterances from {concurrency} concurrent calls")
+        print(f"{'mode':<22}{'utterances/s':>14}{'loop CPU µs':>13}{'loop stall ms':>15}"
+              f"{'batches':>9}")
+        for label, classify, service in rows:
+            elapsed, cpu, stall = await _nlu_load(classify, texts, concurrency)
+            batches = service.batches - 1 if service else "-"
+            print(f"{label:<22}{len(texts) / elapsed:>14.0f}{cpu / len(texts) * 1e6:>13.1f}"
+                  f"{stall * 1e3:>15.2f}{batches:>9}")
+            if service:
+                service.close()
+
+    asyncio.run(run())
+
+
+# ─────────────────────────────────────────────
+# Call journal
+# ─────────────────────────────────────────────
+
+def bench_journal(calls: int, concurrency: int, capacity: int) -> None:
+    """
+    Scripted calls through the fast path without a journal, with one, and
+    with one whose disk stalls for half a second on every write: the stall
+    should cost records, not webhook latency.
+    """
+    import main
+    from call_journal import CallJournal, JournalMiddleware
+    from fastpath import FastPathApp
+
+    script = _FASTPATH_CASES[:11] + [_FASTPATH_CASES[18]]     # ends with goodbye
+
+    async def drive(app, label: str) -> list[float]:
+        latencies: list[float] = []
+
+        async def caller(offset: int) -> None:
+            for i in range(offset, calls, concurrency):
+                sid = f"CA{label}{i}".encode()
+                for path, body, content_type in script:
+                    start = time.perf_counter()
+                    await _asgi_post(app, path, body.replace(b"CAfp", sid), content_type)
+                    latencies.append(time.perf_counter() - start)
+                    await asyncio.sleep(0)      # a server yields between requests
+
+        await asyncio.gather(*(caller(i) for i in range(concurrency)))
+        return sorted(latencies)
+
+    async def measure(label: str, directory: Optional[str], stall: float) -> None:
+        journal = None
+        app = FastPathApp(main.app)
+        if directory is not None:
+            journal = CallJournal(directory, capacity=capacity, segment_bytes=2**20)
+            if stall:
+                write = journal._write
+                journal._write = lambda records: (time.sleep(stall), write(records))
+            main.session_manager.backend.on_close = journal.session_closed
+            app = FastPathApp(main.app, wrap=lambda inner: JournalMiddleware(inner, journal))
+        drainer = asyncio.ensure_future(journal.run()) if journal else None
+        started = time.perf_counter()
+        latencies = await drive(app, label.split()[0])
+        elapsed = time.perf_counter() - started
+        main.session_manager.backend.on_close = None
+        row = (f"{label:<18}{elapsed / len(latencies) * 1e6:>11.1f}"
+               f"{latencies[len(latencies) // 2] * 1e6:>9.0f}"
+               f"{latencies[int(len(latencies) * 0.99)] * 1e6:>9.0f}"
+               f"{latencies[-1] * 1e3:>9.2f}")
+        if journal is None:
+            print(row)
+            return
+        drainer.cancel()
+        journal.close()
+        stats = journal.stats()
+        print(f"{row}{stats['written']:>9}{sum(stats['dropped'].values()):>9}"
+              f"{stats['segments']:>9}")
+
+    async def run() -> None:
+        print(f"{calls} calls x {len(script)} webhooks, {concurrency} concurrent; "
+              f"journal capacity {capacity} records")
+        print(f"{'journal':<18}{'µs/request':>11}{'p50 µs':>9}{'p99 µs':>9}{'max ms':>9}"
+              f"{'written':>9}{'dropped':>9}{'segments':>9}")
+        for path, body, content_type in script:                 # warm up
+            await _asgi_post(main.app, path, body, content_type)
+        with tempfile.TemporaryDirectory() as tmp:
+            await measure("off", None, 0)
+            await measure("on", os.path.join(tmp, "on"), 0)
+            await measure("stalled disk", os.path.join(tmp, "stalled"), 0.5)
+
+    asyncio.run(run())
+
+
+# ─────────────────────────────────────────────
+# Caller bookings
+# ─────────────────────────────────────────────
+
+def bench_bookings(calls: int, concurrency: int, latency: float, greeting: float) -> None:
+    """
+    PNR checks against an HTTP backend `latency` seconds away: callers who
+    key their PNR in, against callers offered their booking at the welcome
+    (prefetched while a `greeting`-second prompt plays), `concurrency`
+    calls at a time.
+    """
+    import main
+    from data_backend import DataService, HttpBackend, serve_standin
+
+    template = _PNR_DB["2154673890"]
+    for i in range(2 * calls):
+        data_store.put_pnr({**template, "pnr": f"{7_000_000_000 + i:010d}",
+                            "mobile": f"{9_100_000_000 + i:010d}"})
+
+    slots = asyncio.Semaphore(concurrency)
+
+    async def call(i: int, offered: bool) -> tuple[float, float, int]:
+        async with slots:
+            return await one_call(i, offered)
+
+    async def one_call(i: int, offered: bool) -> tuple[float, float, int]:
+        """One call; returns (/voice seconds, status request seconds, webhooks)."""
+        sid, pnr = f"CAbk{i}".encode(), f"{7_000_000_000 + i:010d}".encode()
+        caller = f"%2B91{9_100_000_000 + i:010d}" if offered else "%2B919800000001"
+        start = time.perf_counter()
+        await _asgi_post(main.fast_app, "/voice", b"CallSid=" + sid + b"&From=" + caller.encode(),
+                         _FORM)
+        voice = time.perf_counter() - start
+        await asyncio.sleep(greeting)
+        steps = [b"Digits=3"] if offered else [b"Digits=1", b"Digits=" + pnr]
+        paths = ["/handle-menu"] if offered else ["/handle-menu", "/handle-pnr"]
+        for path, step in zip(paths, steps):
+            start = time.perf_counter()
+            await _asgi_post(main.fast_app, path, b"CallSid=" + sid + b"&" + step, _FORM)
+        return voice, time.perf_counter() - start, 1 + len(steps)
+
+    async def run() -> None:
+        standin = await serve_standin(latency=latency)
+        local = main.data_service
+        main.data_service = DataService(HttpBackend("127.0.0.1", standin.port))
+        print(f"{calls} calls per mode, {concurrency} at a time, backend "
+              f"{latency * 1e3:.0f} ms away, {greeting:.1f}s greeting")
+        print(f"{'mode':<20}{'webhooks':>9}{'keys':>6}{'/voice ms':>11}{'status ms':>11}")
+        try:
+            for label, offered, base in (("keyed PNR", False, 0), ("offered booking", True, calls)):
+                results = await asyncio.gather(*(call(base + i, offered) for i in range(calls)))
+                voice = sorted(r[0] for r in results)[calls // 2]
+                status = sorted(r[1] for r in results)[calls // 2]
+                keys = 1 if offered else 12           # menu key, or "1" + PNR + "#"
+                print(f"{label:<20}{results[0][2]:>9}{keys:>6}{voice * 1e3:>11.2f}"
+                      f"{status * 1e3:>11.2f}")
+        finally:
+            await main.data_service.close()
+            main.data_service = local
+            await standin.close()
+        print(f"prefetched {main.booking_stats['prefetched']}, offered "
+              f"{main.booking_stats['offered']}, accepted {main.booking_stats['accepted']} "
+              "(medians shown)")
+
+    asyncio.run(run())
+
+
+# ─────────────────────────────────────────────
+# Serverless cold start
+# ─────────────────────────────────────────────
+
+_COLDSTART_TIMER = """
+import time
+start = time.perf_counter()
+{body}
+import json
+print(json.dumps([imported - start, voice - start, pnr - start]))
+"""
+
+_COLDSTART_MAIN = """
+import asyncio
+import main
+imported = time.perf_counter()
+
+async def post(path, body):
+    scope = {"type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+             "method": "POST", "scheme": "http", "path": path, "raw_path": path.encode(),
+             "query_string": b"", "root_path": "", "server": ("cold", 80),
+             "client": ("127.0.0.1", 0),
+             "headers": [(b"content-type", b"application/x-www-form-urlencoded"),
+                         (b"content-length", str(len(body)).encode())]}
+    pending = [{"type": "http.request", "body": body, "more_body": False}]
+    async def receive():
+        return pending.pop()
+    async def send(message):
+        pass
+    await main.app(scope, receive, send)
+
+async def first_calls():
+    await post("/voice", b"CallSid=CAcold&From=%2B919800000001")
+    voice = time.perf_counter()
+    await post("/handle-pnr", b"CallSid=CAcold&Digits=2154673890")
+    return voice, time.perf_counter()
+
+voice, pnr = asyncio.run(first_calls())
+"""
+
+_COLDSTART_LAMBDA = """
+import lambda_handler
+imported = time.perf_counter()
+event = lambda_handler.invocation_event
+lambda_handler.handler(event("/voice", {"CallSid": "CAcold", "From": "+919800000001"}))
+voice = time.perf_counter()
+lambda_handler.handler(event("/handle-pnr", {"CallSid": "CAcold", "Digits": "2154673890"}))
+pnr = time.perf_counter()
+"""
+
+
+def _cold_start(script: str, env: dict) -> tuple[list[float], float]:
+    """Run `script` in a fresh interpreter: its in-process timings, and wall time."""
+    import subprocess
+    import sys
+
+    start = time.perf_counter()
+    out = subprocess.run([sys.executable, "-c", _COLDSTART_TIMER.format(body=script)],
+                         cwd=os.path.dirname(os.path.abspath(__file__)), env=env,
+                         capture_output=True, text=True, check=True).stdout
+    return json.loads(out.splitlines()[-1]), time.perf_counter() - start
+
+
+def bench_coldstart(runs: int) -> None:
+    """
+    Import-to-first-response time of main.py against the serverless handler
+    (tables built first), median of `runs` fresh interpreters each.
+    """
+    import lambda_handler
+
+    with tempfile.TemporaryDirectory() as directory:
+        tables = os.path.join(directory, "ivr_tables.marshal")
+        report = lambda_handler.build_tables(tables)
+        print(f"tables: {report['routes']} routes, {report['transitions']} transitions, "
+              f"{report['bytes']} bytes")
+
+        env = {**os.environ, "IVR_LAMBDA_TABLES": tables}
+        print(f"{'entry point':<16}{'import ms':>11}{'1st /voice ms':>15}{'1st PNR ms':>12}"
+              f"{'process ms':>12}")
+        medians = {}
+        for label, script in (("main.py", _COLDSTART_MAIN), ("lambda_handler", _COLDSTART_LAMBDA)):
+            _cold_start(script, env)                    # compile bytecode first
+            results = [_cold_start(script, env) for _ in range(runs)]
+            timings = [sorted(r[0][i] for r in results)[runs // 2] for i in range(3)]
+            process = sorted(r[1] for r in results)[runs // 2]
+            medians[label] = timings[1]
+            print(f"{label:<16}{timings[0] * 1e3:>11.1f}{timings[1] * 1e3:>15.1f}"
+                  f"{timings[2] * 1e3:>12.1f}{process * 1e3:>12.1f}")
+    print(f"first response {medians['main.py'] / medians['lambda_handler']:.0f}x sooner "
+          f"(medians of {runs} runs; times from the first import)")
+
+
+# ─────────────────────────────────────────────
+# Overload
+# ─────────────────────────────────────────────
+
+def _quantile(values: list[float], q: float) -> float:
+    return sorted(values)[min(len(values) - 1, int(q * len(values)))] if values else 0.0
+
+
+def bench_overload(rate: int, duration: float, work: float, think: float) -> None:
+    """
+    Calls arriving at `rate` per second for `duration` seconds, each webhook
+    costing `work` seconds of CPU on top of its real handler, with admission
+    control off and at main.py's thresholds. Answered calls check a PNR with
+    `think` seconds between webhooks.
+    """
+    import main
+
+    busy = ivr_logic.static_responses.get("busy")
+    routes = main.fast_app.routes
+    endpoints = {path: route.endpoint for path, route in routes.items()}
+
+    def burdened(endpoint):
+        async def handle(**fields):
+            deadline = time.perf_counter() + work
+            while time.perf_counter() < deadline:
+                pass
+            return await endpoint(**fields)
+        return handle
+
+    steps = (("/handle-menu", b"1"), ("/handle-pnr", b"2154673890"),
+             ("/handle-pnr-options", b"9"))
+
+    async def call(sid: bytes, arrival: float, results: dict) -> None:
+        # Latencies run from when Twilio would send each webhook, so time
+        # spent queued behind other work on the event loop is included.
+        _, _, body = await _asgi_post(main.fast_app, "/voice",
+                                      b"CallSid=" + sid + b"&From=%2B919800000001", _FORM)
+        done = time.perf_counter()
+        results["voice"].append(done - arrival)
+        if body == busy:
+            results["shed"] += 1
+            return
+        for path, digits in steps:
+            sent = done + think
+            await asyncio.sleep(think)
+            _, _, body = await _asgi_post(main.fast_app, path,
+                                          b"CallSid=" + sid + b"&Digits=" + digits, _FORM)
+            done = time.perf_counter()
+            results["in_call"].append(done - sent)
+        results["completed"] += 1
+
+    async def run(label: str, max_in_flight: int, max_lag: float) -> None:
+        admission = main.admission
+        admission.max_in_flight, admission.max_lag = max_in_flight, max_lag
+        monitor = asyncio.ensure_future(admission.run())
+        results = {"voice": [], "in_call": [], "shed": 0, "completed": 0}
+        calls, tasks = int(rate * duration), []
+        start = time.perf_counter()
+        for i in range(calls):
+            arrival = start + i / rate
+            delay = arrival - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.append(asyncio.ensure_future(call(f"CAol{label}{i}".encode(), arrival, results)))
+        await asyncio.gather(*tasks)
+        monitor.cancel()
+        voice, in_call = results["voice"], results["in_call"]
+        print(f"{label:<10}{results['completed']:>10}{results['shed']:>7}"
+              f"{_quantile(voice, 0.5) * 1e3:>10.0f}{_quantile(voice, 0.99) * 1e3:>10.0f}"
+              f"{_quantile(in_call, 0.5) * 1e3:>10.0f}{_quantile(in_call, 0.99) * 1e3:>10.0f}"
+              f"{max(in_call, default=0) * 1e3:>10.0f}")
+
+    limits = (main.admission.max_in_flight, main.admission.max_lag)
+    for path in routes:
+        routes[path].endpoint = burdened(endpoints[path])
+    print(f"{int(rate * duration)} calls at {rate}/s, {work * 1e3:.1f} ms CPU per webhook "
+          f"(~{1 / (work * (1 + len(steps))):.0f} calls/s capacity); admission at "
+          f"{limits[0]} in flight / {limits[1] * 1e3:.0f} ms loop lag")
+    print(f"{'admission':<10}{'completed':>10}{'shed':>7}{'/voice':>10}{'p99':>10}"
+          f"{'in-call':>10}{'p99':>10}{'max':>10}   (ms; Twilio gives up at 15000)")
+    try:
+        asyncio.run(run("off", 0, 0.0))
+        asyncio.run(run("on", *limits))
+    finally:
+        for path in routes:
+            routes[path].endpoint = endpoints[path]
+        main.admission.max_in_flight, main.admission.max_lag = limits
+    shed = {f"{kind}/{reason}": count for (kind, reason), count in main.admission.shed.items()
+            if count}
+    print(f"shed by kind/reason: {shed}; in-progress webhooks admitted while overloaded: "
+          f"{main.admission.in_progress_admitted}")
+
+
+# ─────────────────────────────────────────────
+# Typo correction
+# ─────────────────────────────────────────────
+
+def _slip(number: str, rng: random.Random) -> str:
+    """`number` with one keying slip: two neighbouring digits swapped, or one wrong."""
+    i = rng.randrange(len(number) - 1)
+    if rng.random() < 0.25 and number[i] != number[i + 1]:
+        return number[:i] + number[i + 1] + number[i] + number[i + 2:]
+    i = rng.randrange(len(number))
+    digit = rng.choice([other for other in "0123456789" if other != number[i]])
+    return number[:i] + digit + number[i + 1:]
+
+
+def _timed_us(fn, keys: list[str]) -> list[float]:
+    """Microseconds taken by each fn(key)."""
+    timings = []
+    for key in keys:
+        start = time.perf_counter()
+        fn(key)
+        timings.append((time.perf_counter() - start) * 1e6)
+    return timings
+
+
+def bench_corrections(count: int, lookups: int) -> None:
+    """
+    "Did you mean" lookups over `count` PNRs held in dicts and in a mapped
+    store: PNRs keyed with one slip, and numbers one slip away from no PNR
+    (every candidate probed). Then the webhooks and keys a mistyped PNR
+    costs a caller who takes the suggestion, against one who re-keys it.
+    """
+    rng = random.Random(5)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "ivr.store")
+        start = time.perf_counter()
+        bulk_loader.build_store(path, _synthetic_pnrs(count), _TRAIN_DB.values())
+        mapped = bulk_loader.MappedStore(path)
+        plain = dict.fromkeys(mapped.pnrs, _PNR_DB["2154673890"])   # only probed with `in`
+        print(f"{len(plain)} PNRs, store built in {time.perf_counter() - start:.1f}s")
+
+        intended = rng.sample(list(plain), lookups)
+        slips = [(pnr, _slip(pnr, rng)) for pnr in intended]
+        slips = [(pnr, typed) for pnr, typed in slips if typed not in plain]
+        typed = [typed for _, typed in slips]
+        strangers = []
+        while len(strangers) < lookups:
+            number = f"{rng.randrange(10**10):010d}"
+            if number not in plain and data_store._correct(number, plain) is None:
+                strangers.append(number)
+        offered = sum(data_store._correct(f"{rng.randrange(10**10):010d}", plain) is not None
+                      for _ in range(lookups))
+
+        print(f"{'store':<14}{'keyed':<12}{'recovered':>10}{'p50 µs':>9}{'p99 µs':>9}"
+              f"{'max µs':>9}")
+        for label, store in (("dict", plain), ("mapped store", mapped.pnrs)):
+            correct = lambda number: data_store._correct(number, store)
+            recovered = sum(correct(t) == pnr for pnr, t in slips)
+            for kind, keys, hit in (("one slip", typed, recovered), ("no match", strangers, 0)):
+                timings = _timed_us(correct, keys)
+                share = f"{hit / len(keys):.1%}" if keys is typed else "-"
+                print(f"{label:<14}{kind:<12}{share:>10}{_quantile(timings, 0.5):>9.1f}"
+                      f"{_quantile(timings, 0.99):>9.1f}{max(timings):>9.1f}")
+        mapped.close()
+    print(f"random 10-digit numbers offered a correction: {offered / lookups:.2%} "
+          f"(at most {len(list(data_store._one_key_slips('0123456789')))} probes each)")
+
+    pnr = "2154673890"
+    print(f"{'after a mistyped PNR':<26}{'webhooks':>9}{'keys':>6}")
+    for label, steps in (
+        ("take the suggestion", [("/handle-pnr-suggestion", "1")]),
+        ("re-key the PNR", [("/handle-pnr-suggestion", "2"), ("/handle-pnr", pnr)]),
+    ):
+        keys = sum(len(digits) for _, digits in steps) + (len(steps) - 1)   # "#" after a PNR
+        print(f"{label:<26}{len(steps):>9}{keys:>6}")
+
+
+# ─────────────────────────────────────────────
+# Entry point
+# ─────────────────────────────────────────────
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    sub = parser.add_subparsers(dest="bench", required=True)
+
+    twiml = sub.add_parser("twiml", help="compiled templates vs. string builders")
+    twiml.add_argument("-n", "--number", type=int, default=20_000)
+
+    sessions = sub.add_parser("sessions", help="ordered session expiry vs. full scans")
+    sessions.add_argument("-n", "--count", type=int, default=100_000)
+    sessions.add_argument("--scan-max", type=int, default=25_000,
+                          help="largest size to run the quadratic baseline at")
+
+    memory = sub.add_parser("memory", help="slotted session records vs. dicts")
+    memory.add_argument("-n", "--count", type=int, default=100_000)
+
+    cluster = sub.add_parser("cluster", help="requests/s vs. number of workers")
+    cluster.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    cluster.add_argument("--duration", type=float, default=10.0)
+    cluster.add_argument("--concurrency", type=int, default=32,
+                         help="concurrent simulated calls per driver process")
+    cluster.add_argument("--drivers", type=int, default=2, help="load-generating processes")
+
+    metrics = sub.add_parser("metrics", help="cost of recording one observation")
+    metrics.add_argument("-n", "--number", type=int, default=200_000)
+
+    fastpath = sub.add_parser("fastpath", help="raw ASGI webhook routing vs. FastAPI")
+    fastpath.add_argument("-n", "--number", type=int, default=5_000)
+
+    index = sub.add_parser("index", help="station queries on a full-size timetable")
+    index.add_argument("--trains", type=int, default=13_000)
+    index.add_argument("--stations", type=int, default=7_000)
+    index.add_argument("--queries", type=int, default=1_000)
+
+    store = sub.add_parser("store", help="memory-mapped store vs. loading dumps into dicts")
+    store.add_argument("-n", "--count", type=int, default=1_000_000, help="PNRs")
+    store.add_argument("--lookups", type=int, default=10_000)
+
+    feed = sub.add_parser("feed", help="PNR reads while 10k updates/s stream in")
+    feed.add_argument("-n", "--count", type=int, default=50_000, help="PNRs")
+    feed.add_argument("--readers", type=int, default=50)
+    feed.add_argument("--duration", type=float, default=5.0)
+    feed.add_argument("--rate", type=int, default=10_000, help="updates per second")
+
+    sub.add_parser("prompts", help="TTS characters per response with pre-synthesized prompts")
+
+    speech = sub.add_parser("speech", help="normalized, paged schedules: cached vs. uncached")
+    speech.add_argument("-n", "--number", type=int, default=2_000)
+    speech.add_argument("--halts", type=int, default=30)
+
+    rendered = sub.add_parser("rendered", help="rendered-response cache vs. rendering every result")
+    rendered.add_argument("-n", "--number", type=int, default=20_000)
+    rendered.add_argument("--max-bytes", type=int, default=8 * 2**20)
+
+    nlu = sub.add_parser("nlu", help="speech intents: accuracy, batching, event-loop stalls")
+    nlu.add_argument("-n", "--count", type=int, default=20_000, help="utterances")
+    nlu.add_argument("--concurrency", type=int, default=200, help="concurrent calls")
+
+    journal = sub.add_parser("journal", help="call journal: webhook overhead, stalled disk, drops")
+    journal.add_argument("-n", "--calls", type=int, default=5_000)
+    journal.add_argument("--concurrency", type=int, default=50)
+    journal.add_argument("--capacity", type=int, default=16_384, help="ring buffer records")
+
+    bookings = sub.add_parser("bookings",
+                              help="caller's booking offered + prefetched vs. keyed PNR entry")
+    bookings.add_argument("-n", "--calls", type=int, default=200)
+    bookings.add_argument("--concurrency", type=int, default=10)
+    bookings.add_argument("--latency", type=float, default=0.05, help="backend seconds")
+    bookings.add_argument("--greeting", type=float, default=0.5, help="seconds before keying")
+
+    coldstart = sub.add_parser("coldstart",
+                               help="serverless handler vs. main.py: import to first response")
+    coldstart.add_argument("-n", "--runs", type=int, default=10, help="interpreters per entry point")
+
+    overload = sub.add_parser("overload", help="call surge with and without admission control")
+    overload.add_argument("--rate", type=int, default=200, help="new calls per second")
+    overload.add_argument("--duration", type=float, default=10.0)
+    overload.add_argument("--work", type=float, default=0.002, help="CPU seconds per webhook")
+    overload.add_argument("--think", type=float, default=0.5, help="seconds between keypresses")
+
+    corrections = sub.add_parser("corrections",
+                                 help='"did you mean" lookups over 1M PNRs; webhooks saved')
+    corrections.add_argument("-n", "--count", type=int, default=1_000_000, help="PNRs")
+    corrections.add_argument("--lookups", type=int, default=10_000)
+
+    args = parser.parse_args()
+    if args.bench == "twiml":
+        bench_twiml(args.number)
+    elif args.bench == "sessions":
+        bench_sessions(args.count, args.scan_max)
+    elif args.bench == "memory":
+        bench_memory(args.count)
+    elif args.bench == "cluster":
+        bench_cluster(args.max_workers, args.duration, args.concurrency, args.drivers)
+    elif args.bench == "metrics":
+        bench_metrics(args.number)
+    elif args.bench == "fastpath":
+        bench_fastpath(args.number)
+    elif args.bench == "index":
+        bench_index(args.trains, args.stations, args.queries)
+    elif args.bench == "store":
+        bench_store(args.count, args.lookups)
+    elif args.bench == "feed":
+        bench_feed(args.count, args.readers, args.duration, args.rate)
+    elif args.bench == "prompts":
+        bench_prompts()
+    elif args.bench == "speech":
+        bench_speech(args.number, args.halts)
+    elif args.bench == "rendered":
+        bench_rendered(args.number, args.max_bytes)
+    elif args.bench == "nlu":
+        bench_nlu(args.count, args.concurrency)
+    elif args.bench == "journal":
+        bench_journal(args.calls, args.concurrency, args.capacity)
+    elif args.bench == "bookings":
+        bench_bookings(args.calls, args.concurrency, args.latency, args.greeting)
+    elif args.bench == "coldstart":
+        bench_coldstart(args.runs)
+    elif args.bench == "overload":
+        bench_overload(args.rate, args.duration, args.work, args.think)
+    elif args.bench == "corrections":
+        bench_corrections(args.count, args.lookups)
+
+
+if __name__ == "__main__":
+    main()
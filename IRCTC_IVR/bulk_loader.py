@@ -0,0 +1,361 @@
+"""
+IRCTC Conversational IVR - Bulk Loader
+Streams PNR and timetable dumps (CSV or JSONL) into one compact,
+read-only store file that the app memory-maps:
+
+    python bulk_loader.py --pnrs pnrs.csv --trains trains.jsonl -o ivr.store
+    IVR_DATA_FILE=ivr.store python main.py
+
+Input rows have the same fields as the records in data_store. In CSV, a
+train's `stops` column holds the JSON list of halts. Rows with a
+malformed key are skipped and counted; a key seen twice keeps its last row.
+
+File layout (little-endian):
+
+    header     magic "IVRSTORE", version, table count
+    directory  per table: name, key width, entry count, keys offset, slots offset
+    records    compact JSON, one per record
+    per table  sorted fixed-width keys, then (offset u64, length u32) slots
+
+Tables: "pnr" (10-digit keys), "train" (5-digit keys), "pnr_by_train"
+(keys are train number + PNR, no records) for PNR-by-train queries, and
+"pnr_by_caller" (keys are the booking's 10-digit mobile number + PNR) for
+PNR-by-caller queries. Files written before "pnr_by_caller" existed still
+open; they just answer no caller queries.
+
+Lookups binary-search the mapped keys and decode only the one record they
+return, so opening the file costs no parse at all. Every worker maps the
+same file and shares one copy in the page cache.
+"""
+
+import argparse
+import csv
+import json
+import mmap
+import os
+import struct
+import time
+from array import array
+from bisect import bisect_right
+from typing import Iterable, Iterator, Optional
+
+from data_store import caller_key
+
+MAGIC = b"IVRSTORE"
+VERSION = 1
+_HEADER = struct.Struct("<8sII")            # magic, version, table count
+_DIRECTORY = struct.Struct("<16sIQQQ")      # name, key width, count, keys, slots
+_SLOT = struct.Struct("<QI")                # record offset, record length
+
+_TABLES = (("pnr", 10), ("train", 5), ("pnr_by_train", 15), ("pnr_by_caller", 20))
+_KEY_ONLY = frozenset({"pnr_by_train", "pnr_by_caller"})
+_FENCE_STRIDE = 64      # every Nth key is kept in memory to narrow searches
+
+
+class StoreFormatError(ValueError):
+    """The file is not a store written by this module (or a newer version)."""
+
+
+# ─────────────────────────────────────────────
+# Reading dumps
+# ─────────────────────────────────────────────
+
+def read_records(path: str) -> Iterator[dict]:
+    """Stream records from a .csv or .jsonl file (one record per row/line)."""
+    with open(path, encoding="utf-8", newline="") as fh:
+        if path.endswith(".csv"):
+            for row in csv.DictReader(fh):
+                stops = row.get("stops")
+                if stops is not None:
+                    row["stops"] = json.loads(stops) if stops.strip() else []
+                yield row
+        else:
+            for line in fh:
+                if line.strip():
+                    yield json.loads(line)
+
+
+# ─────────────────────────────────────────────
+# Writing the store
+# ─────────────────────────────────────────────
+
+class _TableBuilder:
+    """Keys and record locations for one table, kept in compact arrays."""
+
+    def __init__(self, width: int):
+        self.width = width
+        self.keys: list[bytes] = []
+        self.offsets = array("Q")
+        self.lengths = array("I")
+
+    def add(self, key: bytes, offset: int = 0, length: int = 0) -> None:
+        self.keys.append(key)
+        self.offsets.append(offset)
+        self.lengths.append(length)
+
+    def survivors(self) -> list[int]:
+        """Entry indexes in key order; of duplicate keys, the last added wins."""
+        keys = self.keys
+        order = sorted(range(len(keys)), key=keys.__getitem__)   # stable
+        return [i for n, i in enumerate(order)
+                if n + 1 == len(order) or keys[order[n + 1]] != keys[i]]
+
+    def write(self, fh, order: list[int], with_slots: bool) -> tuple[int, int]:
+        """Write the keys (+ slots) in `order`; returns (keys offset, slots offset)."""
+        keys = self.keys
+        keys_at = fh.tell()
+        fh.write(b"".join(keys[i] for i in order))
+        slots_at = 0
+        if with_slots:
+            slots_at = fh.tell()
+            fh.write(b"".join(_SLOT.pack(self.offsets[i], self.lengths[i]) for i in order))
+        return keys_at, slots_at
+
+
+def build_store(
+    out_path: str,
+    pnr_records: Iterable[dict] = (),
+    train_records: Iterable[dict] = (),
+) -> dict:
+    """
+    Write a store file from record iterables (consumed once, streaming).
+    The file is written next to `out_path` and renamed into place, so a
+    running app never maps a half-written store. Returns counts.
+    """
+    tables = {name: _TableBuilder(width) for name, width in _TABLES}
+    pnr_trains: list[bytes] = []     # train number per "pnr" entry, b"" if unknown
+    pnr_callers: list[bytes] = []    # caller_key of the mobile per "pnr" entry, or b""
+    skipped = {"pnr": 0, "train": 0}
+    tmp_path = out_path + ".tmp"
+    directory_size = _HEADER.size + _DIRECTORY.size * len(_TABLES)
+
+    with open(tmp_path, "wb") as fh:
+        fh.write(b"\0" * directory_size)
+
+        def append(table: str, key: str, record: dict) -> bool:
+            width = tables[table].width
+            if len(key) != width or not key.isdigit():
+                skipped[table] += 1
+                return False
+            data = json.dumps(record, ensure_ascii=False, separators=(",", ":")).encode()
+            tables[table].add(key.encode("ascii"), fh.tell(), len(data))
+            fh.write(data)
+            return True
+
+        for record in pnr_records:
+            pnr = str(record.get("pnr", "")).strip()
+            if append("pnr", pnr, record):
+                train = str(record.get("train_number", "")).strip()
+                pnr_trains.append(train.encode("ascii") if len(train) == 5 and train.isdigit()
+                                  else b"")
+                pnr_callers.append((caller_key(str(record.get("mobile") or "")) or "")
+                                   .encode("ascii"))
+        for record in train_records:
+            append("train", str(record.get("number", "")).strip(), record)
+
+        order = {name: tables[name].survivors() for name in ("pnr", "train")}
+        # Index only each PNR's surviving (last) row under its train and caller.
+        pnr_keys = tables["pnr"].keys
+        for i in order["pnr"]:
+            if pnr_trains[i]:
+                tables["pnr_by_train"].add(pnr_trains[i] + pnr_keys[i])
+            if pnr_callers[i]:
+                tables["pnr_by_caller"].add(pnr_callers[i] + pnr_keys[i])
+        for name in _KEY_ONLY:
+            order[name] = tables[name].survivors()
+
+        entries = []
+        for name, width in _TABLES:
+            keys_at, slots_at = tables[name].write(fh, order[name], name not in _KEY_ONLY)
+            entries.append(_DIRECTORY.pack(
+                name.encode("ascii"), width, len(order[name]), keys_at, slots_at
+            ))
+        fh.seek(0)
+        fh.write(_HEADER.pack(MAGIC, VERSION, len(_TABLES)) + b"".join(entries))
+        fh.flush()
+        os.fsync(fh.fileno())
+    os.replace(tmp_path, out_path)
+
+    return {
+        "pnrs": len(order["pnr"]), "trains": len(order["train"]),
+        "skipped_pnrs": skipped["pnr"], "skipped_trains": skipped["train"],
+        "bytes": os.path.getsize(out_path),
+    }
+
+
+# ─────────────────────────────────────────────
+# Reading the store
+# ─────────────────────────────────────────────
+
+class MappedTable:
+    """
+    Read-only Mapping view of one table: key → decoded record. Keys are
+    found by bisecting an in-memory fence of every _FENCE_STRIDE-th key
+    (built on first use), then searching that block of the mapped, sorted
+    key array: with bytes.find() for an exact key, by bisection for ranges.
+    """
+
+    def __init__(self, mm: mmap.mmap, width: int, count: int, keys_at: int, slots_at: int):
+        self._mm = mm
+        self._width = width
+        self._count = count
+        self._keys_at = keys_at
+        self._slots_at = slots_at
+        self._fence: list[bytes] = []
+
+    def _key(self, index: int) -> bytes:
+        start = self._keys_at + index * self._width
+        return self._mm[start:start + self._width]
+
+    def _fence_keys(self) -> list[bytes]:
+        if not self._fence and self._count:
+            self._fence = [self._key(i) for i in range(0, self._count, _FENCE_STRIDE)]
+        return self._fence
+
+    def _lower_bound(self, key: bytes) -> int:
+        block = bisect_right(self._fence_keys(), key)
+        if block == 0:
+            return 0
+        lo = (block - 1) * _FENCE_STRIDE
+        hi = min(lo + _FENCE_STRIDE, self._count)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _record(self, index: int) -> dict:
+        offset, length = _SLOT.unpack_from(self._mm, self._slots_at + index * _SLOT.size)
+        return json.loads(self._mm[offset:offset + length])
+
+    # ── Mapping protocol ──────────────────────
+
+    def _find(self, key: str) -> int:
+        encoded = key.encode("ascii", "replace")
+        width = self._width
+        if len(encoded) != width:
+            return -1
+        # Exact match: one read of the key's block, searched by bytes.find(),
+        # costs less than a binary search of single-key reads.
+        first = (bisect_right(self._fence_keys(), encoded) - 1) * _FENCE_STRIDE
+        if first < 0:
+            return -1
+        start = self._keys_at + first * width
+        block = self._mm[start:start + min(_FENCE_STRIDE, self._count - first) * width]
+        at = block.find(encoded)
+        while at > 0 and at % width:        # a match straddling two keys
+            at = block.find(encoded, at + 1)
+        return -1 if at < 0 else first + at // width
+
+    def get(self, key: str, default=None):
+        index = self._find(key)
+        return default if index < 0 else self._record(index)
+
+    def __getitem__(self, key: str) -> dict:
+        index = self._find(key)
+        if index < 0:
+            raise KeyError(key)
+        return self._record(index)
+
+    def __contains__(self, key) -> bool:
+        return isinstance(key, str) and self._find(key) >= 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __iter__(self) -> Iterator[str]:
+        return (self._key(i).decode("ascii") for i in range(self._count))
+
+    def keys(self) -> Iterator[str]:
+        return iter(self)
+
+    def values(self) -> Iterator[dict]:
+        return (self._record(i) for i in range(self._count))
+
+    def items(self) -> Iterator[tuple[str, dict]]:
+        return ((self._key(i).decode("ascii"), self._record(i)) for i in range(self._count))
+
+    # ── Prefix scans (key-only tables) ────────
+
+    def suffixes(self, prefix: str) -> Iterator[str]:
+        """Lazily yield the rest of every key starting with `prefix`."""
+        encoded = prefix.encode("ascii", "replace")
+        index = self._lower_bound(encoded)
+        while index < self._count:
+            key = self._key(index)
+            if not key.startswith(encoded):
+                return
+            yield key[len(encoded):].decode("ascii")
+            index += 1
+
+
+class MappedStore:
+    """A store file mapped read-only: `.pnrs` and `.trains` tables."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as fh:
+            self._mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, count = _HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            raise StoreFormatError(f"{path}: not an IVR store")
+        if version != VERSION:
+            raise StoreFormatError(f"{path}: store version {version}, expected {VERSION}")
+        tables = {}
+        for i in range(count):
+            name, width, entries, keys_at, slots_at = _DIRECTORY.unpack_from(
+                self._mm, _HEADER.size + i * _DIRECTORY.size
+            )
+            tables[name.rstrip(b"\0").decode("ascii")] = MappedTable(
+                self._mm, width, entries, keys_at, slots_at
+            )
+        self.pnrs: MappedTable = tables["pnr"]
+        self.trains: MappedTable = tables["train"]
+        self._pnr_by_train: MappedTable = tables["pnr_by_train"]
+        self._pnr_by_caller: Optional[MappedTable] = tables.get("pnr_by_caller")
+
+    def pnrs_for_train(self, train_number: str) -> Iterator[str]:
+        """PNR numbers booked on a train, in order, without decoding records."""
+        return self._pnr_by_train.suffixes(train_number)
+
+    def pnrs_for_caller(self, caller: str) -> Iterator[str]:
+        """PNR numbers booked with a caller_key() phone number, in order."""
+        if self._pnr_by_caller is None:
+            return iter(())
+        return self._pnr_by_caller.suffixes(caller)
+
+    def close(self) -> None:
+        self._mm.close()
+
+
+# ─────────────────────────────────────────────
+# CLI
+# ─────────────────────────────────────────────
+
+def _chain(paths: list[str]) -> Iterator[dict]:
+    for path in paths:
+        yield from read_records(path)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build an IVR store file from data dumps")
+    parser.add_argument("--pnrs", action="append", default=[], metavar="FILE",
+                        help="PNR dump (.csv or .jsonl); repeatable")
+    parser.add_argument("--trains", action="append", default=[], metavar="FILE",
+                        help="timetable dump (.csv or .jsonl); repeatable")
+    parser.add_argument("-o", "--output", required=True, help="store file to write")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    report = build_store(args.output, _chain(args.pnrs), _chain(args.trains))
+    print(
+        f"{args.output}: {report['pnrs']} PNRs, {report['trains']} trains, "
+        f"{report['bytes'] / 2**20:.1f} MiB in {time.perf_counter() - start:.1f}s "
+        f"(skipped {report['skipped_pnrs']} PNR rows, {report['skipped_trains']} train rows)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,288 @@
+"""
+IRCTC Conversational IVR - Call Journal
+Records what callers did, for analysing menu abandonment, repeat PNR
+checks and the like:
+
+    IVR_JOURNAL_DIR=journal python main.py
+
+Every webhook adds one event (CallSid, route, digits, flow, status,
+latency), and every session that ends or expires adds a call-detail
+record (CDR) saying how far the caller got:
+
+    {"type":"event","t":1767225600.1,"call":"CA…","route":"/handle-pnr",
+     "digits":"2154673890","flow":"pnr","status":200,"ms":0.41}
+    {"type":"cdr","t":1767225674.3,"call":"CA…","reason":"ended","caller":"+91…",
+     "start":1767225600.0,"end":1767225674.3,"duration":74.3,"flow":"pnr",
+     "last_menu":"pnr_options","last_digit":"9","last_pnr":"2154673890",
+     "last_train":null}
+
+Records are appended to a bounded in-memory ring buffer; the webhook path
+does nothing else. A background task drains the buffer in batches to
+append-only JSONL segment files, written from a worker thread and rotated
+by size and age (a segment is complete once a newer one exists). When the
+buffer is full, because the disk has stalled or cannot keep up, new
+records are dropped and counted: calls are never slowed down to save a
+record.
+"""
+
+import asyncio
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+from typing import IO, Optional
+
+CDR_FIELDS = ("flow", "last_menu", "last_digit", "last_pnr", "last_train")
+
+
+class _Pending:
+    """Details of the current request, filled in by the handler via note_call()."""
+
+    __slots__ = ("noted", "call_sid", "digits", "speech", "flow")
+
+    def __init__(self):
+        self.noted = False
+        self.call_sid = None
+        self.digits = None
+        self.speech = None
+        self.flow = None
+
+
+_pending: ContextVar[Optional[_Pending]] = ContextVar("ivr_journal_pending", default=None)
+
+
+def note_call(
+    call_sid: Optional[str] = None,
+    digits: Optional[str] = None,
+    speech: Optional[str] = None,
+    flow: Optional[str] = None,
+) -> None:
+    """
+    Describe the webhook being handled; the journal middleware records it
+    when the response is sent. Can be called more than once (later values
+    win) and is a no-op when the journal is off.
+    """
+    pending = _pending.get()
+    if pending is None:
+        return
+    pending.noted = True
+    if call_sid is not None:
+        pending.call_sid = call_sid
+    if digits is not None:
+        pending.digits = digits
+    if speech is not None:
+        pending.speech = speech
+    if flow is not None:
+        pending.flow = flow
+
+
+# ─────────────────────────────────────────────
+# Journal
+# ─────────────────────────────────────────────
+
+class CallJournal:
+    """
+    Ring buffer of at most `capacity` records, drained by run() in batches
+    of up to `batch` at least every `interval` seconds. Segments roll over
+    after `segment_bytes` or `segment_seconds`. Recording must happen on
+    the event-loop thread; only the file writes run elsewhere.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        capacity: int = 65_536,
+        batch: int = 4_096,
+        interval: float = 0.25,
+        segment_bytes: int = 64 * 2**20,
+        segment_seconds: float = 3_600,
+    ):
+        self.directory = directory
+        self.capacity = capacity
+        self.batch = batch
+        self.interval = interval
+        self.segment_bytes = segment_bytes
+        self.segment_seconds = segment_seconds
+        self._buffer: deque = deque()
+        self._wakeup: Optional[asyncio.Event] = None
+        self.records = {"event": 0, "cdr": 0}      # accepted into the buffer
+        self.dropped = {"event": 0, "cdr": 0}      # refused: buffer full
+        self.written = 0
+        self.lost = 0                              # taken from the buffer, write failed
+        self.write_errors = 0
+        self.segments = 0
+        self.last_error: Optional[str] = None
+        # Writer-thread state
+        self._lock = threading.Lock()
+        self._file: Optional[IO[bytes]] = None
+        self._file_size = 0
+        self._file_opened = 0.0
+        os.makedirs(directory, exist_ok=True)
+
+    # ── Recording (event loop) ────────────────
+
+    def _append(self, kind: str, record: tuple) -> bool:
+        if len(self._buffer) >= self.capacity:
+            self.dropped[kind] += 1
+            return False
+        self._buffer.append(record)
+        self.records[kind] += 1
+        if len(self._buffer) >= self.batch and self._wakeup is not None:
+            self._wakeup.set()
+        return True
+
+    def event(
+        self, call_sid: Optional[str], route: str, digits: Optional[str],
+        speech: Optional[str], flow: Optional[str], status: int, seconds: float,
+    ) -> bool:
+        """Record one webhook; False if it was dropped."""
+        return self._append(
+            "event", ("event", time.time(), call_sid, route, digits, speech, flow, status, seconds)
+        )
+
+    def session_closed(self, call_sid: str, session, reason: str) -> bool:
+        """
+        Session backend `on_close` hook: record the call's CDR. `reason` is
+        "ended" or "expired".
+        """
+        return self._append("cdr", ("cdr", time.time(), call_sid, reason, session.to_dict()))
+
+    def buffered(self) -> int:
+        return len(self._buffer)
+
+    # ── Draining ──────────────────────────────
+
+    async def run(self) -> None:
+        """Drain the buffer to disk until cancelled (close() writes the rest)."""
+        self._wakeup = asyncio.Event()
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            while self._buffer:
+                await asyncio.to_thread(self._write, self._take())
+
+    def _take(self) -> list[tuple]:
+        buffer = self._buffer
+        return [buffer.popleft() for _ in range(min(self.batch, len(buffer)))]
+
+    def close(self) -> None:
+        """Write whatever is still buffered and close the current segment."""
+        while self._buffer:
+            self._write(self._take())
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    # ── Writing (worker thread) ───────────────
+
+    def _write(self, records: list[tuple]) -> None:
+        data = "".join(
+            json.dumps(_as_json(record), separators=(",", ":"), ensure_ascii=False) + "\n"
+            for record in records
+        ).encode("utf-8")
+        with self._lock:
+            try:
+                fh = self._segment(len(data))
+                fh.write(data)
+                fh.flush()
+                self._file_size += len(data)
+                self.written += len(records)
+            except OSError as exc:
+                self.write_errors += 1
+                self.lost += len(records)
+                self.last_error = str(exc)
+
+    def _segment(self, size: int) -> IO[bytes]:
+        """The segment to append `size` bytes to, rolling over when due."""
+        now = time.time()
+        if self._file is not None and (
+            self._file_size + size > self.segment_bytes
+            or now - self._file_opened >= self.segment_seconds
+        ):
+            self._file.close()
+            self._file = None
+        if self._file is None:
+            self.segments += 1
+            stamp = time.strftime("%Y%m%d-%H%M%S", time.gmtime(now))
+            name = f"journal-{stamp}-{os.getpid()}-{self.segments:04d}.jsonl"
+            self._file = open(os.path.join(self.directory, name), "ab")
+            self._file_size = 0
+            self._file_opened = now
+        return self._file
+
+    def stats(self) -> dict:
+        return {
+            "records":      dict(self.records),
+            "dropped":      dict(self.dropped),
+            "buffered":     len(self._buffer),
+            "written":      self.written,
+            "lost":         self.lost,
+            "write_errors": self.write_errors,
+            "segments":     self.segments,
+        }
+
+
+def _as_json(record: tuple) -> dict:
+    if record[0] == "event":
+        _, t, call_sid, route, digits, speech, flow, status, seconds = record
+        line = {"type": "event", "t": round(t, 3), "call": call_sid, "route": route,
+                "digits": digits, "flow": flow, "status": status,
+                "ms": round(seconds * 1e3, 3)}
+        if speech is not None:
+            line["speech"] = speech
+        return line
+    _, t, call_sid, reason, session = record
+    return {
+        "type": "cdr", "t": round(t, 3), "call": call_sid, "reason": reason,
+        "caller": session["caller"], "start": round(session["created_at"], 3),
+        "end": round(session["updated_at"], 3),
+        "duration": round(session["updated_at"] - session["created_at"], 3),
+        **{name: session[name] for name in CDR_FIELDS},
+    }
+
+
+# ─────────────────────────────────────────────
+# ASGI middleware
+# ─────────────────────────────────────────────
+
+class JournalMiddleware:
+    """
+    Pure ASGI middleware: times each request and, if the handler called
+    note_call(), records it as one event once the response has started.
+    """
+
+    def __init__(self, app, journal: CallJournal):
+        self.app = app
+        self.journal = journal
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        pending = _Pending()
+        token = _pending.set(pending)
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _pending.reset(token)
+            if pending.noted:
+                self.journal.event(
+                    pending.call_sid, scope["path"], pending.digits, pending.speech,
+                    pending.flow, status, time.perf_counter() - start,
+                )
@@ -0,0 +1,197 @@
+"""
+IRCTC Conversational IVR - PNR Change Feed
+Applies PNR status updates (charting, waitlist and RAC movement …) to the
+live data store without a restart, from either source:
+
+    IVR_UPDATE_LOG=updates.jsonl python main.py        # tail an append-only log
+    POST /admin/pnr-updates  [{"pnr": "4521987630", "status": "RAC — RAC 2"}]
+
+An update is a partial record: "pnr" plus the fields that changed (a PNR
+not in the store needs every field the IVR reads out). A log line holds
+one update, or a JSON list of updates applied as one batch.
+
+Records are never modified in place: each update builds a new record from
+the current one (copy-on-write) and swaps it into the store, so a request
+that already read a record keeps a consistent snapshot. A batch is
+validated in full, then installed without yielding to the event loop, so
+requests see all of it or none of it and never wait on a lock. Cached
+lookups of the affected PNRs are invalidated as each record is swapped in.
+"""
+
+import asyncio
+import json
+import os
+from typing import Iterable, Optional
+
+import data_store
+
+PNR_FIELDS = (
+    "pnr", "train_name", "train_number", "from_station", "to_station",
+    "journey_date", "status", "coach", "berth", "passenger", "mobile", "class",
+)
+# Fields read out on a call; a new PNR must come with all of them.
+REQUIRED_FIELDS = (
+    "train_name", "train_number", "from_station", "to_station",
+    "journey_date", "status", "coach", "berth",
+)
+_KNOWN_FIELDS = frozenset(PNR_FIELDS)
+
+
+class UpdateError(ValueError):
+    """A batch was rejected; `problems` lists every invalid update."""
+
+    def __init__(self, problems: list[str]):
+        super().__init__("; ".join(problems))
+        self.problems = problems
+
+
+# ─────────────────────────────────────────────
+# Validation
+# ─────────────────────────────────────────────
+
+def prepare_batch(updates: Iterable) -> dict[str, dict]:
+    """
+    Validate `updates` and build the new records, {pnr: record}, without
+    touching the store; later updates to the same PNR build on earlier
+    ones. Raises UpdateError listing every problem.
+    """
+    records: dict[str, dict] = {}
+    problems = []
+    for i, update in enumerate(updates):
+        if not isinstance(update, dict):
+            problems.append(f"update {i}: not an object")
+            continue
+        pnr = update.get("pnr")
+        if not isinstance(pnr, str) or len(pnr) != 10 or not pnr.isdigit():
+            problems.append(f"update {i}: pnr must be a 10-digit string")
+            continue
+        unknown = sorted(update.keys() - _KNOWN_FIELDS)
+        if unknown:
+            problems.append(f"update {i} ({pnr}): unknown field(s) {', '.join(unknown)}")
+            continue
+        if not all(isinstance(value, str) for value in update.values()):
+            problems.append(f"update {i} ({pnr}): field values must be strings")
+            continue
+        train = update.get("train_number")
+        if train is not None and (len(train) != 5 or not train.isdigit()):
+            problems.append(f"update {i} ({pnr}): train_number must be 5 digits")
+            continue
+
+        current = records.get(pnr) or data_store._fetch_pnr(pnr)
+        if current is None:
+            missing = [name for name in REQUIRED_FIELDS if not update.get(name)]
+            if missing:
+                problems.append(f"update {i} ({pnr}): new PNR lacks {', '.join(missing)}")
+                continue
+            current = {}
+        records[pnr] = {**current, **update}
+
+    if problems:
+        raise UpdateError(problems)
+    return records
+
+
+# ─────────────────────────────────────────────
+# Feed
+# ─────────────────────────────────────────────
+
+class ChangeFeed:
+    """
+    Applies update batches to data_store, from the batch API or by tailing
+    a log. Must be used from the event-loop thread that serves requests:
+    installing a batch has no await in it, which is what makes it atomic.
+    """
+
+    def __init__(self, chunk: int = 200):
+        self.chunk = chunk            # updates installed per event-loop slice (~2 ms)
+        self.applied = 0
+        self.batches = 0
+        self.rejected = 0
+        self.last_error: Optional[str] = None
+
+    def apply(self, updates: Iterable) -> int:
+        """Apply one batch atomically; returns the number of PNRs changed."""
+        try:
+            records = prepare_batch(updates)
+        except UpdateError as exc:
+            self._reject(len(exc.problems), str(exc))
+            raise
+        self._install(records)
+        return len(records)
+
+    def _install(self, records: dict[str, dict]) -> None:
+        for record in records.values():
+            data_store.put_pnr(record)
+        self.applied += len(records)
+        self.batches += 1
+
+    def _reject(self, count: int, error: str) -> None:
+        self.rejected += count
+        self.last_error = error
+
+    # ── Log tailing ───────────────────────────
+
+    async def tail(self, path: str, interval: float = 0.25) -> None:
+        """
+        Follow an append-only JSONL log until cancelled. The log is replayed
+        from the start (the store always starts from its base data), then
+        polled every `interval` seconds. A truncated or replaced file is
+        read again from the start; a partly written last line waits for
+        the next poll.
+        """
+        position = (0, 0)
+        while True:
+            try:
+                lines, position = await asyncio.to_thread(_read_appended, path, position)
+            except OSError as exc:
+                self.last_error = f"{path}: {exc}"
+                lines = []
+            if lines:
+                await self.apply_lines(lines)
+            await asyncio.sleep(interval)
+
+    async def apply_lines(self, lines: list[bytes]) -> None:
+        """
+        Apply raw log lines in order. Each line is atomic; a bad line is
+        counted and skipped. Lines are parsed and installed in slices of
+        about `chunk` updates with a yield in between, so a backlog never
+        stalls calls.
+        """
+        since_yield = 0
+        for raw in lines:
+            try:
+                line = json.loads(raw)
+            except ValueError as exc:
+                self._reject(1, f"bad log line {raw[:40]!r}: {exc}")
+                continue
+            updates = line if isinstance(line, list) else [line]
+            try:
+                records = prepare_batch(updates)
+            except UpdateError as exc:
+                self._reject(len(exc.problems), str(exc))
+                continue
+            self._install(records)
+            since_yield += len(records)
+            if since_yield >= self.chunk:
+                since_yield = 0
+                await asyncio.sleep(0)
+
+
+def _read_appended(path: str, position: tuple[int, int]) -> tuple[list, tuple[int, int]]:
+    """
+    Complete, non-blank lines appended since `position` ((inode, offset)).
+    Runs in a worker thread, so file I/O never blocks the loop.
+    """
+    try:
+        fh = open(path, "rb")
+    except FileNotFoundError:
+        return [], (0, 0)
+    with fh:
+        inode = os.fstat(fh.fileno()).st_ino
+        size = os.fstat(fh.fileno()).st_size
+        offset = position[1] if position[0] == inode and position[1] <= size else 0
+        fh.seek(offset)
+        data = fh.read(size - offset)
+    end = data.rfind(b"\n") + 1
+    lines = [line for line in data[:end].split(b"\n") if line.strip()]
+    return lines, (inode, offset + end)
@@ -0,0 +1,228 @@
+"""
+IRCTC Conversational IVR - Multi-worker Launch Mode
+Runs N single-process app workers, each with its own in-memory
+SessionManager, behind a thin router that pins every Twilio CallSid to
+one worker with a consistent-hash ring.
+
+    python main.py --workers 4 --port 8000
+
+All webhooks of a call land on the same worker, so sessions need no
+shared store. State every worker holds a copy of (PNR update batches)
+is changed through every worker. Routers are stateless (the ring is a pure function of the
+worker list), so several can share the public port via SO_REUSEPORT.
+"""
+
+import asyncio
+import bisect
+import hashlib
+import itertools
+import json
+import multiprocessing
+import os
+import socket
+import subprocess
+import sys
+import time
+from http import HTTPStatus
+from typing import Optional
+
+from fastpath import asgi_target
+from http_pool import HttpConnectionPool, HttpError, read_headers
+
+_HOP_BY_HOP = {"connection", "keep-alive", "transfer-encoding", "content-length", "host"}
+# Requests for every worker rather than one: each holds its own copy of the data.
+_BROADCAST_PATHS = {"/admin/pnr-updates"}
+
+
+# ─────────────────────────────────────────────
+# Consistent hashing
+# ─────────────────────────────────────────────
+
+def _hash(key: str) -> int:
+    return int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+class HashRing:
+    """
+    Consistent-hash ring with `vnodes` virtual points per node, so adding
+    or removing a worker only remaps ~1/N of the calls.
+    """
+
+    def __init__(self, nodes: list, vnodes: int = 160):
+        points = sorted((_hash(f"{node}#{i}"), node) for node in nodes for i in range(vnodes))
+        self._hashes = [point for point, _ in points]
+        self._nodes = [node for _, node in points]
+
+    def node_for(self, key: str):
+        index = bisect.bisect(self._hashes, _hash(key)) % len(self._hashes)
+        return self._nodes[index]
+
+
+def call_sid_from_form(body: bytes) -> Optional[str]:
+    """Pull CallSid out of an urlencoded Twilio body without a full parse."""
+    for pair in body.split(b"&"):
+        if pair.startswith(b"CallSid="):
+            return pair[8:].decode("ascii", "replace")
+    return None
+
+
+# ─────────────────────────────────────────────
+# Router
+# ─────────────────────────────────────────────
+
+def merge_broadcast(replies: dict[int, tuple[int, dict, bytes]]) -> tuple[int, dict, bytes]:
+    """
+    One answer to a request sent to every worker: the first worker's if
+    they all answered alike (all succeeded, or all rejected it), else 502
+    with each worker's status, as the workers now disagree.
+    """
+    statuses = {status for status, _, _ in replies.values()}
+    if len(statuses) == 1:
+        return next(iter(replies.values()))
+    body = json.dumps({
+        "detail": "not applied by every worker",
+        "workers": {str(port): status for port, (status, _, _) in replies.items()},
+    }).encode("utf-8")
+    return 502, {"content-type": "application/json"}, body
+
+
+async def serve_router(host: str, port: int, worker_ports: list[int], reuse_port: bool = False):
+    """Accept public traffic and forward each request to its CallSid's worker."""
+    pools = {p: HttpConnectionPool("127.0.0.1", p, max_connections=256) for p in worker_ports}
+    ring = HashRing(worker_ports)
+    round_robin = itertools.cycle(worker_ports)
+
+    async def forward(worker: int, method: str, path: str, body: bytes, headers: dict) -> tuple:
+        try:
+            return await pools[worker].request(method, path, body, headers)
+        except HttpError:
+            return 502, {}, b"worker unavailable"
+
+    async def on_connection(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path, _ = request_line.decode("latin-1").split(" ", 2)
+                headers = await read_headers(reader)
+                length = int(headers.get("content-length", "0"))
+                body = await reader.readexactly(length) if length else b""
+
+                forwarded = {k: v for k, v in headers.items() if k not in _HOP_BY_HOP}
+                if path in _BROADCAST_PATHS:
+                    replies = await asyncio.gather(*(
+                        forward(worker, method, path, body, forwarded) for worker in worker_ports
+                    ))
+                    reply = merge_broadcast(dict(zip(worker_ports, replies)))
+                else:
+                    call_sid = call_sid_from_form(body)
+                    worker = ring.node_for(call_sid) if call_sid else next(round_robin)
+                    reply = await forward(worker, method, path, body, forwarded)
+                status, resp_headers, resp_body = reply
+
+                head = [f"HTTP/1.1 {status} {HTTPStatus(status).phrase}"]
+                head += [
+                    f"{k}: {v}" for k, v in resp_headers.items() if k not in _HOP_BY_HOP
+                ]
+                head.append(f"content-length: {len(resp_body)}")
+                writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + resp_body)
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    server = await asyncio.start_server(on_connection, host, port, reuse_port=reuse_port)
+    async with server:
+        await server.serve_forever()
+
+
+def _router_process(host: str, port: int, worker_ports: list[int]) -> None:
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
+    asyncio.run(serve_router(host, port, worker_ports, reuse_port=True))
+
+
+# ─────────────────────────────────────────────
+# Process supervision
+# ─────────────────────────────────────────────
+
+def _wait_until_listening(port: int, timeout: float = 20.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.2):
+                return
+        except OSError:
+            time.sleep(0.05)
+    raise RuntimeError(f"worker on port {port} did not start")
+
+
+class Cluster:
+    """Handle on a running set of workers and routers."""
+
+    def __init__(self, workers: list[subprocess.Popen], routers: list[multiprocessing.Process]):
+        self.workers = workers
+        self.routers = routers
+
+    def stop(self) -> None:
+        for router in self.routers:
+            router.terminate()
+        for worker in self.workers:
+            worker.terminate()
+        for router in self.routers:
+            router.join(5)
+        for worker in self.workers:
+            worker.wait(5)
+
+
+def start_cluster(
+    workers: int,
+    host: str = "0.0.0.0",
+    port: int = 8000,
+    base_port: int = 9100,
+    routers: Optional[int] = None,
+) -> Cluster:
+    """
+    Start `workers` uvicorn processes on base_port.. (loopback only) and
+    `routers` router processes on host:port (default: one per two workers).
+    """
+    worker_ports = [base_port + i for i in range(workers)]
+    here = os.path.dirname(os.path.abspath(__file__))
+    procs = [
+        subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", asgi_target(), "--host", "127.0.0.1",
+             "--port", str(p), "--log-level", "warning", "--no-access-log"],
+            cwd=here,
+        )
+        for p in worker_ports
+    ]
+    for p in worker_ports:
+        _wait_until_listening(p)
+
+    ctx = multiprocessing.get_context("spawn")
+    router_procs = [
+        ctx.Process(target=_router_process, args=(host, port, worker_ports), daemon=True)
+        for _ in range(routers or max(1, workers // 2))
+    ]
+    for router in router_procs:
+        router.start()
+    _wait_until_listening(port)
+    return Cluster(procs, router_procs)
+
+
+def run_cluster(workers: int, host: str = "0.0.0.0", port: int = 8000) -> None:
+    """Start a cluster and block until interrupted."""
+    cluster = start_cluster(workers, host, port)
+    print(f"IRCTC IVR: {workers} workers behind CallSid router on {host}:{port}")
+    try:
+        while all(w.poll() is None for w in cluster.workers):
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        cluster.stop()
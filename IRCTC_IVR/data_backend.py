@@ -0,0 +1,301 @@
+"""
+IRCTC Conversational IVR - Async Data Backends
+Non-blocking PNR / train lookups for the webhook handlers.
+
+A DataBackend does the raw I/O; DataService sits in front of it and adds
+the data_store lookup caches, single-flight request coalescing and a
+per-call timeout, so a slow upstream turns into a spoken "try later"
+instead of a hung Twilio webhook.
+"""
+
+import asyncio
+import json
+from typing import Any, Awaitable, Callable, Optional, Protocol, TypeVar
+
+import data_store
+from http_pool import HttpConnectionPool, HttpError, read_headers
+
+_T = TypeVar("_T")
+
+
+class BackendUnavailable(Exception):
+    """The backend timed out or failed; callers should apologise and move on."""
+
+
+class DataBackend(Protocol):
+    """Async source of PNR records and train schedules."""
+
+    async def fetch_pnr(self, pnr: str) -> Optional[dict]: ...
+
+    async def fetch_train(self, train_number: str) -> Optional[dict]: ...
+
+    async def fetch_caller_pnrs(self, caller: str) -> list[str]:
+        """PNRs booked with a caller_key() phone number, latest journey first."""
+        ...
+
+    async def fetch_correction(self, kind: str, key: str) -> Optional[str]:
+        """A known "pnr" / "train" number one keying slip away from `key`."""
+        ...
+
+    async def close(self) -> None: ...
+
+
+# ─────────────────────────────────────────────
+# Backend implementations
+# ─────────────────────────────────────────────
+
+class InMemoryBackend:
+    """Serves data_store's active store (mock dicts or a mapped store file)."""
+
+    async def fetch_pnr(self, pnr: str) -> Optional[dict]:
+        return data_store._fetch_pnr(pnr)
+
+    async def fetch_train(self, train_number: str) -> Optional[dict]:
+        return data_store._fetch_train(train_number)
+
+    async def fetch_caller_pnrs(self, caller: str) -> list[str]:
+        return [record["pnr"] for record in data_store.recent_pnrs_for_caller(caller)]
+
+    async def fetch_correction(self, kind: str, key: str) -> Optional[str]:
+        return _CORRECTORS[kind](key)
+
+    async def close(self) -> None:
+        pass
+
+
+class HttpBackend:
+    """
+    JSON-over-HTTP backend using a pool of keep-alive connections.
+
+    Expects `GET /pnr/<pnr>` and `GET /train/<number>` to return the record
+    as JSON (200) or 404 when unknown, `GET /caller/<mobile>` the caller's
+    recent PNR numbers as a JSON list, and `GET /correct/<pnr|train>/<key>`
+    the corrected number as a JSON string (404 when there is none) — the
+    contract served by serve_standin() below.
+    """
+
+    def __init__(self, host: str, port: int, max_connections: int = 20):
+        self._pool = HttpConnectionPool(host, port, max_connections)
+
+    async def fetch_pnr(self, pnr: str) -> Optional[dict]:
+        return await self._get(f"/pnr/{pnr}")
+
+    async def fetch_train(self, train_number: str) -> Optional[dict]:
+        return await self._get(f"/train/{train_number}")
+
+    async def fetch_caller_pnrs(self, caller: str) -> list[str]:
+        return await self._get(f"/caller/{caller}") or []
+
+    async def fetch_correction(self, kind: str, key: str) -> Optional[str]:
+        return await self._get(f"/correct/{kind}/{key}")
+
+    async def _get(self, path: str) -> Any:
+        """The decoded JSON body (a record, list or string), or None on 404."""
+        status, _, body = await self._pool.request("GET", path)
+        if status == 404:
+            return None
+        if status != 200:
+            raise HttpError(f"GET {path} returned {status}")
+        return json.loads(body)
+
+    async def close(self) -> None:
+        await self._pool.close()
+
+
+_CORRECTORS = {"pnr": data_store.correct_pnr, "train": data_store.correct_train}
+
+
+def backend_from_address(address: Optional[str]) -> DataBackend:
+    """
+    Build a DataBackend from an IVR_DATA_BACKEND value:
+        None / ""               → in-memory mock data (or a mapped store)
+        host:port               → JSON-over-HTTP backend
+    """
+    if not address:
+        return InMemoryBackend()
+    host, _, port = address.rpartition(":")
+    return HttpBackend(host, int(port))
+
+
+# ─────────────────────────────────────────────
+# Caching / coalescing front
+# ─────────────────────────────────────────────
+
+class DataService:
+    """
+    Async lookups through a DataBackend.
+
+    - Results go through the same LookupCaches as data_store's synchronous
+      lookups, so invalidate_pnr()/invalidate_train() apply to both.
+    - Concurrent lookups of the same key share one backend request, unless
+      the key's cache was invalidated in between (a fresher read is needed).
+    - Each backend request is bounded by `timeout` seconds; timeouts and
+      backend errors raise BackendUnavailable.
+    """
+
+    def __init__(self, backend: DataBackend, timeout: float = 2.0):
+        self.backend = backend
+        self.timeout = timeout
+        self._inflight: dict[tuple[str, str], tuple[asyncio.Future, Optional[int]]] = {}
+        self.backend_requests = 0
+        self.coalesced = 0
+
+    async def get_pnr_status(self, pnr: str) -> Optional[dict]:
+        pnr = pnr.strip()
+        return await self._lookup("pnr", pnr, data_store.pnr_cache(), self.backend.fetch_pnr)
+
+    async def get_train_info(self, train_number: str) -> Optional[dict]:
+        train_number = train_number.strip()
+        return await self._lookup(
+            "train", train_number, data_store.train_cache(), self.backend.fetch_train
+        )
+
+    async def _lookup(
+        self,
+        kind: str,
+        key: str,
+        cache: Optional[data_store.LookupCache],
+        fetch: Callable[[str], Awaitable[Optional[dict]]],
+    ) -> Optional[dict]:
+        if cache is not None:
+            value = cache.get(key)
+            if value is not cache.MISSING:
+                return value
+
+        # A fetch is shared only if it started after the last invalidation
+        # (e.g. a PNR update); otherwise its result may predate the update.
+        generation = cache.generation if cache is not None else None
+        flight_key = (kind, key)
+        flight = self._inflight.get(flight_key)
+        if flight is not None and flight[1] == generation:
+            task = flight[0]
+            self.coalesced += 1
+        else:
+            task = asyncio.ensure_future(self._fetch(key, cache, fetch, generation))
+            self._inflight[flight_key] = (task, generation)
+            task.add_done_callback(lambda done: self._land(flight_key, done))
+        # shield(): one caller being cancelled must not cancel the shared fetch
+        return await asyncio.shield(task)
+
+    async def _request(self, what: str, request: Awaitable[_T]) -> _T:
+        """One backend request, bounded by the timeout; failures raise BackendUnavailable."""
+        self.backend_requests += 1
+        try:
+            return await asyncio.wait_for(request, self.timeout)
+        except asyncio.TimeoutError as exc:
+            raise BackendUnavailable(f"{what} timed out after {self.timeout}s") from exc
+        except (HttpError, OSError, ValueError) as exc:
+            raise BackendUnavailable(f"{what} failed: {exc}") from exc
+
+    async def _fetch(self, key, cache, fetch, generation) -> Optional[dict]:
+        value = await self._request(f"lookup of {key}", fetch(key))
+        if cache is not None:
+            # Not cached if an invalidation landed while the request was out.
+            cache.put(key, value, generation)
+        return value
+
+    async def get_caller_pnrs(self, caller: Optional[str]) -> list[str]:
+        """
+        Recent PNRs booked with the caller's phone number (uncached: asked
+        once per call). Raises BackendUnavailable like the other lookups.
+        """
+        key = data_store.caller_key(caller)
+        if key is None:
+            return []
+        return await self._request(f"bookings of {key}", self.backend.fetch_caller_pnrs(key))
+
+    async def correct(self, kind: str, key: str) -> Optional[str]:
+        """
+        The known "pnr" / "train" number a not-found `key` was probably
+        mistyped from, or None (uncached: asked only after a miss). Raises
+        BackendUnavailable like the other lookups.
+        """
+        key = key.strip()
+        return await self._request(
+            f"correction of {key}", self.backend.fetch_correction(kind, key)
+        )
+
+    def _land(self, flight_key: tuple[str, str], task: asyncio.Future) -> None:
+        flight = self._inflight.get(flight_key)
+        if flight is not None and flight[0] is task:
+            del self._inflight[flight_key]
+        if not task.cancelled():
+            task.exception()   # mark retrieved; waiters re-raise it themselves
+
+    async def close(self) -> None:
+        await self.backend.close()
+
+
+# ─────────────────────────────────────────────
+# Local HTTP stand-in (for tests and benchmarks)
+# ─────────────────────────────────────────────
+
+class StandinServer:
+    """Handle on a running stand-in server."""
+
+    def __init__(self, server: asyncio.Server):
+        self.server = server
+        self.port: int = server.sockets[0].getsockname()[1]
+        self.requests = 0
+        self.writers: set[asyncio.StreamWriter] = set()
+
+    async def close(self) -> None:
+        self.server.close()
+        for writer in list(self.writers):
+            writer.close()
+        await self.server.wait_closed()
+
+
+async def serve_standin(
+    host: str = "127.0.0.1", port: int = 0, latency: float = 0.0
+) -> StandinServer:
+    """
+    Start a keep-alive HTTP server that serves data_store's mock records
+    under the HttpBackend contract. `latency` adds an artificial delay to
+    every response; port 0 picks a free port (see StandinServer.port).
+    """
+    handle: Optional[StandinServer] = None
+
+    async def on_connection(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        handle.writers.add(writer)
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                await read_headers(reader)
+                handle.requests += 1
+                _, path, _ = request_line.decode("latin-1").split(" ", 2)
+                _, kind, key = (path.split("/", 2) + ["", ""])[:3]
+                if kind == "caller":
+                    record = [r["pnr"] for r in data_store.recent_pnrs_for_caller(key)]
+                elif kind == "correct":
+                    kind, _, key = key.partition("/")
+                    corrector = _CORRECTORS.get(kind)
+                    record = corrector(key) if corrector is not None else None
+                else:
+                    db = {"pnr": data_store._PNR_STORE, "train": data_store._TRAIN_STORE}
+                    record = db.get(kind, {}).get(key)
+                if latency:
+                    await asyncio.sleep(latency)
+                if record is None:
+                    status, body = "404 Not Found", b'{"error": "not found"}'
+                else:
+                    status, body = "200 OK", json.dumps(record).encode("utf-8")
+                writer.write(
+                    f"HTTP/1.1 {status}\r\nContent-Type: application/json\r\n"
+                    f"Content-Length: {len(body)}\r\n\r\n".encode("latin-1") + body
+                )
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except asyncio.CancelledError:
+            # Loop shutdown; ending quietly keeps asyncio's stream callback
+            # from logging the cancellation as an unhandled error.
+            pass
+        finally:
+            handle.writers.discard(writer)
+            writer.close()
+
+    handle = StandinServer(await asyncio.start_server(on_connection, host, port))
+    return handle
@@ -5,11 +5,16 @@ Mock database for PNR records and train schedules.
 In production, replace the dictionary lookups with actual DB / IRCTC API calls.
 """
 
-from typing import Optional
+import os
+import time
+from collections import OrderedDict
+from datetime import date, datetime
+from typing import Callable, Hashable, Iterable, Iterator, Mapping, Optional
 
 # ─────────────────────────────────────────────
 # Mock PNR Database
-# Keys are 10-digit PNR strings.
+# Keys are 10-digit PNR strings; "mobile" is the phone number the booking
+# was made with.
 # ─────────────────────────────────────────────
 _PNR_DB: dict[str, dict] = {
     "2154673890": {
@@ -23,6 +28,7 @@ _PNR_DB: dict[str, dict] = {
         "coach":         "A1",
         "berth":         "23, Lower",
         "passenger":     "Mr. Ramesh Sharma",
+        "mobile":        "9123456701",
         "class":         "1A",
     },
     "4521987630": {
@@ -36,6 +42,7 @@ _PNR_DB: dict[str, dict] = {
         "coach":         "Not Assigned",
         "berth":         "Not Assigned",
         "passenger":     "Ms. Priya Verma",
+        "mobile":        "9123456702",
         "class":         "CC",
     },
     "7893214560": {
@@ -49,6 +56,7 @@ _PNR_DB: dict[str, dict] = {
         "coach":         "B3",
         "berth":         "47, Side Upper",
         "passenger":     "Mr. Anil Kumar",
+        "mobile":        "9123456703",
         "class":         "SL",
     },
     "3347821905": {
@@ -62,6 +70,7 @@ _PNR_DB: dict[str, dict] = {
         "coach":         "C1",
         "berth":         "RAC 2",
         "passenger":     "Dr. Sunita Patel",
+        "mobile":        "9123456704",
         "class":         "CC",
     },
     "9012345678": {
@@ -75,6 +84,7 @@ _PNR_DB: dict[str, dict] = {
         "coach":         "GR-3",
         "berth":         "12, Upper",
         "passenger":     "Mr. Vikas Singh",
+        "mobile":        "9123456705",
         "class":         "3A",
     },
 }
@@ -160,6 +170,458 @@ _TRAIN_DB: dict[str, dict] = {
 }
 
 
+# ─────────────────────────────────────────────
+# Secondary indexes
+# ─────────────────────────────────────────────
+
+def station_key(name: str) -> str:
+    """Normalised station name used by the indexes ("kota  JUNCTION" → "kota junction")."""
+    return " ".join(name.split()).casefold()
+
+
+def caller_key(number: Optional[str]) -> Optional[str]:
+    """
+    Normalised phone number used by the caller index: its last 10 digits
+    ("+91 91234-56701" → "9123456701"), or None for anything shorter.
+    """
+    digits = "".join(ch for ch in number or "" if ch.isdigit())
+    return digits[-10:] if len(digits) >= 10 else None
+
+
+class RailwayIndex:
+    """
+    Secondary indexes over the train and PNR stores:
+
+        station → {train number: position on its route}   (every call)
+        station → trains originating / terminating there
+        station → trains with an intermediate halt there
+        train number → PNRs booked on it
+        caller (phone number) → PNRs booked with it
+
+    Postings are dicts used as ordered sets, so membership and removal are
+    O(1) and queries are lazy generators over them. Writes replace the
+    affected posting dicts instead of mutating them (copy-on-write), so a
+    query iterating a posting is never disturbed by a concurrent update;
+    timetable writes are rare, lookups are not.
+
+    The records themselves stay in the stores passed in; the index only
+    holds keys. For a store too large to scan at startup, pass
+    `base_pnrs_by_train` (train number → PNR numbers, e.g. from a mapped
+    store file) and optionally `base_pnrs_by_caller` (caller_key → PNR
+    numbers): existing PNRs are then not scanned, and only PNRs added
+    later are indexed here.
+    """
+
+    def __init__(
+        self,
+        trains: Mapping[str, dict],
+        pnrs: Mapping[str, dict],
+        base_pnrs_by_train: Optional[Callable[[str], Iterable[str]]] = None,
+        base_pnrs_by_caller: Optional[Callable[[str], Iterable[str]]] = None,
+    ):
+        self._trains = trains
+        self._pnrs = pnrs
+        self._base_pnrs_by_train = base_pnrs_by_train
+        self._base_pnrs_by_caller = base_pnrs_by_caller
+        self._routes: dict[str, tuple[str, ...]] = {}
+        self._calls_at: dict[str, dict[str, int]] = {}
+        self._sources: dict[str, dict[str, None]] = {}
+        self._destinations: dict[str, dict[str, None]] = {}
+        self._halts: dict[str, dict[str, None]] = {}
+        self._pnr_train: dict[str, str] = {}
+        self._pnrs_by_train: dict[str, dict[str, None]] = {}
+        self._pnr_caller: dict[str, Optional[str]] = {}
+        self._pnrs_by_caller: dict[str, dict[str, None]] = {}
+        # Nothing can be iterating postings yet, so build them in place.
+        self._add = _posting_add_in_place
+        for record in trains.values():
+            self.add_train(record)
+        if base_pnrs_by_train is None:
+            for record in pnrs.values():
+                self.add_pnr(record)
+        self._add = _posting_add
+
+    # ── Maintenance ───────────────────────────
+
+    def add_train(self, record: dict) -> None:
+        """Index (or re-index) a train record; the store is not touched."""
+        number = record["number"]
+        if number in self._routes:
+            self.remove_train(number)
+        halts = [station_key(stop["station"]) for stop in record.get("stops", ())]
+        route = (station_key(record["source"]), *halts, station_key(record["destination"]))
+        self._routes[number] = route
+        for position, station in enumerate(route):
+            # A station visited twice keeps its first position.
+            if number not in self._calls_at.get(station, ()):
+                self._add(self._calls_at, station, number, position)
+        self._add(self._sources, route[0], number)
+        self._add(self._destinations, route[-1], number)
+        for station in halts:
+            self._add(self._halts, station, number)
+
+    def remove_train(self, number: str) -> None:
+        route = self._routes.pop(number, None)
+        if route is None:
+            return
+        for station in route:
+            _posting_discard(self._calls_at, station, number)
+        _posting_discard(self._sources, route[0], number)
+        _posting_discard(self._destinations, route[-1], number)
+        for station in route[1:-1]:
+            _posting_discard(self._halts, station, number)
+
+    def add_pnr(self, record: dict) -> None:
+        """Index (or re-index) a PNR record under its train number and caller."""
+        pnr = record["pnr"]
+        caller = caller_key(record.get("mobile"))
+        if self._pnr_train.get(pnr) == record["train_number"] and (
+            self._pnr_caller.get(pnr) == caller
+        ):
+            return        # status updates keep train and caller: postings unchanged
+        self.remove_pnr(pnr)
+        self._pnr_train[pnr] = record["train_number"]
+        self._pnr_caller[pnr] = caller
+        self._add(self._pnrs_by_train, record["train_number"], pnr)
+        if caller is not None:
+            self._add(self._pnrs_by_caller, caller, pnr)
+
+    def remove_pnr(self, pnr: str) -> None:
+        train = self._pnr_train.pop(pnr, None)
+        if train is not None:
+            _posting_discard(self._pnrs_by_train, train, pnr)
+        caller = self._pnr_caller.pop(pnr, None)
+        if caller is not None:
+            _posting_discard(self._pnrs_by_caller, caller, pnr)
+
+    # ── Queries (lazy) ────────────────────────
+
+    def trains_from(self, station: str) -> Iterator[dict]:
+        """Trains originating at `station`."""
+        return self._records(self._sources.get(station_key(station), ()))
+
+    def trains_to(self, station: str) -> Iterator[dict]:
+        """Trains terminating at `station`."""
+        return self._records(self._destinations.get(station_key(station), ()))
+
+    def trains_halting_at(self, station: str) -> Iterator[dict]:
+        """Trains with an intermediate halt at `station`."""
+        return self._records(self._halts.get(station_key(station), ()))
+
+    def trains_between(self, origin: str, destination: str) -> Iterator[dict]:
+        """Trains calling at `origin` and, later on the same run, `destination`."""
+        at_origin = self._calls_at.get(station_key(origin), {})
+        at_destination = self._calls_at.get(station_key(destination), {})
+        # Walk the shorter posting and probe the other one.
+        if len(at_origin) <= len(at_destination):
+            return (
+                self._trains[number]
+                for number, position in at_origin.items()
+                if at_destination.get(number, -1) > position
+            )
+        return (
+            self._trains[number]
+            for number, position in at_destination.items()
+            if at_origin.get(number, position) < position
+        )
+
+    def pnrs_for_train(self, train_number: str) -> Iterator[dict]:
+        """PNR records booked on `train_number`."""
+        train_number = train_number.strip()
+        for pnr in self._pnrs_by_train.get(train_number, ()):
+            yield self._pnrs[pnr]
+        if self._base_pnrs_by_train is not None:
+            for pnr in self._base_pnrs_by_train(train_number):
+                if pnr not in self._pnr_train:    # re-indexed since (maybe moved)
+                    yield self._pnrs[pnr]
+
+    def pnrs_for_caller(self, number: Optional[str]) -> Iterator[dict]:
+        """PNR records booked with phone number `number` (in any format)."""
+        key = caller_key(number)
+        if key is None:
+            return
+        for pnr in self._pnrs_by_caller.get(key, ()):
+            yield self._pnrs[pnr]
+        if self._base_pnrs_by_caller is not None:
+            for pnr in self._base_pnrs_by_caller(key):
+                if pnr not in self._pnr_caller:   # re-indexed since (maybe moved)
+                    yield self._pnrs[pnr]
+
+    def stations(self) -> Iterator[str]:
+        """Normalised names of every indexed station."""
+        return iter(self._calls_at)
+
+    def _records(self, numbers) -> Iterator[dict]:
+        return (self._trains[number] for number in numbers)
+
+
+def _posting_add(index: dict, key: str, member: str, value=None) -> None:
+    index[key] = {**index.get(key, {}), member: value}
+
+
+def _posting_add_in_place(index: dict, key: str, member: str, value=None) -> None:
+    posting = index.get(key)
+    if posting is None:
+        posting = index[key] = {}
+    posting[member] = value
+
+
+def _posting_discard(index: dict, key: str, member: str) -> None:
+    posting = index.get(key)
+    if posting is None or member not in posting:
+        return
+    if len(posting) == 1:
+        del index[key]
+    else:
+        index[key] = {k: v for k, v in posting.items() if k != member}
+
+
+# ─────────────────────────────────────────────
+# Active stores
+# ─────────────────────────────────────────────
+# Lookups read _PNR_STORE / _TRAIN_STORE: the dicts above by default, or a
+# memory-mapped store file (see bulk_loader.py) after attach_store().
+
+class _OverlayStore:
+    """Writable mapping over a read-only base; writes shadow base records."""
+
+    def __init__(self, base: Mapping[str, dict]):
+        self.base = base
+        self.overrides: dict[str, dict] = {}
+
+    def get(self, key: str, default=None):
+        record = self.overrides.get(key)
+        return record if record is not None else self.base.get(key, default)
+
+    def __getitem__(self, key: str) -> dict:
+        record = self.get(key)
+        if record is None:
+            raise KeyError(key)
+        return record
+
+    def __setitem__(self, key: str, record: dict) -> None:
+        self.overrides[key] = record
+
+    def __contains__(self, key) -> bool:
+        return key in self.overrides or key in self.base
+
+    def __iter__(self) -> Iterator[str]:
+        yield from self.overrides
+        yield from (key for key in self.base if key not in self.overrides)
+
+    def __len__(self) -> int:
+        return len(self.base) + sum(1 for key in self.overrides if key not in self.base)
+
+    def values(self) -> Iterator[dict]:
+        return (self[key] for key in self)
+
+
+_PNR_STORE: Mapping[str, dict] = _PNR_DB
+_TRAIN_STORE: Mapping[str, dict] = _TRAIN_DB
+_MAPPED_FILE = None
+
+_INDEX = RailwayIndex(_TRAIN_STORE, _PNR_STORE)
+
+
+def attach_store(path: str):
+    """
+    Serve lookups from a store file built by bulk_loader.py instead of the
+    mock dicts. The file is memory-mapped (records are decoded one at a
+    time, on lookup); put_pnr / put_train write to an in-memory overlay.
+    Returns the MappedStore.
+    """
+    global _PNR_STORE, _TRAIN_STORE, _MAPPED_FILE, _INDEX, _EPOCH
+    from bulk_loader import MappedStore
+
+    mapped = MappedStore(path)
+    _PNR_STORE = _OverlayStore(mapped.pnrs)
+    _TRAIN_STORE = _OverlayStore(mapped.trains)
+    _INDEX = RailwayIndex(
+        _TRAIN_STORE, _PNR_STORE,
+        base_pnrs_by_train=mapped.pnrs_for_train, base_pnrs_by_caller=mapped.pnrs_for_caller,
+    )
+    if _MAPPED_FILE is not None:
+        _MAPPED_FILE.close()
+    _MAPPED_FILE = mapped
+    _EPOCH += 1
+    for cache in (_PNR_CACHE, _TRAIN_CACHE):
+        if cache is not None:
+            cache.clear()
+    return mapped
+
+
+# ─────────────────────────────────────────────
+# Lookup cache
+# ─────────────────────────────────────────────
+_MISSING = object()   # cache-miss marker (None is a cacheable "not found")
+
+
+class LookupCache:
+    """
+    Bounded LRU cache with per-entry TTL, sitting in front of a lookup function.
+
+    Found records live for `ttl` seconds; "not found" results are cached too,
+    for the (usually much shorter) `negative_ttl`, so repeated mistyped
+    numbers do not hit the backend on every retry. When the cache holds
+    `max_entries` items, the least recently used one is evicted.
+    """
+
+    MISSING = _MISSING
+
+    def __init__(
+        self,
+        ttl: float,
+        negative_ttl: float = 30.0,
+        max_entries: int = 10_000,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self._clock = clock
+        self._entries: OrderedDict[Hashable, tuple[float, Optional[dict]]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # Bumped by every invalidation: a loader that started before one
+        # passes the generation it saw to put(), which then drops its
+        # possibly stale result.
+        self.generation = 0
+
+    def get(self, key: Hashable):
+        """Return the cached value (possibly None), or LookupCache.MISSING."""
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < self._clock():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return _MISSING
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, key: Hashable, value: Optional[dict],
+            generation: Optional[int] = None) -> None:
+        """
+        Store a lookup result; None is stored as a negative entry. With
+        `generation`, the result is dropped if anything was invalidated
+        since that generation was read.
+        """
+        ttl = self.ttl if value is not None else self.negative_ttl
+        if ttl <= 0 or (generation is not None and generation != self.generation):
+            return
+        self._entries[key] = (self._clock() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def lookup(self, key: Hashable, loader: Callable[[Hashable], Optional[dict]]) -> Optional[dict]:
+        """Return the cached result for `key`, calling `loader` on a miss."""
+        value = self.get(key)
+        if value is _MISSING:
+            value = loader(key)
+            self.put(key, value)
+        return value
+
+    def invalidate(self, key: Hashable) -> None:
+        """Drop a single key (e.g. after a PNR status change)."""
+        self._entries.pop(key, None)
+        self.generation += 1
+
+    def clear(self) -> None:
+        """Drop every entry; counters are kept."""
+        self._entries.clear()
+        self.generation += 1
+
+    def stats(self) -> dict:
+        """Counters for diagnostics."""
+        return {
+            "size":      len(self._entries),
+            "hits":      self.hits,
+            "misses":    self.misses,
+            "evictions": self.evictions,
+        }
+
+
+# PNR status changes with charting, so it is only cached briefly;
+# schedules are effectively static for the day.
+_PNR_CACHE: Optional[LookupCache] = LookupCache(ttl=60.0, negative_ttl=15.0)
+_TRAIN_CACHE: Optional[LookupCache] = LookupCache(ttl=6 * 60 * 60.0, negative_ttl=60.0)
+
+
+def configure_caches(
+    pnr: Optional[LookupCache] = _PNR_CACHE,
+    train: Optional[LookupCache] = _TRAIN_CACHE,
+) -> None:
+    """
+    Swap the lookup caches (pass None to disable caching for that kind).
+    Omitted arguments reset that cache to its default instance.
+    """
+    global _PNR_CACHE, _TRAIN_CACHE
+    _PNR_CACHE, _TRAIN_CACHE = pnr, train
+
+
+def pnr_cache() -> Optional[LookupCache]:
+    """The cache currently in front of PNR lookups (None if disabled)."""
+    return _PNR_CACHE
+
+
+def train_cache() -> Optional[LookupCache]:
+    """The cache currently in front of train lookups (None if disabled)."""
+    return _TRAIN_CACHE
+
+
+# Change counters for records that were replaced or invalidated since
+# startup (other records are at version 0), plus an epoch for swapping the
+# whole store. Caches of anything derived from a record key on its version.
+_PNR_VERSIONS: dict[str, int] = {}
+_TRAIN_VERSIONS: dict[str, int] = {}
+_EPOCH = 0
+
+
+def pnr_version(pnr: str) -> tuple[int, int]:
+    """Version of a PNR record; changes whenever the record may have."""
+    return _EPOCH, _PNR_VERSIONS.get(pnr.strip(), 0)
+
+
+def train_version(train_number: str) -> tuple[int, int]:
+    """Version of a train record; changes whenever the record may have."""
+    return _EPOCH, _TRAIN_VERSIONS.get(train_number.strip(), 0)
+
+
+def invalidate_pnr(pnr: str) -> None:
+    """Forget any cached result for a PNR."""
+    pnr = pnr.strip()
+    _PNR_VERSIONS[pnr] = _PNR_VERSIONS.get(pnr, 0) + 1
+    if _PNR_CACHE is not None:
+        _PNR_CACHE.invalidate(pnr)
+
+
+def invalidate_train(train_number: str) -> None:
+    """Forget any cached result for a train number."""
+    train_number = train_number.strip()
+    _TRAIN_VERSIONS[train_number] = _TRAIN_VERSIONS.get(train_number, 0) + 1
+    if _TRAIN_CACHE is not None:
+        _TRAIN_CACHE.invalidate(train_number)
+
+
+def cache_stats() -> dict:
+    """Hit / miss / eviction counters for each lookup cache."""
+    return {
+        "pnr":   _PNR_CACHE.stats() if _PNR_CACHE is not None else None,
+        "train": _TRAIN_CACHE.stats() if _TRAIN_CACHE is not None else None,
+    }
+
+
+def _fetch_pnr(pnr: str) -> Optional[dict]:
+    return _PNR_STORE.get(pnr)
+
+
+def _fetch_train(train_number: str) -> Optional[dict]:
+    return _TRAIN_STORE.get(train_number)
+
+
 # ─────────────────────────────────────────────
 # Public data-access functions
 # ─────────────────────────────────────────────
@@ -174,7 +636,10 @@ def get_pnr_status(pnr: str) -> Optional[dict]:
     Returns:
         A dict with booking details, or None if not found.
     """
-    return _PNR_DB.get(pnr.strip())
+    pnr = pnr.strip()
+    if _PNR_CACHE is None:
+        return _fetch_pnr(pnr)
+    return _PNR_CACHE.lookup(pnr, _fetch_pnr)
 
 
 def get_train_info(train_number: str) -> Optional[dict]:
@@ -187,14 +652,157 @@ def get_train_info(train_number: str) -> Optional[dict]:
     Returns:
         A dict with schedule details, or None if not found.
     """
-    return _TRAIN_DB.get(train_number.strip())
+    train_number = train_number.strip()
+    if _TRAIN_CACHE is None:
+        return _fetch_train(train_number)
+    return _TRAIN_CACHE.lookup(train_number, _fetch_train)
+
+
+def trains_between(origin: str, destination: str) -> Iterator[dict]:
+    """Trains calling at `origin` and later at `destination` (lazy)."""
+    return _INDEX.trains_between(origin, destination)
+
+
+def trains_from(station: str) -> Iterator[dict]:
+    """Trains originating at `station` (lazy)."""
+    return _INDEX.trains_from(station)
+
+
+def trains_to(station: str) -> Iterator[dict]:
+    """Trains terminating at `station` (lazy)."""
+    return _INDEX.trains_to(station)
+
+
+def trains_halting_at(station: str) -> Iterator[dict]:
+    """Trains with an intermediate halt at `station` (lazy)."""
+    return _INDEX.trains_halting_at(station)
+
+
+def pnrs_for_train(train_number: str) -> Iterator[dict]:
+    """PNR records booked on a train (lazy)."""
+    return _INDEX.pnrs_for_train(train_number)
+
+
+def pnrs_for_caller(number: Optional[str]) -> Iterator[dict]:
+    """PNR records booked with a phone number (lazy)."""
+    return _INDEX.pnrs_for_caller(number)
+
+
+def _journey_day(record: dict) -> date:
+    try:
+        return datetime.strptime(record.get("journey_date", ""), "%d %B %Y").date()
+    except ValueError:
+        return date.min
+
+
+def recent_pnrs_for_caller(number: Optional[str], limit: int = 3) -> list[dict]:
+    """The caller's `limit` bookings with the latest journey dates, latest first."""
+    return sorted(pnrs_for_caller(number), key=_journey_day, reverse=True)[:limit]
+
+
+def railway_index() -> RailwayIndex:
+    """The secondary indexes over the mock stores."""
+    return _INDEX
+
+
+def put_train(record: dict) -> None:
+    """Add or replace a train schedule, keeping indexes and cache in step."""
+    _TRAIN_STORE[record["number"]] = record
+    _INDEX.add_train(record)
+    invalidate_train(record["number"])
+
+
+def put_pnr(record: dict) -> None:
+    """Add or replace a PNR record, keeping indexes and cache in step."""
+    _PNR_STORE[record["pnr"]] = record
+    _INDEX.add_pnr(record)
+    invalidate_pnr(record["pnr"])
+
+
+def iter_pnrs() -> Iterator[str]:
+    """Iterate over known PNR numbers without copying them."""
+    return iter(_PNR_STORE)
+
+
+def iter_trains() -> Iterator[str]:
+    """Iterate over known train numbers without copying them."""
+    return iter(_TRAIN_STORE)
 
 
 def list_all_pnrs() -> list[str]:
     """Return all known PNR numbers (useful for testing)."""
-    return list(_PNR_DB.keys())
+    return list(_PNR_STORE)
 
 
 def list_all_trains() -> list[str]:
     """Return all known train numbers (useful for testing)."""
-    return list(_TRAIN_DB.keys())
+    return list(_TRAIN_STORE)
+
+
+# ─────────────────────────────────────────────
+# Typo correction
+# ─────────────────────────────────────────────
+# A PNR or train number that is not found is usually the right number keyed
+# with one slip: two neighbouring digits swapped, or one digit replaced,
+# most often by a key next to it on the phone keypad. Candidates are probed
+# against the active store in that order, so corrections need no index of
+# their own and see every put_pnr() / put_train() at once.
+
+_KEYPAD = ("123", "456", "789", " 0 ")
+_KEYPAD_AT = {
+    key: (row, col)
+    for row, keys in enumerate(_KEYPAD) for col, key in enumerate(keys) if key != " "
+}
+_NEAR_KEYS = {
+    key: "".join(
+        other for other, (r, c) in _KEYPAD_AT.items() if abs(r - row) + abs(c - col) == 1
+    )
+    for key, (row, col) in _KEYPAD_AT.items()
+}
+_FAR_KEYS = {
+    key: "".join(other for other in "0123456789" if other != key and other not in near)
+    for key, near in _NEAR_KEYS.items()
+}
+
+
+def _one_key_slips(number: str) -> Iterator[str]:
+    """
+    Numbers one keying slip away from `number`, likeliest first: adjacent
+    transpositions, then substitutions by a neighbouring keypad key, then
+    any other substitution (10 × len(number) − 1 candidates at most).
+    """
+    heads = [number[:i] for i in range(len(number))]
+    tails = [number[i + 1:] for i in range(len(number))]
+    for i in range(len(number) - 1):
+        if number[i] != number[i + 1]:
+            yield heads[i] + number[i + 1] + number[i] + tails[i + 1]
+    for keys in (_NEAR_KEYS, _FAR_KEYS):
+        for i, digit in enumerate(number):
+            head, tail = heads[i], tails[i]
+            for other in keys.get(digit, ""):
+                yield head + other + tail
+
+
+def _correct(number: str, store: Mapping[str, dict]) -> Optional[str]:
+    for candidate in _one_key_slips(number):
+        if candidate in store:
+            return candidate
+    return None
+
+
+def correct_pnr(pnr: str) -> Optional[str]:
+    """
+    The likeliest known PNR one keying slip away from `pnr` (a PNR that was
+    not found), or None. At most 99 store probes.
+    """
+    return _correct(pnr.strip(), _PNR_STORE)
+
+
+def correct_train(train_number: str) -> Optional[str]:
+    """The likeliest known train number one keying slip away, or None."""
+    return _correct(train_number.strip(), _TRAIN_STORE)
+
+
+# IVR_DATA_FILE=path serves lookups from a bulk-loaded store file.
+if os.environ.get("IVR_DATA_FILE"):
+    attach_store(os.environ["IVR_DATA_FILE"])
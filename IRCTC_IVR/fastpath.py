@@ -0,0 +1,168 @@
+"""
+IRCTC Conversational IVR - Fast-path Webhook Routing
+Optional raw ASGI front end for the Twilio webhooks.
+
+    IVR_FAST_PATH=1 python main.py
+    uvicorn main:fast_app
+
+Twilio posts short application/x-www-form-urlencoded bodies, and each
+endpoint reads two or three fields from them. Going through FastAPI means
+routing, dependency resolution and a python-multipart parse per request.
+FastPathApp reads the body straight from the ASGI receive channel, decodes
+only the fields the endpoint declares, calls the same endpoint function
+through a route table built at startup, and sends the response's
+pre-encoded bytes. Exceptions raised by an endpoint go to the app's own
+exception handlers, as they would through FastAPI.
+
+Anything that does not fit (another method or path, another content type)
+falls through to the FastAPI app unchanged.
+"""
+
+import inspect
+import os
+from typing import Awaitable, Callable, Optional
+from urllib.parse import unquote_plus
+
+from fastapi import params
+from fastapi.routing import APIRoute
+from starlette.requests import Request
+
+_FORM_CONTENT_TYPE = b"application/x-www-form-urlencoded"
+
+
+def asgi_target() -> str:
+    """The "module:attribute" uvicorn should serve, honouring IVR_FAST_PATH."""
+    return "main:fast_app" if os.environ.get("IVR_FAST_PATH") == "1" else "main:app"
+
+
+# ─────────────────────────────────────────────
+# Body parsing
+# ─────────────────────────────────────────────
+
+def parse_form_fields(body: bytes, wanted: frozenset) -> dict:
+    """
+    Decode only the `wanted` keys (bytes) of an urlencoded body into
+    {name: value}, with None for absent keys.
+
+    Matches FastAPI's Form(None) semantics: the last occurrence wins, and
+    an empty value counts as missing.
+    """
+    fields = {key.decode("ascii"): None for key in wanted}
+    for pair in body.split(b"&"):
+        key, _, value = pair.partition(b"=")
+        if b"%" in key or b"+" in key:
+            key = unquote_plus(key.decode("latin-1")).encode("utf-8")
+        if key not in wanted:
+            continue
+        fields[key.decode("ascii")] = (
+            unquote_plus(value.decode("latin-1"), errors="replace") if value else None
+        )
+    return fields
+
+
+async def read_body(receive) -> bytes:
+    """The whole request body from an ASGI receive channel."""
+    message = await receive()
+    body = message.get("body", b"")
+    if not message.get("more_body"):
+        return body
+    chunks = [body]
+    while message.get("more_body"):
+        message = await receive()
+        chunks.append(message.get("body", b""))
+    return b"".join(chunks)
+
+
+# ─────────────────────────────────────────────
+# Route table
+# ─────────────────────────────────────────────
+
+class _FastRoute:
+    __slots__ = ("endpoint", "wanted")
+
+    def __init__(self, endpoint: Callable[..., Awaitable], wanted: frozenset):
+        self.endpoint = endpoint
+        self.wanted = wanted
+
+
+def build_route_table(app) -> dict[str, _FastRoute]:
+    """
+    POST routes whose parameters are all optional Form() fields, keyed by
+    path. Other routes keep going through FastAPI.
+    """
+    table = {}
+    for route in app.routes:
+        if not isinstance(route, APIRoute) or "POST" not in route.methods:
+            continue
+        if not inspect.iscoroutinefunction(route.endpoint):
+            continue
+        params_ = inspect.signature(route.endpoint).parameters.values()
+        if not all(isinstance(p.default, params.Form) for p in params_):
+            continue
+        if any(p.default.default is not None for p in params_):
+            continue
+        wanted = frozenset(p.name.encode("ascii") for p in params_)
+        table[route.path] = _FastRoute(route.endpoint, wanted)
+    return table
+
+
+# ─────────────────────────────────────────────
+# ASGI app
+# ─────────────────────────────────────────────
+
+class FastPathApp:
+    """
+    Serve the routes in build_route_table(app) directly; forward everything
+    else to `app`. `wrap` is applied to the fast dispatcher only (e.g. the
+    metrics middleware, which `app` already carries for its own routes).
+    """
+
+    def __init__(self, app, wrap: Optional[Callable] = None):
+        self.app = app
+        self.routes = build_route_table(app)
+        self._dispatch = wrap(self._serve) if wrap else self._serve
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] == "http"
+            and scope["method"] == "POST"
+            and scope["path"] in self.routes
+            and _is_urlencoded(scope["headers"])
+        ):
+            await self._dispatch(scope, receive, send)
+        else:
+            await self.app(scope, receive, send)
+
+    async def _serve(self, scope, receive, send):
+        route = self.routes[scope["path"]]
+        fields = parse_form_fields(await read_body(receive), route.wanted)
+        try:
+            response = await route.endpoint(**fields)
+        except Exception as exc:
+            handler = self._exception_handler(exc)
+            if handler is None:
+                raise
+            response = handler(Request(scope), exc)
+            if inspect.isawaitable(response):
+                response = await response
+        await send({
+            "type": "http.response.start",
+            "status": response.status_code,
+            "headers": response.raw_headers,
+        })
+        await send({"type": "http.response.body", "body": response.body})
+
+    def _exception_handler(self, exc: Exception) -> Optional[Callable]:
+        """The app's handler for `exc`'s class or its nearest base, if any."""
+        handlers = self.app.exception_handlers
+        for cls in type(exc).__mro__:
+            if cls in handlers:
+                return handlers[cls]
+        return None
+
+
+def _is_urlencoded(headers: list) -> bool:
+    for name, value in headers:
+        if name == b"content-type":
+            return value.split(b";", 1)[0].strip().lower() == _FORM_CONTENT_TYPE
+    return False
@@ -0,0 +1,130 @@
+"""
+IRCTC Conversational IVR - HTTP Connection Pool
+Minimal asyncio HTTP/1.1 client with keep-alive connection reuse.
+
+Used for calls to local or in-VPC services where pulling in a full HTTP
+client library is not worth it: requests are small, responses carry a
+Content-Length (or chunked encoding), and TLS is not involved.
+"""
+
+import asyncio
+from typing import Optional
+
+
+class HttpError(Exception):
+    """Raised when a connection fails or the peer sends a malformed response."""
+
+
+class HttpConnectionPool:
+    """
+    Pool of keep-alive connections to a single host:port.
+
+    At most `max_connections` requests are in flight at once; idle
+    connections are reused LIFO so the hottest sockets stay warm.
+    """
+
+    def __init__(self, host: str, port: int, max_connections: int = 10):
+        self.host = host
+        self.port = port
+        self.max_connections = max_connections
+        self._idle: list[tuple[asyncio.StreamReader, asyncio.StreamWriter]] = []
+        self._slots = asyncio.Semaphore(max_connections)
+        self.connections_opened = 0
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        body: bytes = b"",
+        headers: Optional[dict[str, str]] = None,
+    ) -> tuple[int, dict[str, str], bytes]:
+        """
+        Send one request and return (status, headers, body).
+        Header names in the result are lower-cased.
+        """
+        head = [f"{method} {path} HTTP/1.1", f"Host: {self.host}:{self.port}"]
+        for name, value in (headers or {}).items():
+            head.append(f"{name}: {value}")
+        if body or method not in ("GET", "HEAD"):
+            head.append(f"Content-Length: {len(body)}")
+        payload = ("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body
+
+        async with self._slots:
+            # A reused connection may have been closed by the peer while idle;
+            # retry such failures once on a fresh connection.
+            for attempt in range(2):
+                conn, reused = await self._acquire()
+                reader, writer = conn
+                try:
+                    writer.write(payload)
+                    status, resp_headers, resp_body = await _read_response(reader)
+                except (ConnectionError, asyncio.IncompleteReadError, HttpError) as exc:
+                    writer.close()
+                    if reused and attempt == 0:
+                        continue
+                    raise HttpError(f"{self.host}:{self.port}: {exc!r}") from exc
+                except BaseException:
+                    writer.close()
+                    raise
+                if resp_headers.get("connection", "").lower() == "close":
+                    writer.close()
+                else:
+                    self._idle.append(conn)
+                return status, resp_headers, resp_body
+        raise AssertionError("unreachable")
+
+    async def _acquire(self):
+        while self._idle:
+            conn = self._idle.pop()
+            if not conn[1].is_closing():
+                return conn, True
+        try:
+            conn = await asyncio.open_connection(self.host, self.port)
+        except OSError as exc:
+            raise HttpError(f"{self.host}:{self.port}: {exc!r}") from exc
+        self.connections_opened += 1
+        return conn, False
+
+    async def close(self) -> None:
+        """Close every idle connection."""
+        idle, self._idle = self._idle, []
+        for _, writer in idle:
+            writer.close()
+
+
+async def _read_response(reader: asyncio.StreamReader) -> tuple[int, dict[str, str], bytes]:
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError("connection closed before response")
+    parts = status_line.split(None, 2)
+    if len(parts) < 2 or not parts[0].startswith(b"HTTP/"):
+        raise HttpError(f"bad status line {status_line!r}")
+    status = int(parts[1])
+
+    headers = await read_headers(reader)
+    if headers.get("transfer-encoding", "").lower() == "chunked":
+        body = bytearray()
+        while True:
+            size = int((await reader.readline()).split(b";", 1)[0], 16)
+            if size == 0:
+                await reader.readline()
+                break
+            body += await reader.readexactly(size)
+            await reader.readline()
+        return status, headers, bytes(body)
+
+    length = int(headers.get("content-length", "0"))
+    return status, headers, await reader.readexactly(length) if length else b""
+
+
+async def read_headers(reader: asyncio.StreamReader) -> dict[str, str]:
+    """Read header lines up to the blank line; names are lower-cased."""
+    headers: dict[str, str] = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n"):
+            return headers
+        if not line:
+            raise asyncio.IncompleteReadError(b"", None)
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
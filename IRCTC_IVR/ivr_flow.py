@@ -0,0 +1,127 @@
+"""
+IRCTC Conversational IVR - Lookup Flow
+What a PNR / train lookup, an accepted "Did you mean …?" and a request for
+more stops do to the caller's session, and which response the caller gets.
+
+No I/O happens here: main.py looks records up and writes sessions
+asynchronously, lambda_handler.py synchronously, and both decide through
+these functions, so the two entry points answer alike:
+
+    fields = lookup_fields(kind, key, changes)              # before the lookup
+    ... result = lookup(key); suggestion = correction if not result ...
+    fields |= result_fields(kind, key, result, suggestion)  # same session write
+    response = result_response(kind, key, result, suggestion)
+"""
+
+from typing import Mapping, Optional
+
+from data_store import pnr_version, train_version
+from ivr_logic import (
+    MENU_STRUCTURE,
+    TWILIO_VOICE,
+    render_pnr_suggestion,
+    render_train_suggestion,
+    rendered_results,
+    train_page_count,
+)
+
+# The session field remembering the last number looked up, per kind.
+_LAST_FIELD = {"pnr": "last_pnr", "train": "last_train"}
+
+
+# ─────────────────────────────────────────────
+# PNR / train lookups
+# ─────────────────────────────────────────────
+
+def lookup_fields(kind: str, key: str, changes: Optional[Mapping] = None) -> dict:
+    """
+    Session fields a "pnr" / "train" lookup of `key` sets whatever its
+    outcome (kept even if the backend is unavailable); `changes` join them.
+    """
+    return {**(changes or {}), _LAST_FIELD[kind]: key}
+
+
+def result_fields(
+    kind: str, key: str, result: Optional[dict], suggestion: Optional[tuple[str, dict]]
+) -> dict:
+    """Session fields set by the lookup's result and correction (see correction_wanted)."""
+    fields = {}
+    if suggestion is not None:
+        fields["suggestion"] = suggestion[0]
+    if kind == "train":
+        # Long schedules are read a page at a time; remember where to resume.
+        paged = result and train_page_count(key, result) > 1
+        fields["stops_page"] = 1 if paged else None
+    return fields
+
+
+def correction_wanted(result: Optional[dict]) -> bool:
+    """Whether a number not found is looked up again as a likely typo."""
+    return not result
+
+
+def result_response(
+    kind: str,
+    key: str,
+    result: Optional[dict],
+    suggestion: Optional[tuple[str, dict]],
+    voice: str = TWILIO_VOICE,
+) -> bytes:
+    """The result read back, or "Did you mean …?" when there is a suggestion."""
+    if suggestion is not None:
+        render = render_pnr_suggestion if kind == "pnr" else render_train_suggestion
+        return render(key, *suggestion, voice)
+    if kind == "pnr":
+        return rendered_results.pnr(key, result, pnr_version(key), voice)
+    return rendered_results.train(key, result, train_version(key), voice)
+
+
+# ─────────────────────────────────────────────
+# "Did you mean …?" answered with 1
+# ─────────────────────────────────────────────
+
+def suggestion_state(kind: str) -> str:
+    """The menu that answers the "pnr" / "train" suggestion."""
+    return MENU_STRUCTURE[f"{kind}_gather"]["suggest"]
+
+
+def accepted_suggestion(kind: str, session: Optional[Mapping]) -> Optional[tuple[str, dict]]:
+    """
+    The number offered to the caller and the session changes that go with
+    looking it up; None (invalid input) if nothing was offered.
+    """
+    suggestion = session.get("suggestion") if session is not None else None
+    if not suggestion:
+        return None
+    return suggestion, {"suggestion": None, "last_menu": suggestion_state(kind),
+                        "last_digit": "1"}
+
+
+# ─────────────────────────────────────────────
+# Paging through a long schedule
+# ─────────────────────────────────────────────
+
+def pending_stops(session: Mapping) -> Optional[tuple[str, int]]:
+    """The caller's last train and the page of halts to read next, if there is one."""
+    train_number, page = session.get("last_train"), session.get("stops_page")
+    if not train_number or page is None:
+        return None
+    return train_number, page
+
+
+def stops_fields(train_number: str, page: int, result: Optional[dict]) -> Optional[dict]:
+    """
+    Session fields after reading `page`; None (invalid input) if the
+    timetable, changed since the last page was read, has no such page.
+    """
+    pages = train_page_count(train_number, result) if result else 0
+    if page >= pages:
+        return None
+    return {"stops_page": page + 1 if page + 1 < pages else None}
+
+
+def stops_response(
+    train_number: str, result: dict, page: int, voice: str = TWILIO_VOICE
+) -> bytes:
+    """Page `page` of the train's halts."""
+    return rendered_results.train(train_number, result, train_version(train_number), voice, page)
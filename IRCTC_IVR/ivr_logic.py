@@ -5,18 +5,99 @@ Defines menu structure and TwiML response builders.
 Voice: en-IN (Polly.Aditi for Twilio / en-IN-NeerjaNeural for Azure)
 """
 
-from typing import Optional
+from collections import OrderedDict
+from functools import lru_cache
+from string import Formatter
+from typing import Callable, Hashable, Mapping, Optional
+
+from speech import speak_train, spoken_train
 
 # ─────────────────────────────────────────────
 # Voice configuration
 # ─────────────────────────────────────────────
 TWILIO_VOICE = "Polly.Aditi"   # Indian English — Amazon Polly via Twilio
 AZURE_VOICE  = "en-IN-NeerjaNeural"  # Indian English — Azure Cognitive Services
+SPEECH_LANGUAGE = "en-IN"      # recognition language for spoken input
+
+# ─────────────────────────────────────────────
+# Change tracking for the menu structure
+# ─────────────────────────────────────────────
+_MENU_VERSION = 0
+
+
+def _bump_menu_version() -> None:
+    global _MENU_VERSION
+    _MENU_VERSION += 1
+
+
+class _TrackedDict(dict):
+    """
+    dict that bumps the module's menu version on every mutation, including
+    mutations of nested menus. Lets cached responses detect menu edits with
+    an integer compare instead of re-hashing the whole structure.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        for key, value in dict.items(self):
+            if isinstance(value, dict) and not isinstance(value, _TrackedDict):
+                dict.__setitem__(self, key, _TrackedDict(value))
+
+    def __setitem__(self, key, value):
+        if isinstance(value, dict) and not isinstance(value, _TrackedDict):
+            value = _TrackedDict(value)
+        super().__setitem__(key, value)
+        _bump_menu_version()
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        _bump_menu_version()
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+    def update(self, *args, **kwargs):
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def pop(self, *args):
+        value = super().pop(*args)
+        _bump_menu_version()
+        return value
+
+    def popitem(self):
+        item = super().popitem()
+        _bump_menu_version()
+        return item
+
+    def clear(self):
+        super().clear()
+        _bump_menu_version()
+
 
 # ─────────────────────────────────────────────
 # Dictionary-based menu structure
 # ─────────────────────────────────────────────
-MENU_STRUCTURE = {
+# Each state is a <Gather> prompt. Keys:
+#   prompt, num_digits  — what the caller hears and how many keys to collect
+#   action              — webhook the keys are posted to (default /ivr/<state>)
+#   options             — keypress → next state (or a terminal, e.g. "goodbye");
+#                         menu_engine.py resolves these without custom handlers
+#   tracked             — record last_menu / last_digit in the session
+#   flow                — session flow to set when a caller enters the state
+#   next                — for free-form input states: the menu offered after
+#                         the dedicated handler has answered
+#   more                — for paged results: the menu offered instead of `next`
+#                         while pages remain
+#   suggest             — for lookups: the menu offered with a "did you mean"
+#                         correction when the number keyed is not found
+MENU_STRUCTURE = _TrackedDict({
     "main": {
         "prompt": (
             "Welcome to I.R.C.T.C. Passenger Services. "
@@ -31,6 +112,7 @@ MENU_STRUCTURE = {
         },
         "action": "/handle-menu",
         "num_digits": 1,
+        "tracked": True,
     },
     "pnr_gather": {
         "prompt": (
@@ -38,6 +120,9 @@ MENU_STRUCTURE = {
         ),
         "action": "/handle-pnr",
         "num_digits": 10,
+        "flow": "pnr",
+        "next": "pnr_options",
+        "suggest": "pnr_suggest",
     },
     "train_gather": {
         "prompt": (
@@ -45,8 +130,83 @@ MENU_STRUCTURE = {
         ),
         "action": "/handle-train",
         "num_digits": 5,
+        "flow": "train",
+        "next": "train_options",
+        "more": "train_stops",
+        "suggest": "train_suggest",
     },
-}
+    "pnr_options": {
+        "prompt": (
+            "To check another P.N.R., press 1. "
+            "To return to the main menu, press 2. "
+            "To exit, press 9."
+        ),
+        "options": {
+            "1": "pnr_gather",
+            "2": "main",
+            "9": "goodbye",
+        },
+        "action": "/handle-pnr-options",
+        "num_digits": 1,
+    },
+    "train_options": {
+        "prompt": (
+            "To check another train, press 1. "
+            "To return to the main menu, press 2. "
+            "To exit, press 9."
+        ),
+        "options": {
+            "1": "train_gather",
+            "2": "main",
+            "9": "goodbye",
+        },
+        "action": "/handle-train-options",
+        "num_digits": 1,
+    },
+    "train_stops": {
+        "prompt": (
+            "To hear the next stops, press 1. "
+            "To return to the main menu, press 2. "
+            "To check another train, press 3. "
+            "To exit, press 9."
+        ),
+        # "1" (next page) is answered by the handler, which knows the page.
+        "options": {
+            "2": "main",
+            "3": "train_gather",
+            "9": "goodbye",
+        },
+        "action": "/handle-train-stops",
+        "num_digits": 1,
+    },
+    "pnr_suggest": {
+        "prompt": (
+            "To hear its status, press 1. "
+            "To enter the P.N.R. again, press 2. "
+            "To exit, press 9."
+        ),
+        # "1" (take the suggestion) is answered by the handler, which knows it.
+        "options": {
+            "2": "pnr_gather",
+            "9": "goodbye",
+        },
+        "action": "/handle-pnr-suggestion",
+        "num_digits": 1,
+    },
+    "train_suggest": {
+        "prompt": (
+            "To hear its schedule, press 1. "
+            "To enter the train number again, press 2. "
+            "To exit, press 9."
+        ),
+        "options": {
+            "2": "train_gather",
+            "9": "goodbye",
+        },
+        "action": "/handle-train-suggestion",
+        "num_digits": 1,
+    },
+})
 
 
 # ─────────────────────────────────────────────
@@ -67,6 +227,26 @@ def _say(text: str, voice: str = TWILIO_VOICE) -> str:
     return f'<Say voice="{voice}">{_xml_escape(text)}</Say>'
 
 
+def _play(url: str) -> str:
+    """Return a TwiML <Play> element."""
+    return f"<Play>{_xml_escape(url)}</Play>"
+
+
+def _prompt(text: str, voice: str = TWILIO_VOICE) -> str:
+    """
+    A fixed prompt: <Play> of its pre-synthesized audio when some is
+    installed for this text and voice (see prompt_audio.py), else <Say>.
+    Dynamic text (results read back to the caller) uses _say() directly.
+    """
+    if _PROMPT_SINK is not None:
+        _PROMPT_SINK.append((text, voice))
+    if _PROMPT_AUDIO is not None:
+        url = _PROMPT_AUDIO(text, voice)
+        if url:
+            return _play(url)
+    return _say(text, voice)
+
+
 def _pause(length: int = 1) -> str:
     """Return a TwiML <Pause> element."""
     return f'<Pause length="{length}"/>'
@@ -79,9 +259,14 @@ def _gather(
     finish_on_key: str = "#",
     inner_xml: str = "",
 ) -> str:
-    """Return a TwiML <Gather> element."""
+    """Return a TwiML <Gather> element (listening for speech too, if enabled)."""
+    speech = ""
+    if _SPEECH_INPUT:
+        speech = f'input="speech dtmf" language="{SPEECH_LANGUAGE}" speechTimeout="auto" '
+        if num_digits > 1:
+            speech += 'hints="$OOV_CLASS_DIGIT_SEQUENCE" '
     return (
-        f'<Gather action="{action}" method="POST" '
+        f'<Gather action="{action}" method="POST" {speech}'
         f'numDigits="{num_digits}" timeout="{timeout}" '
         f'finishOnKey="{finish_on_key}">'
         f"{inner_xml}"
@@ -109,15 +294,19 @@ def _twiml_response(*elements: str) -> str:
 # Public TwiML builder functions
 # ─────────────────────────────────────────────
 
-def build_welcome_twiml() -> str:
-    """
-    Entry greeting followed immediately by the main menu Gather.
-    Keeps the call alive; no abrupt hang-up on silence.
-    """
+# Callers whose phone number has a booking on record are offered its
+# status on this main-menu key at the welcome (see main.voice_entry); the
+# other keys keep their meaning, so callers who know the menu are not
+# thrown by the offer.
+BOOKING_KEY = "3"
+_BOOKING_OFFER_TEXT = (
+    "Namaste! You have a booking on the {train_name}. "
+    "To hear its status, press " + BOOKING_KEY + "."
+)
+
+
+def _welcome_envelope(welcome_say: str) -> str:
     menu = MENU_STRUCTURE["main"]
-    welcome_say = _say(
-        "Namaste! " + menu["prompt"]
-    )
     gather = _gather(
         action=menu["action"],
         num_digits=menu["num_digits"],
@@ -128,33 +317,60 @@ def build_welcome_twiml() -> str:
     return _twiml_response(gather, redirect)
 
 
-def build_main_menu_twiml() -> str:
-    """Standalone main menu (used after returning from a sub-flow)."""
-    menu = MENU_STRUCTURE["main"]
-    say = _say(menu["prompt"])
-    gather = _gather(
-        action=menu["action"],
+def build_welcome_twiml(voice: str = TWILIO_VOICE, booking_train: Optional[str] = None) -> str:
+    """
+    Entry greeting followed immediately by the main menu Gather.
+    Keeps the call alive; no abrupt hang-up on silence. With
+    `booking_train`, the greeting first offers BOOKING_KEY for the status
+    of the caller's booking on that train.
+    """
+    prompt = MENU_STRUCTURE["main"]["prompt"]
+    if booking_train is None:
+        return _welcome_envelope(_prompt("Namaste! " + prompt, voice))
+    offer = _BOOKING_OFFER_TEXT.format(train_name=booking_train)
+    return _welcome_envelope(_say(offer, voice) + _prompt(prompt, voice))
+
+
+def menu_action(name: str) -> str:
+    """Webhook a menu state's keypresses are posted to."""
+    return MENU_STRUCTURE[name].get("action") or f"/ivr/{name}"
+
+
+def _menu_gather(name: str, voice: str = TWILIO_VOICE) -> str:
+    """The <Gather> for a menu state, prompting with its text."""
+    menu = MENU_STRUCTURE[name]
+    return _gather(
+        action=menu_action(name),
         num_digits=menu["num_digits"],
-        inner_xml=say,
+        inner_xml=_prompt(menu["prompt"], voice),
     )
-    redirect = _redirect("/voice")
-    return _twiml_response(gather, redirect)
 
 
-def build_pnr_gather_twiml() -> str:
+def build_menu_twiml(name: str, voice: str = TWILIO_VOICE) -> str:
+    """Present any state of MENU_STRUCTURE; silence loops back to /voice."""
+    return _twiml_response(_menu_gather(name, voice), _redirect("/voice"))
+
+
+def build_main_menu_twiml(voice: str = TWILIO_VOICE) -> str:
+    """Standalone main menu (used after returning from a sub-flow)."""
+    return build_menu_twiml("main", voice)
+
+
+def build_pnr_gather_twiml(voice: str = TWILIO_VOICE) -> str:
     """Prompt the user to enter their 10-digit PNR."""
-    menu = MENU_STRUCTURE["pnr_gather"]
-    say = _say(menu["prompt"])
-    gather = _gather(
-        action=menu["action"],
-        num_digits=menu["num_digits"],
-        inner_xml=say,
-    )
+    return build_menu_twiml("pnr_gather", voice)
+
+
+def _pnr_result_envelope(result_say: str, voice: str = TWILIO_VOICE) -> str:
+    """Wrap a PNR result <Say> with the post-result options menu."""
+    gather = _menu_gather(MENU_STRUCTURE["pnr_gather"]["next"], voice)
     redirect = _redirect("/voice")
-    return _twiml_response(gather, redirect)
+    return _twiml_response(result_say, _pause(), gather, redirect)
 
 
-def build_pnr_result_twiml(pnr: str, result: Optional[dict]) -> str:
+def build_pnr_result_twiml(
+    pnr: str, result: Optional[dict], voice: str = TWILIO_VOICE
+) -> str:
     """
     Read back PNR status details.
     After reading, offer the main menu again or goodbye.
@@ -169,92 +385,555 @@ def build_pnr_result_twiml(pnr: str, result: Optional[dict]) -> str:
             f"Journey date: {result['journey_date']}. "
             f"From {result['from_station']} to {result['to_station']}."
         )
+        say = _say(status_text, voice)
     else:
-        status_text = (
+        say = _prompt(
             f"Sorry, no record was found for the P.N.R. number you entered. "
-            "Please check the number and try again."
+            "Please check the number and try again.",
+            voice,
         )
 
-    result_say  = _say(status_text)
-    options_say = _say(
-        "To check another P.N.R., press 1. "
-        "To return to the main menu, press 2. "
-        "To exit, press 9."
-    )
-    gather = _gather(
-        action="/handle-pnr-options",
-        num_digits=1,
-        inner_xml=options_say,
-    )
+    return _pnr_result_envelope(say, voice)
+
+
+def build_train_gather_twiml(voice: str = TWILIO_VOICE) -> str:
+    """Prompt the user to enter a 5-digit train number."""
+    return build_menu_twiml("train_gather", voice)
+
+
+def _train_result_envelope(
+    result_say: str, voice: str = TWILIO_VOICE, more: bool = False
+) -> str:
+    """
+    Wrap a train result <Say> with the post-result menu: the train_gather
+    `more` menu while schedule pages remain, else its `next` menu.
+    """
+    gather = _menu_gather(MENU_STRUCTURE["train_gather"]["more" if more else "next"], voice)
     redirect = _redirect("/voice")
     return _twiml_response(result_say, _pause(), gather, redirect)
 
 
-def build_train_gather_twiml() -> str:
-    """Prompt the user to enter a 5-digit train number."""
-    menu = MENU_STRUCTURE["train_gather"]
-    say = _say(menu["prompt"])
+def build_train_result_twiml(
+    train_number: str, result: Optional[dict], voice: str = TWILIO_VOICE, page: int = 0
+) -> str:
+    """
+    Read back train schedule information, one page of halts at a time
+    (see speech.py); page 0 starts with the train's details.
+    """
+    if result:
+        spoken = speak_train(train_number, result)
+        say = _say(spoken.text(page), voice)
+        return _train_result_envelope(say, voice, more=page + 1 < spoken.page_count)
+    say = _prompt(
+        "Sorry, no information was found for the train number you entered. "
+        "Please verify the number and try again.",
+        voice,
+    )
+    return _train_result_envelope(say, voice)
+
+
+# A number that is not found but is one keying slip away from a known one
+# (see data_store.correct_pnr) is offered back, confirmed with one key.
+_PNR_SUGGESTION_TEXT = (
+    "Sorry, no record was found for P.N.R. number {entered:spaced}. "
+    "Did you mean P.N.R. number {pnr:spaced}, on the {train_name}?"
+)
+_TRAIN_SUGGESTION_TEXT = (
+    "Sorry, no information was found for train number {entered:spaced}. "
+    "Did you mean train number {number:spaced}, the {name}?"
+)
+
+
+def _suggestion_envelope(gather_state: str, suggestion_say: str, voice: str = TWILIO_VOICE) -> str:
+    """
+    The suggestion, then the `suggest` menu of `gather_state`; both play
+    inside the <Gather>, so the caller can answer before the menu is read.
+    """
+    name = MENU_STRUCTURE[gather_state]["suggest"]
+    menu = MENU_STRUCTURE[name]
     gather = _gather(
-        action=menu["action"],
+        action=menu_action(name),
         num_digits=menu["num_digits"],
-        inner_xml=say,
+        inner_xml=suggestion_say + _prompt(menu["prompt"], voice),
     )
-    redirect = _redirect("/voice")
-    return _twiml_response(gather, redirect)
+    return _twiml_response(gather, _redirect("/voice"))
 
 
-def build_train_result_twiml(train_number: str, result: Optional[dict]) -> str:
-    """Read back train schedule information."""
-    if result:
-        stops_text = ". ".join(
-            f"Halt {i+1}: {s['station']}, arrives {s['arrival']}, departs {s['departure']}"
-            for i, s in enumerate(result.get("stops", []))
-        )
-        train_text = (
-            f"Train number {train_number}, {result['name']}. "
-            f"Runs from {result['source']} to {result['destination']}. "
-            f"Departure: {result['departure']}. Arrival: {result['arrival']}. "
-            f"Days of operation: {result['days']}. "
-            + (f"Schedule: {stops_text}." if stops_text else "")
-        )
-    else:
-        train_text = (
-            "Sorry, no information was found for the train number you entered. "
-            "Please verify the number and try again."
-        )
-
-    result_say  = _say(train_text)
-    options_say = _say(
-        "To check another train, press 1. "
-        "To return to the main menu, press 2. "
-        "To exit, press 9."
+def build_pnr_suggestion_twiml(
+    entered: str, pnr: str, result: dict, voice: str = TWILIO_VOICE
+) -> str:
+    """No record for the `entered` PNR: offer `pnr`, the likely intended one."""
+    text = _format_text(
+        _PNR_SUGGESTION_TEXT, entered=entered, pnr=pnr, train_name=result["train_name"]
     )
-    gather = _gather(
-        action="/handle-train-options",
-        num_digits=1,
-        inner_xml=options_say,
+    return _suggestion_envelope("pnr_gather", _say(text, voice), voice)
+
+
+def build_train_suggestion_twiml(
+    entered: str, train_number: str, result: dict, voice: str = TWILIO_VOICE
+) -> str:
+    """No train `entered`: offer `train_number`, the likely intended one."""
+    text = _format_text(
+        _TRAIN_SUGGESTION_TEXT, entered=entered, number=train_number, name=result["name"]
     )
-    redirect = _redirect("/voice")
-    return _twiml_response(result_say, _pause(), gather, redirect)
+    return _suggestion_envelope("train_gather", _say(text, voice), voice)
 
 
-def build_invalid_input_twiml(redirect_to: str = "/voice") -> str:
+def build_invalid_input_twiml(
+    redirect_to: str = "/voice", voice: str = TWILIO_VOICE
+) -> str:
     """
     Inform the user of invalid input and loop back to a given endpoint.
     Prevents abrupt hang-up per spec §Error Recovery.
     """
-    say = _say(
-        "Sorry, I did not understand your input. Please try again."
+    say = _prompt(
+        "Sorry, I did not understand your input. Please try again.", voice
     )
     redirect = _redirect(redirect_to)
     return _twiml_response(say, _pause(), redirect)
 
 
-def build_goodbye_twiml() -> str:
+def build_service_unavailable_twiml(voice: str = TWILIO_VOICE) -> str:
+    """
+    Apologise when the booking / schedule backend is slow or down and
+    loop back to the welcome menu instead of leaving the caller hanging.
+    """
+    say = _prompt(
+        "Sorry, we are unable to fetch these details right now. "
+        "Please try again later.",
+        voice,
+    )
+    redirect = _redirect("/voice")
+    return _twiml_response(say, _pause(), redirect)
+
+
+def build_goodbye_twiml(voice: str = TWILIO_VOICE) -> str:
     """Thank the caller and hang up gracefully."""
-    say = _say(
+    say = _prompt(
         "Thank you for using I.R.C.T.C. Passenger Services. "
-        "Have a comfortable journey. Goodbye!"
+        "Have a comfortable journey. Goodbye!",
+        voice,
     )
     hangup = "<Hangup/>"
     return _twiml_response(say, hangup)
+
+
+def build_busy_twiml(voice: str = TWILIO_VOICE) -> str:
+    """
+    Turn a new call away politely while the service is overloaded (see
+    admission.py), rather than let Twilio play an application error.
+    """
+    say = _prompt(
+        "We are experiencing a very high call volume right now. "
+        "Please call back in a few minutes. Thank you for calling I.R.C.T.C.",
+        voice,
+    )
+    return _twiml_response(say, "<Hangup/>")
+
+
+# ─────────────────────────────────────────────
+# Pre-encoded static responses
+# ─────────────────────────────────────────────
+
+class StaticResponseCache:
+    """
+    Renders each static TwiML response once per voice and keeps it as
+    UTF-8 bytes, so webhooks can return it without any string building.
+
+    The cache is stamped with the identity and version of MENU_STRUCTURE;
+    editing the menu (or rebinding it) triggers a rebuild for every voice
+    that has been rendered so far on the next lookup.
+    """
+
+    def __init__(self, builders: dict[str, Callable[..., str]]):
+        self._builders = builders
+        self._rendered: dict[tuple[str, str], bytes] = {}
+        self._voices: set[str] = set()
+        self._stamp: tuple[int, int] = (id(MENU_STRUCTURE), _MENU_VERSION)
+
+    def get(self, name: str, voice: str = TWILIO_VOICE) -> bytes:
+        """Return the encoded response `name` for `voice`."""
+        if self._stamp != (id(MENU_STRUCTURE), _MENU_VERSION):
+            self._rebuild()
+        try:
+            return self._rendered[(name, voice)]
+        except KeyError:
+            return self._render(name, voice)
+
+    def warm(self, voices: tuple[str, ...] = (TWILIO_VOICE,)) -> None:
+        """Render every static response for the given voices up front."""
+        for voice in voices:
+            self._voices.add(voice)
+            for name in self._builders:
+                self._render(name, voice)
+
+    def _render(self, name: str, voice: str) -> bytes:
+        body = self._builders[name](voice=voice).encode("utf-8")
+        self._rendered[(name, voice)] = body
+        return body
+
+    def _rebuild(self) -> None:
+        self._rendered.clear()
+        self._stamp = (id(MENU_STRUCTURE), _MENU_VERSION)
+        self.warm(tuple(self._voices))
+
+
+static_responses = StaticResponseCache({
+    "welcome":       build_welcome_twiml,
+    "main_menu":     build_main_menu_twiml,
+    "pnr_gather":    build_pnr_gather_twiml,
+    "train_gather":  build_train_gather_twiml,
+    "invalid_input": build_invalid_input_twiml,
+    "unavailable":   build_service_unavailable_twiml,
+    "goodbye":       build_goodbye_twiml,
+    "busy":          build_busy_twiml,
+})
+
+
+# ─────────────────────────────────────────────
+# Pre-synthesized prompt audio
+# ─────────────────────────────────────────────
+# (text, voice) -> URL of recorded audio, or None to fall back to <Say>.
+_PROMPT_AUDIO: Optional[Callable[[str, str], Optional[str]]] = None
+_PROMPT_SINK: Optional[list] = None   # records _prompt() calls while enumerating
+
+
+def set_prompt_audio(resolver: Optional[Callable[[str, str], Optional[str]]]) -> None:
+    """
+    Install (or with None, remove) the lookup that turns fixed prompts into
+    <Play> elements. Bumps the menu version, so every cached response is
+    re-rendered on its next use.
+    """
+    global _PROMPT_AUDIO
+    _PROMPT_AUDIO = resolver
+    _bump_menu_version()
+
+
+def static_prompt_texts(voice: str = TWILIO_VOICE) -> list[str]:
+    """
+    Every fixed text the IVR speaks in `voice`, found by rendering each
+    static response, each MENU_STRUCTURE state and the "not found" results
+    while recording the prompts they use.
+    """
+    global _PROMPT_SINK
+    _PROMPT_SINK = sink = []
+    try:
+        for build in static_responses._builders.values():
+            build(voice=voice)
+        for name in MENU_STRUCTURE:
+            build_menu_twiml(name, voice)
+        build_pnr_result_twiml("", None, voice)
+        build_train_result_twiml("", None, voice)
+    finally:
+        _PROMPT_SINK = None
+    return list(dict.fromkeys(text for text, _ in sink))
+
+
+# ─────────────────────────────────────────────
+# Spoken input
+# ─────────────────────────────────────────────
+_SPEECH_INPUT = False
+
+
+def set_speech_input(enabled: bool) -> None:
+    """
+    Let callers speak instead of pressing keys: every <Gather> also listens
+    for speech, and Twilio posts a SpeechResult for the handlers to
+    classify (see nlu.py). Bumps the menu version, like set_prompt_audio().
+    """
+    global _SPEECH_INPUT
+    _SPEECH_INPUT = enabled
+    _bump_menu_version()
+
+
+def speech_input_enabled() -> bool:
+    """Whether set_speech_input() is on: only then is a SpeechResult read."""
+    return _SPEECH_INPUT
+
+
+# ─────────────────────────────────────────────
+# Compiled templates for dynamic results
+# ─────────────────────────────────────────────
+def _escape_bytes(text: str) -> bytes:
+    """Escape and encode one slot value; most values need no escaping at all."""
+    if "&" in text or "<" in text or ">" in text or '"' in text:
+        text = _xml_escape(text)
+    return text.encode("utf-8")
+
+
+@lru_cache(maxsize=4096)
+def _escape_bytes_cached(value: object) -> bytes:
+    """_escape_bytes() for low-cardinality values (names, stations, statuses)."""
+    return _escape_bytes(str(value))
+
+
+# Slot types, selected by the format spec of a template field ("{pnr:spaced}").
+# Each converter returns the escaped, encoded bytes for one slot value.
+_SLOT_TYPES: dict[str, Callable[[object], bytes]] = {
+    "":       _escape_bytes_cached,
+    "spaced": lambda value: _escape_bytes(" ".join(value)),
+    "text":   _escape_bytes,
+}
+
+
+class _TextFormatter(Formatter):
+    """str.format() for template texts: the same slot types, unescaped."""
+
+    def format_field(self, value: object, spec: str) -> str:
+        if spec == "spaced":
+            return " ".join(value)
+        return super().format_field(value, "" if spec == "text" else spec)
+
+
+_format_text = _TextFormatter().format
+
+
+class CompiledTemplate:
+    """
+    A TwiML response compiled into pre-encoded static segments and typed
+    slots. Only slot values are escaped and encoded at render time (and
+    clean values skip escaping entirely); everything else is joined as
+    ready-made bytes.
+
+    `text` is a str.format-style template for the spoken text; `envelope`
+    renders the full response around a given <Say> body. The segment list
+    is turned into a single generated expression, so rendering costs one
+    call per slot plus one bytes.join.
+    """
+
+    _MARKER = "\x00"
+
+    def __init__(self, text: str, envelope: Callable[[str], str]):
+        head, tail = envelope(self._MARKER).split(self._MARKER)
+        namespace: dict[str, object] = {}
+        items: list[str] = []
+        pending = head
+        for literal, field, spec, _ in Formatter().parse(text):
+            pending += _xml_escape(literal)
+            if field is None:
+                continue
+            index = len(items) // 2
+            namespace[f"s{index}"] = pending.encode("utf-8")
+            namespace[f"c{index}"] = _SLOT_TYPES[spec or ""]
+            items += [f"s{index}", f"c{index}(values[{field!r}])"]
+            pending = ""
+        namespace["tail"] = (pending + tail).encode("utf-8")
+        items.append("tail")
+
+        source = (
+            f"def render_parts(values): return [{', '.join(items)}]\n"
+            f"def render(values): return b''.join(({', '.join(items)},))\n"
+        )
+        exec(compile(source, f"<template {text[:40]!r}>", "exec"), namespace)
+        self.render_parts: Callable[[Mapping], list[bytes]] = namespace["render_parts"]
+        self.render: Callable[[Mapping], bytes] = namespace["render"]
+
+
+_PNR_RESULT_TEXT = (
+    "P.N.R. number {pnr:spaced}. "
+    "Train: {train_name}, number {train_number}. "
+    "Status: {status}. "
+    "Coach: {coach}, Berth: {berth}. "
+    "Journey date: {journey_date}. "
+    "From {from_station} to {to_station}."
+)
+
+
+class _ResultTemplates:
+    """Compiled PNR / train result responses for a single voice."""
+
+    def __init__(self, voice: str):
+        self.pnr_found = CompiledTemplate(
+            _PNR_RESULT_TEXT,
+            lambda body: _pnr_result_envelope(_say(body, voice), voice),
+        )
+        self.pnr_missing = build_pnr_result_twiml("", None, voice).encode("utf-8")
+
+        # Train text is normalized and paged by speech.py; the templates
+        # only wrap it, with or without the "next stops" menu.
+        self.train_page = CompiledTemplate(
+            "{text:text}", lambda body: _train_result_envelope(_say(body, voice), voice)
+        )
+        self.train_page_more = CompiledTemplate(
+            "{text:text}",
+            lambda body: _train_result_envelope(_say(body, voice), voice, more=True),
+        )
+        self.train_missing = build_train_result_twiml("", None, voice).encode("utf-8")
+
+        # The offer is read from the record; the menu after it stays a
+        # fixed prompt (and can <Play> pre-synthesized audio).
+        menu_prompt = _prompt(MENU_STRUCTURE["main"]["prompt"], voice)
+        self.welcome_offer = CompiledTemplate(
+            _BOOKING_OFFER_TEXT, lambda body: _welcome_envelope(_say(body, voice) + menu_prompt)
+        )
+
+        self.pnr_suggestion = CompiledTemplate(
+            _PNR_SUGGESTION_TEXT,
+            lambda body: _suggestion_envelope("pnr_gather", _say(body, voice), voice),
+        )
+        self.train_suggestion = CompiledTemplate(
+            _TRAIN_SUGGESTION_TEXT,
+            lambda body: _suggestion_envelope("train_gather", _say(body, voice), voice),
+        )
+
+
+_RESULT_TEMPLATES: dict[str, _ResultTemplates] = {}
+_RESULT_TEMPLATES_STAMP: tuple[int, int] = (id(MENU_STRUCTURE), _MENU_VERSION)
+
+
+def _result_templates(voice: str) -> _ResultTemplates:
+    global _RESULT_TEMPLATES_STAMP
+    # The envelopes embed the options menus, so menu edits recompile them.
+    if _RESULT_TEMPLATES_STAMP != (id(MENU_STRUCTURE), _MENU_VERSION):
+        _RESULT_TEMPLATES.clear()
+        _RESULT_TEMPLATES_STAMP = (id(MENU_STRUCTURE), _MENU_VERSION)
+    templates = _RESULT_TEMPLATES.get(voice)
+    if templates is None:
+        templates = _RESULT_TEMPLATES[voice] = _ResultTemplates(voice)
+    return templates
+
+
+def render_pnr_result(
+    pnr: str, result: Optional[dict], voice: str = TWILIO_VOICE
+) -> bytes:
+    """Encoded equivalent of build_pnr_result_twiml()."""
+    templates = _result_templates(voice)
+    if not result:
+        return templates.pnr_missing
+    return templates.pnr_found.render({**result, "pnr": pnr})
+
+
+def render_train_result(
+    train_number: str, result: Optional[dict], voice: str = TWILIO_VOICE, page: int = 0
+) -> bytes:
+    """Encoded equivalent of build_train_result_twiml()."""
+    templates = _result_templates(voice)
+    if not result:
+        return templates.train_missing
+    spoken = spoken_train(train_number, result)
+    template = templates.train_page_more if page + 1 < spoken.page_count else templates.train_page
+    return template.render({"text": spoken.text(page)})
+
+
+def render_welcome_offer(train_name: str, voice: str = TWILIO_VOICE) -> bytes:
+    """Encoded equivalent of build_welcome_twiml(voice, booking_train=train_name)."""
+    return _result_templates(voice).welcome_offer.render({"train_name": train_name})
+
+
+def render_pnr_suggestion(
+    entered: str, pnr: str, result: dict, voice: str = TWILIO_VOICE
+) -> bytes:
+    """Encoded equivalent of build_pnr_suggestion_twiml()."""
+    return _result_templates(voice).pnr_suggestion.render(
+        {"entered": entered, "pnr": pnr, "train_name": result["train_name"]}
+    )
+
+
+def render_train_suggestion(
+    entered: str, train_number: str, result: dict, voice: str = TWILIO_VOICE
+) -> bytes:
+    """Encoded equivalent of build_train_suggestion_twiml()."""
+    return _result_templates(voice).train_suggestion.render(
+        {"entered": entered, "number": train_number, "name": result["name"]}
+    )
+
+
+def train_page_count(train_number: str, result: dict) -> int:
+    """How many pages render_train_result() reads `result` in."""
+    return spoken_train(train_number, result).page_count
+
+
+# ─────────────────────────────────────────────
+# Rendered result cache
+# ─────────────────────────────────────────────
+class RenderedResultCache:
+    """
+    LRU of rendered PNR / train result responses, bounded by total size,
+    keyed by (kind, record key, record version, voice, page). The version
+    comes from data_store (pnr_version / train_version), so replacing or
+    invalidating a record there makes its old renders unreachable; they
+    age out of the LRU.
+
+    A hit also requires the record to equal the one rendered. Records from
+    an external backend have no local version, and this keeps them
+    correct when they change upstream. Like the other response caches, it
+    is emptied when MENU_STRUCTURE changes, since envelopes embed menus.
+    """
+
+    def __init__(self, max_bytes: int = 8 * 2**20):
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[tuple, tuple[dict, bytes]] = OrderedDict()
+        self._bytes = 0
+        self._stamp = (id(MENU_STRUCTURE), _MENU_VERSION)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def pnr(
+        self, pnr: str, result: Optional[dict], version: Hashable, voice: str = TWILIO_VOICE
+    ) -> bytes:
+        """render_pnr_result(), cached."""
+        if not result:
+            return render_pnr_result(pnr, result, voice)
+        key = ("pnr", pnr, version, voice, 0)
+        return self._get(key, result) or self._put(
+            key, result, render_pnr_result(pnr, result, voice)
+        )
+
+    def train(
+        self,
+        train_number: str,
+        result: Optional[dict],
+        version: Hashable,
+        voice: str = TWILIO_VOICE,
+        page: int = 0,
+    ) -> bytes:
+        """render_train_result(), cached."""
+        if not result:
+            return render_train_result(train_number, result, voice)
+        key = ("train", train_number, version, voice, page)
+        return self._get(key, result) or self._put(
+            key, result, render_train_result(train_number, result, voice, page)
+        )
+
+    def _get(self, key: tuple, record: dict) -> Optional[bytes]:
+        if self._stamp != (id(MENU_STRUCTURE), _MENU_VERSION):
+            self.clear()
+            self._stamp = (id(MENU_STRUCTURE), _MENU_VERSION)
+        entry = self._entries.get(key)
+        if entry is not None and (entry[0] is record or entry[0] == record):
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+        self.misses += 1
+        return None
+
+    def _put(self, key: tuple, record: dict, body: bytes) -> bytes:
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._bytes -= len(old[1])
+        self._entries[key] = (record, body)
+        self._bytes += len(body)
+        while self._bytes > self.max_bytes and self._entries:
+            _, (_, evicted) = self._entries.popitem(last=False)
+            self._bytes -= len(evicted)
+            self.evictions += 1
+        return body
+
+    def clear(self) -> None:
+        """Drop every entry; counters are kept."""
+        self._entries.clear()
+        self._bytes = 0
+
+    def stats(self) -> dict:
+        """Counters for diagnostics."""
+        return {
+            "size":      len(self._entries),
+            "bytes":     self._bytes,
+            "hits":      self.hits,
+            "misses":    self.misses,
+            "evictions": self.evictions,
+        }
+
+
+rendered_results = RenderedResultCache()
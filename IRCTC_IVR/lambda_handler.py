@@ -0,0 +1,381 @@
+"""
+IRCTC Conversational IVR - Serverless Entry Point
+Lambda-style handler for the Twilio webhooks (API Gateway or function URL
+events in, response dicts out):
+
+    python lambda_handler.py --build                       # at deploy time
+    handler: lambda_handler.handler
+    python lambda_handler.py --invoke /handle-menu CallSid=CA1 Digits=1
+
+Every cold start is paid by a caller waiting on the line. main.py spends
+most of its ~0.6 s import in FastAPI, then renders and validates every
+menu response. Here the build step does that work once: MENU_STRUCTURE is
+compiled (see menu_engine.py) into a route table and a (state, keypress)
+transition table with the TwiML already rendered, written to one marshal
+file. A cold start imports session_manager and reads that file; /voice
+and every menu keypress are answered from it.
+
+ivr_logic and data_store (and asyncio, with the HTTP data backend) are
+imported on the first PNR or train lookup only, with ivr_flow, which
+decides that lookup's session changes and response for main.py as well.
+Responses are those main.py sends, byte for byte (`python bench.py
+coldstart` checks that and times both cold starts).
+
+Not served here, as they need a long-lived process: speech input, the
+booking offer (prefetched in the background), the call journal, /metrics,
+prompt audio and the admin update API. Sessions are per container unless
+IVR_SESSION_BACKEND points at a shared store, which a deployment with
+more than one container needs. Rebuild the tables after editing the menu.
+"""
+
+import binascii
+import marshal
+import os
+import sys
+from typing import Optional
+from urllib.parse import parse_qsl
+
+from session_manager import SessionUnavailable, session_manager_from_url
+
+TABLES_PATH = os.environ.get(
+    "IVR_LAMBDA_TABLES",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "ivr_tables.marshal"),
+)
+_FORMAT = 1
+# Static responses the handler sends by name.
+_STATIC = ("welcome", "invalid_input", "unavailable")
+
+
+# ─────────────────────────────────────────────
+# Build step
+# ─────────────────────────────────────────────
+
+def build_tables(path: str = TABLES_PATH, voice: Optional[str] = None) -> dict:
+    """
+    Compile MENU_STRUCTURE and the static responses for `voice` into the
+    tables file at `path`. Returns what was written, for the CLI.
+    """
+    import ivr_logic
+    from menu_engine import MenuEngine
+
+    voice = voice or ivr_logic.TWILIO_VOICE
+    engine = MenuEngine(voice)      # validates the menu graph
+    routes, transitions, invalid = {}, {}, {}
+    for name, state in ivr_logic.MENU_STRUCTURE.items():
+        routes[ivr_logic.menu_action(name)] = name
+        if not state.get("options"):
+            continue
+        invalid[name] = (engine.resolve(name, "").response.decode("utf-8"),
+                         bool(state.get("tracked")))
+        for digits in state["options"]:
+            step = engine.resolve(name, digits)
+            transitions[(name, digits)] = (step.response.decode("utf-8"),
+                                           dict(step.session), step.end)
+    tables = {
+        "format":      _FORMAT,
+        "python":      tuple(sys.version_info[:2]),
+        "voice":       voice,
+        "routes":      routes,
+        "transitions": transitions,
+        "invalid":     invalid,
+        "static": {
+            name: ivr_logic.static_responses.get(name, voice).decode("utf-8")
+            for name in _STATIC
+        },
+    }
+    data = marshal.dumps(tables)
+    with open(path + ".tmp", "wb") as fh:
+        fh.write(data)
+    os.replace(path + ".tmp", path)
+    return {"routes": len(routes), "transitions": len(transitions), "bytes": len(data)}
+
+
+# ─────────────────────────────────────────────
+# Runtime state
+# ─────────────────────────────────────────────
+
+_tables: Optional[dict] = None
+_lookups: Optional["_Lookups"] = None
+# IVR_SESSION_BACKEND=resp://host:port shares sessions between containers.
+session_manager = session_manager_from_url(os.environ.get("IVR_SESSION_BACKEND"))
+
+
+def load_tables(path: str = TABLES_PATH) -> dict:
+    """Read the tables file (one read) and use it for the following requests."""
+    global _tables
+    with open(path, "rb") as fh:
+        tables = marshal.loads(fh.read())
+    if tables.get("format") != _FORMAT or tables.get("python") != tuple(sys.version_info[:2]):
+        raise RuntimeError(
+            f"{path} was built by another version; rebuild it: python lambda_handler.py --build"
+        )
+    _tables = tables
+    return tables
+
+
+class _Lookups:
+    """
+    PNR / train lookups, set up on the first request that needs them. The
+    mock data (or a mapped store) is read directly, through data_store's
+    caches; IVR_DATA_BACKEND=host:port goes through a DataService whose
+    event loop is kept for the container's lifetime, so its keep-alive
+    connections survive between invocations. What a lookup writes to the
+    session and says is decided by ivr_flow, as in main.py.
+    """
+
+    def __init__(self, voice: str):
+        import data_store
+        import ivr_flow
+
+        self.voice = voice
+        self.data_store = data_store
+        self.flow = ivr_flow
+        self.service = None
+        self.unavailable: tuple = ()        # in-memory lookups cannot fail
+        address = os.environ.get("IVR_DATA_BACKEND")
+        if address:
+            import asyncio
+
+            from data_backend import BackendUnavailable, DataService, backend_from_address
+
+            self.loop = asyncio.new_event_loop()
+            self.service = DataService(
+                backend_from_address(address),
+                timeout=float(os.environ.get("IVR_DATA_TIMEOUT", "2.0")),
+            )
+            self.unavailable = (BackendUnavailable,)
+
+    def record(self, kind: str, key: str) -> Optional[dict]:
+        """The "pnr" / "train" record of `key`."""
+        if self.service is None:
+            if kind == "pnr":
+                return self.data_store.get_pnr_status(key)
+            return self.data_store.get_train_info(key)
+        if kind == "pnr":
+            return self.loop.run_until_complete(self.service.get_pnr_status(key))
+        return self.loop.run_until_complete(self.service.get_train_info(key))
+
+    def correct(self, kind: str, key: str) -> Optional[tuple[str, dict]]:
+        """The number a not-found `key` was probably mistyped from, and its record."""
+        try:
+            if self.service is not None:
+                corrected = self.loop.run_until_complete(self.service.correct(kind, key))
+            elif kind == "pnr":
+                corrected = self.data_store.correct_pnr(key)
+            else:
+                corrected = self.data_store.correct_train(key)
+            record = None if corrected is None else self.record(kind, corrected)
+        except self.unavailable:
+            return None         # only the suggestion is lost, as in main._correction
+        return (corrected, record) if record else None
+
+
+def _lookup_service() -> _Lookups:
+    global _lookups
+    if _lookups is None:
+        _lookups = _Lookups(_tables["voice"])
+    return _lookups
+
+
+# ─────────────────────────────────────────────
+# Handler
+# ─────────────────────────────────────────────
+
+def handler(event: dict, context=None) -> dict:
+    """Answer one webhook invocation (API Gateway v1/v2 or function URL event)."""
+    tables = _tables or load_tables()
+    method, path = _method_and_path(event)
+    if method == "GET" and path == "/health":
+        return _response(200, '{"status":"ok","service":"IRCTC IVR Backend","version":"1.0.0"}',
+                         "application/json")
+    state = tables["routes"].get(path)
+    if method != "POST" or (state is None and path != "/voice" and not path.startswith("/ivr/")):
+        return _response(404, '{"detail":"Not Found"}', "application/json")
+
+    try:
+        return _xml(_answer(tables, path, state, _form(event)))
+    except SessionUnavailable:
+        return _xml(tables["static"]["unavailable"])
+
+
+def _answer(tables: dict, path: str, state: Optional[str], form: dict) -> str:
+    """The TwiML for one webhook."""
+    call_sid = form.get("CallSid") or "unknown"
+    digits = (form.get("Digits") or "").strip()
+    if path == "/voice":
+        session_manager.create_session(call_sid, caller=form.get("From"))
+        return tables["static"]["welcome"]
+    if path == "/handle-pnr":
+        if len(digits) != 10 or not digits.isdigit():
+            return tables["static"]["invalid_input"]
+        return _lookup_result("pnr", call_sid, digits)
+    if path == "/handle-train":
+        if len(digits) != 5 or not digits.isdigit():
+            return tables["static"]["invalid_input"]
+        return _lookup_result("train", call_sid, digits)
+    if path == "/handle-train-stops" and digits == "1":
+        return _next_stops(call_sid)
+    if path in _SUGGESTION_ROUTES and digits == "1":
+        return _accept_suggestion(call_sid, _SUGGESTION_ROUTES[path])
+    return _keypress(tables, state, call_sid, digits)
+
+
+def _keypress(tables: dict, state: Optional[str], call_sid: str, digits: str) -> str:
+    """A menu keypress, from the transition table."""
+    step = tables["transitions"].get((state, digits))
+    if step is None:
+        invalid = tables["invalid"].get(state)
+        if invalid is None:         # /ivr/<state> of no such menu
+            return tables["static"]["invalid_input"]
+        response, tracked = invalid
+        if tracked:
+            session_manager.update_session(call_sid, last_menu=state, last_digit=digits)
+        return response
+    response, changes, end = step
+    with session_manager.transaction(call_sid) as tx:
+        if changes:
+            tx.set(**changes)
+        if end:
+            tx.end()
+    return response
+
+
+def _lookup_result(kind: str, call_sid: str, key: str, changes: Optional[dict] = None) -> str:
+    """A "pnr" / "train" lookup (see main._lookup_result)."""
+    lookups = _lookup_service()
+    flow = lookups.flow
+    with session_manager.transaction(call_sid) as tx:
+        tx.set(**flow.lookup_fields(kind, key, changes))
+        try:
+            result = lookups.record(kind, key)
+        except lookups.unavailable:
+            return _tables["static"]["unavailable"]
+        suggestion = lookups.correct(kind, key) if flow.correction_wanted(result) else None
+        tx.set(**flow.result_fields(kind, key, result, suggestion))
+    return flow.result_response(kind, key, result, suggestion, lookups.voice).decode("utf-8")
+
+
+# Webhooks answering "Did you mean …?"; 1 takes the number offered.
+_SUGGESTION_ROUTES = {"/handle-pnr-suggestion": "pnr", "/handle-train-suggestion": "train"}
+
+
+def _accept_suggestion(call_sid: str, kind: str) -> str:
+    """The result for the number offered (see main._suggestion_input)."""
+    session = session_manager.get_session(call_sid)
+    accepted = _lookup_service().flow.accepted_suggestion(kind, session)
+    if accepted is None:
+        return _tables["static"]["invalid_input"]
+    return _lookup_result(kind, call_sid, *accepted)
+
+
+def _next_stops(call_sid: str) -> str:
+    """The next page of halts of the caller's last train (see main.handle_train_stops)."""
+    lookups = _lookup_service()
+    flow = lookups.flow
+    with session_manager.transaction(call_sid) as tx:
+        pending = flow.pending_stops(tx)
+        if pending is None:
+            return _tables["static"]["invalid_input"]
+        train_number, page = pending
+        try:
+            result = lookups.record("train", train_number)
+        except lookups.unavailable:
+            return _tables["static"]["unavailable"]
+        fields = flow.stops_fields(train_number, page, result)
+        if fields is None:
+            return _tables["static"]["invalid_input"]
+        tx.set(**fields)
+    return flow.stops_response(train_number, result, page, lookups.voice).decode("utf-8")
+
+
+# ─────────────────────────────────────────────
+# Events and responses
+# ─────────────────────────────────────────────
+
+def _method_and_path(event: dict) -> tuple[str, str]:
+    """Method and path of a v2 (HTTP API, function URL) or v1 (REST API) event."""
+    context = event.get("requestContext") or {}
+    http = context.get("http")
+    if http is not None:
+        method, path = http.get("method", ""), event.get("rawPath") or http.get("path", "/")
+        stage = context.get("stage")
+        if stage and stage != "$default" and path.startswith(f"/{stage}/"):
+            path = path[len(stage) + 1:]
+        return method.upper(), path
+    return event.get("httpMethod", "").upper(), event.get("path") or "/"
+
+
+def _form(event: dict) -> dict:
+    """
+    The urlencoded body as {name: value}. As with FastAPI's Form(None), the
+    last occurrence of a field wins and an empty value counts as missing.
+    """
+    body = event.get("body") or ""
+    if event.get("isBase64Encoded"):
+        body = binascii.a2b_base64(body).decode("utf-8", errors="replace")
+    return dict(parse_qsl(body))
+
+
+def _response(status: int, body: str, content_type: str) -> dict:
+    return {
+        "statusCode": status,
+        "headers": {"content-type": content_type},
+        "body": body,
+        "isBase64Encoded": False,
+    }
+
+
+def _xml(twiml: str) -> dict:
+    return _response(200, twiml, "application/xml")
+
+
+def invocation_event(path: str, form: Optional[dict] = None, method: str = "POST") -> dict:
+    """
+    A function URL / HTTP API (payload v2) event as Twilio's webhook
+    arrives through API Gateway, for local runs and benchmarks.
+    """
+    from urllib.parse import urlencode
+
+    body = urlencode(form or {}).encode("utf-8")
+    return {
+        "version": "2.0",
+        "routeKey": "$default",
+        "rawPath": path,
+        "rawQueryString": "",
+        "headers": {"content-type": "application/x-www-form-urlencoded"},
+        "requestContext": {"http": {"method": method, "path": path}, "stage": "$default"},
+        "body": binascii.b2a_base64(body, newline=False).decode("ascii"),
+        "isBase64Encoded": True,
+    }
+
+
+# ─────────────────────────────────────────────
+# CLI
+# ─────────────────────────────────────────────
+
+def main() -> None:
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Serverless entry point for the IVR")
+    parser.add_argument("--tables", default=TABLES_PATH, help="tables file (IVR_LAMBDA_TABLES)")
+    parser.add_argument("--voice", help="Twilio voice to render the responses in")
+    action = parser.add_mutually_exclusive_group(required=True)
+    action.add_argument("--build", action="store_true", help="compile the tables file")
+    action.add_argument("--invoke", metavar="PATH",
+                        help="send one simulated webhook; fields as NAME=VALUE arguments")
+    parser.add_argument("fields", nargs="*", metavar="NAME=VALUE")
+    args = parser.parse_args()
+
+    if args.build:
+        report = build_tables(args.tables, args.voice)
+        print(f"{args.tables}: {report['routes']} routes, {report['transitions']} "
+              f"transitions, {report['bytes']} bytes")
+        return
+    load_tables(args.tables)
+    form = dict(field.split("=", 1) for field in args.fields)
+    print(json.dumps(handler(invocation_event(args.invoke, form)), indent=1))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,335 @@
+"""
+IRCTC Conversational IVR - Load Generator
+Replays complete Twilio call flows against the app and reports per-endpoint
+latency percentiles and throughput.
+
+    python loadgen.py --asgi --concurrency 50 --duration 10
+    python loadgen.py --url http://127.0.0.1:8000 --rate 200 --duration 30
+
+Requests carry the same application/x-www-form-urlencoded fields Twilio
+sends. --asgi drives the app in-process (no sockets, measures the app
+alone; main.fast_app when IVR_FAST_PATH=1); --url goes over HTTP with
+keep-alive connections.
+"""
+
+import argparse
+import asyncio
+import random
+import time
+import urllib.parse
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Optional, Protocol
+
+# ─────────────────────────────────────────────
+# Call scripts
+# ─────────────────────────────────────────────
+# Each step is (endpoint, Digits or None). A script ending without a
+# goodbye models a caller hanging up mid-flow.
+
+_KNOWN_PNRS   = ["2154673890", "4521987630", "7893214560", "3347821905", "9012345678"]
+_KNOWN_TRAINS = ["12952", "12001", "12213", "22439", "12216"]
+_PAGED_TRAINS = {"12216": 2}       # schedules read in pages ("press 1 for more stops")
+
+
+def _pnr_check(rng: random.Random) -> list[tuple[str, Optional[str]]]:
+    steps = [("/voice", None), ("/handle-menu", "1"), ("/handle-pnr", rng.choice(_KNOWN_PNRS))]
+    for _ in range(rng.choice((0, 0, 1, 2))):   # "press 1 to check another"
+        steps += [("/handle-pnr-options", "1"), ("/handle-pnr", rng.choice(_KNOWN_PNRS))]
+    return steps + [("/handle-pnr-options", rng.choice(("2", "9", "9")))]
+
+
+def _train_info(rng: random.Random) -> list[tuple[str, Optional[str]]]:
+    train = rng.choice(_KNOWN_TRAINS)
+    steps = [("/voice", None), ("/handle-menu", "2"), ("/handle-train", train)]
+    steps += [("/handle-train-stops", "1")] * (_PAGED_TRAINS.get(train, 1) - 1)
+    return steps + [("/handle-train-options", "9")]
+
+
+def _unknown_number(rng: random.Random) -> list[tuple[str, Optional[str]]]:
+    return [
+        ("/voice", None), ("/handle-menu", "1"),
+        ("/handle-pnr", "".join(rng.choice("0123456789") for _ in range(10))),
+        ("/handle-pnr-options", "9"),
+    ]
+
+
+def _invalid_input(rng: random.Random) -> list[tuple[str, Optional[str]]]:
+    return [
+        ("/voice", None), ("/handle-menu", rng.choice(("0", "5", "*", ""))),
+        ("/voice", None), ("/handle-menu", "2"),
+        ("/handle-train", "123"),          # too short → invalid, back to /voice
+        ("/voice", None), ("/handle-menu", "9"),
+    ]
+
+
+def _hang_up(rng: random.Random) -> list[tuple[str, Optional[str]]]:
+    return [("/voice", None), ("/handle-menu", rng.choice(("1", "2")))]
+
+
+SCENARIOS = {
+    "pnr_check":      (_pnr_check, 50),
+    "train_info":     (_train_info, 25),
+    "unknown_number": (_unknown_number, 8),
+    "invalid_input":  (_invalid_input, 9),
+    "hang_up":        (_hang_up, 8),
+}
+
+
+def twilio_form(call_sid: str, caller: str, digits: Optional[str]) -> bytes:
+    """Form body shaped like a Twilio voice webhook."""
+    fields = {
+        "AccountSid": "AC00000000000000000000000000000000",
+        "ApiVersion": "2010-04-01",
+        "CallSid":    call_sid,
+        "CallStatus": "in-progress",
+        "Called":     "+918000000000",
+        "Caller":     caller,
+        "Direction":  "inbound",
+        "From":       caller,
+        "To":         "+918000000000",
+    }
+    if digits is not None:
+        fields["Digits"] = digits
+        fields["FinishedOnKey"] = "#"
+    return urllib.parse.urlencode(fields).encode("ascii")
+
+
+# ─────────────────────────────────────────────
+# Transports
+# ─────────────────────────────────────────────
+
+class Transport(Protocol):
+    async def post(self, path: str, body: bytes) -> tuple[int, bytes]: ...
+
+    async def close(self) -> None: ...
+
+
+class AsgiTransport:
+    """Calls an ASGI app directly, in-process."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def post(self, path: str, body: bytes) -> tuple[int, bytes]:
+        scope = {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+            "method": "POST", "scheme": "http", "path": path,
+            "raw_path": path.encode("ascii"), "query_string": b"", "root_path": "",
+            "server": ("loadgen", 80), "client": ("127.0.0.1", 0),
+            "headers": [
+                (b"host", b"loadgen"),
+                (b"content-type", b"application/x-www-form-urlencoded"),
+                (b"content-length", str(len(body)).encode("ascii")),
+            ],
+        }
+        pending = [{"type": "http.request", "body": body, "more_body": False}]
+        status = 500
+        chunks: list[bytes] = []
+
+        async def receive():
+            if pending:
+                return pending.pop()
+            await asyncio.Event().wait()   # never disconnects
+
+        async def send(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+
+        # A real network hop always yields to the event loop; without this a
+        # caller whose requests never block would run whole calls back to
+        # back and starve every request that does await something.
+        await asyncio.sleep(0)
+        await self.app(scope, receive, send)
+        return status, b"".join(chunks)
+
+    async def close(self) -> None:
+        pass
+
+
+class HttpTransport:
+    """POSTs over HTTP/1.1 keep-alive connections."""
+
+    _HEADERS = {"Content-Type": "application/x-www-form-urlencoded"}
+
+    def __init__(self, host: str, port: int, max_connections: int = 100):
+        from http_pool import HttpConnectionPool
+
+        self._pool = HttpConnectionPool(host, port, max_connections)
+
+    async def post(self, path: str, body: bytes) -> tuple[int, bytes]:
+        status, _, resp_body = await self._pool.request("POST", path, body, self._HEADERS)
+        return status, resp_body
+
+    async def close(self) -> None:
+        await self._pool.close()
+
+
+# ─────────────────────────────────────────────
+# Runner
+# ─────────────────────────────────────────────
+
+@dataclass
+class LoadReport:
+    elapsed: float = 0.0
+    calls: int = 0
+    latencies: dict[str, list[float]] = field(default_factory=lambda: defaultdict(list))
+    errors: dict[str, int] = field(default_factory=lambda: defaultdict(int))
+
+    @property
+    def requests(self) -> int:
+        return sum(len(v) for v in self.latencies.values())
+
+    def merge(self, other: "LoadReport") -> None:
+        self.elapsed = max(self.elapsed, other.elapsed)
+        self.calls += other.calls
+        for path, values in other.latencies.items():
+            self.latencies[path] += values
+        for path, count in other.errors.items():
+            self.errors[path] += count
+
+    def format(self) -> str:
+        rows = [
+            f"{'endpoint':<24}{'count':>8}{'errors':>8}"
+            f"{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}"
+        ]
+        for path in sorted(self.latencies):
+            values = sorted(self.latencies[path])
+            rows.append(
+                f"{path:<24}{len(values):>8}{self.errors.get(path, 0):>8}"
+                + "".join(f"{percentile(values, q) * 1e3:>9.2f}" for q in (50, 95, 99, 100))
+            )
+        elapsed = self.elapsed or 1.0
+        rows.append(
+            f"{self.calls} calls, {self.requests} requests in {self.elapsed:.1f}s — "
+            f"{self.requests / elapsed:.0f} req/s, {self.calls / elapsed:.1f} calls/s"
+        )
+        return "\n".join(rows)
+
+
+def percentile(sorted_values: list[float], q: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, round(q / 100 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+async def _run_call(transport: Transport, report: LoadReport, rng: random.Random,
+                    call_sid: str, think_time: float) -> None:
+    names = list(SCENARIOS)
+    weights = [SCENARIOS[name][1] for name in names]
+    script = SCENARIOS[rng.choices(names, weights)[0]][0](rng)
+    caller = f"+9198{rng.randrange(10**8):08d}"
+    for path, digits in script:
+        body = twilio_form(call_sid, caller, digits)
+        start = time.perf_counter()
+        try:
+            status, _ = await transport.post(path, body)
+        except Exception:
+            status = 0
+        report.latencies[path].append(time.perf_counter() - start)
+        if status != 200:
+            report.errors[path] += 1
+        if think_time:
+            await asyncio.sleep(rng.expovariate(1 / think_time))
+    report.calls += 1
+
+
+async def run_load(
+    transport: Transport,
+    duration: float = 10.0,
+    concurrency: int = 50,
+    rate: float = 0.0,
+    think_time: float = 0.0,
+    seed: int = 0,
+) -> LoadReport:
+    """
+    Drive call flows for `duration` seconds.
+
+    rate == 0: closed loop — `concurrency` callers each start a new call as
+               soon as the previous one finishes.
+    rate > 0:  open loop — new calls arrive as a Poisson process at `rate`
+               calls/s, with at most `concurrency` in progress (arrivals
+               beyond that wait, which shows up as latency).
+    """
+    rng = random.Random(seed)
+    report = LoadReport()
+    started = time.perf_counter()
+    deadline = started + duration
+    sequence = 0
+
+    def next_sid() -> str:
+        nonlocal sequence
+        sequence += 1
+        return f"CA{seed:08x}{sequence:024x}"
+
+    if rate <= 0:
+        async def caller_loop() -> None:
+            while time.perf_counter() < deadline:
+                await _run_call(transport, report, rng, next_sid(), think_time)
+
+        await asyncio.gather(*(caller_loop() for _ in range(concurrency)))
+    else:
+        slots = asyncio.Semaphore(concurrency)
+        tasks: set[asyncio.Task] = set()
+
+        async def admitted(call_sid: str) -> None:
+            async with slots:
+                await _run_call(transport, report, rng, call_sid, think_time)
+
+        while time.perf_counter() < deadline:
+            task = asyncio.ensure_future(admitted(next_sid()))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+            await asyncio.sleep(rng.expovariate(rate))
+        if tasks:
+            await asyncio.gather(*tasks)
+
+    report.elapsed = time.perf_counter() - started
+    return report
+
+
+# ─────────────────────────────────────────────
+# CLI
+# ─────────────────────────────────────────────
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[1])
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--asgi", action="store_true", help="drive the app in-process")
+    target.add_argument("--url", help="base URL of a running server, e.g. http://127.0.0.1:8000")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds")
+    parser.add_argument("--concurrency", type=int, default=50, help="max calls in progress")
+    parser.add_argument("--rate", type=float, default=0.0,
+                        help="call arrivals per second (0 = closed loop)")
+    parser.add_argument("--think-time", type=float, default=0.0,
+                        help="mean pause between a caller's keypresses, seconds")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    async def run() -> LoadReport:
+        if args.asgi:
+            import main
+            from fastpath import asgi_target
+
+            # IVR_FAST_PATH=1 drives main.fast_app, like the server would.
+            transport: Transport = AsgiTransport(getattr(main, asgi_target().split(":")[1]))
+        else:
+            parsed = urllib.parse.urlsplit(args.url)
+            transport = HttpTransport(parsed.hostname, parsed.port or 80, args.concurrency)
+        try:
+            return await run_load(
+                transport, args.duration, args.concurrency, args.rate, args.think_time, args.seed
+            )
+        finally:
+            await transport.close()
+
+    print(asyncio.run(run()).format())
+
+
+if __name__ == "__main__":
+    main()
@@ -4,24 +4,164 @@ FastAPI middleware layer connecting Twilio telephony to IRCTC logic.
 """
 
 from fastapi import FastAPI, Form, Request
-from fastapi.responses import Response
-from typing import Optional
+from fastapi.responses import JSONResponse, PlainTextResponse, Response
+from contextlib import asynccontextmanager
+from typing import Mapping, Optional
+import asyncio
+import hmac
+import json
+import os
 import uvicorn
 
 from ivr_logic import (
-    build_welcome_twiml,
-    build_main_menu_twiml,
-    build_pnr_gather_twiml,
-    build_pnr_result_twiml,
-    build_train_gather_twiml,
-    build_train_result_twiml,
-    build_invalid_input_twiml,
-    build_goodbye_twiml,
+    BOOKING_KEY,
+    MENU_STRUCTURE,
+    render_welcome_offer,
+    rendered_results,
+    set_speech_input,
+    speech_input_enabled,
+    static_responses,
 )
-from session_manager import SessionManager
+from admission import AdmissionController, AdmissionMiddleware
+from call_journal import CallJournal, JournalMiddleware, note_call
+from change_feed import ChangeFeed, UpdateError
+from data_backend import BackendUnavailable, DataService, backend_from_address
+from data_store import cache_stats, pnr_version
+from fastpath import FastPathApp, asgi_target
+import ivr_flow
+from menu_engine import MenuEngine
+from metrics import MetricsMiddleware, TimedSessionBackend, metrics
+from nlu import IntentService
+from prompt_audio import PromptLibrary
+from session_manager import InMemorySessionBackend, SessionUnavailable, session_manager_from_url
+from speech import speech_cache
+
+
+change_feed = ChangeFeed()
+# IVR_UPDATE_TOKEN enables POST /admin/pnr-updates for holders of the token.
+_UPDATE_TOKEN = os.environ.get("IVR_UPDATE_TOKEN")
+
+
+# IVR_SPEECH_INPUT=1 lets callers speak as well as press keys; what they say
+# is classified by IVR_NLU_WORKERS processes (see nlu.py).
+_SPEECH_INPUT = os.environ.get("IVR_SPEECH_INPUT") == "1"
+intent_service = IntentService(workers=int(os.environ.get("IVR_NLU_WORKERS", "1")))
+
+# IVR_JOURNAL_DIR=dir records every webhook and finished call in rotated
+# JSONL segments there (see call_journal.py).
+journal: Optional[CallJournal] = None
+if os.environ.get("IVR_JOURNAL_DIR"):
+    journal = CallJournal(os.environ["IVR_JOURNAL_DIR"])
+
+
+# Past IVR_MAX_IN_FLIGHT requests or IVR_MAX_LOOP_LAG seconds of event-loop
+# lag, new calls hear a busy message while calls in progress carry on (see
+# admission.py). 0 turns a signal off.
+admission = AdmissionController(
+    max_in_flight=int(os.environ.get("IVR_MAX_IN_FLIGHT", "200")),
+    max_lag=float(os.environ.get("IVR_MAX_LOOP_LAG", "0.25")),
+)
+
+
+@asynccontextmanager
+async def _lifespan(app: FastAPI):
+    """
+    IVR_UPDATE_LOG=path tails a PNR update log while the app runs; with
+    speech input, the classifier processes start before the first call;
+    the call journal is drained in the background and flushed on exit;
+    event-loop lag is sampled for admission control.
+    """
+    path = os.environ.get("IVR_UPDATE_LOG")
+    tailer = asyncio.ensure_future(change_feed.tail(path)) if path else None
+    drainer = asyncio.ensure_future(journal.run()) if journal is not None else None
+    lag_monitor = asyncio.ensure_future(admission.run())
+    if _SPEECH_INPUT:
+        intent_service.start()
+    try:
+        yield
+    finally:
+        lag_monitor.cancel()
+        if tailer is not None:
+            tailer.cancel()
+        if drainer is not None:
+            drainer.cancel()
+            journal.close()
+        intent_service.close()
+
+
+async def _call_in_progress(call_sid: str) -> bool:
+    try:
+        return await session_manager.aget_session(call_sid) is not None
+    except SessionUnavailable:
+        return False
+
+
+def _busy() -> bytes:
+    return static_responses.get("busy")
+
+
+# (middleware, options), innermost first. The FastAPI app and the fast path
+# are wrapped in the same order: Journal → Metrics → Admission → endpoint.
+_MIDDLEWARE = [
+    (AdmissionMiddleware, {"controller": admission, "has_session": _call_in_progress,
+                           "busy": _busy}),
+    (MetricsMiddleware, {"metrics": metrics}),
+]
+if journal is not None:
+    _MIDDLEWARE.append((JournalMiddleware, {"journal": journal}))
+
+app = FastAPI(title="IRCTC IVR Backend", version="1.0.0", lifespan=_lifespan)
+for middleware, options in _MIDDLEWARE:
+    app.add_middleware(middleware, **options)
+# IVR_SESSION_BACKEND=resp://host:port shares sessions between workers.
+session_manager = session_manager_from_url(os.environ.get("IVR_SESSION_BACKEND"))
+if journal is not None:
+    session_manager.backend.on_close = journal.session_closed
+session_manager.backend = TimedSessionBackend(session_manager.backend, metrics)
+# IVR_DATA_BACKEND=host:port looks records up over HTTP; otherwise the
+# in-memory mock data is served.
+data_service = DataService(
+    backend_from_address(os.environ.get("IVR_DATA_BACKEND")),
+    timeout=float(os.environ.get("IVR_DATA_TIMEOUT", "2.0")),
+)
+
+# IVR_PROMPT_DIR=dir (built by prompt_audio.py) <Play>s pre-synthesized audio
+# for the fixed prompts; IVR_PROMPT_BASE_URL serves it from elsewhere (a CDN).
+prompt_library: Optional[PromptLibrary] = None
+if os.environ.get("IVR_PROMPT_DIR"):
+    prompt_library = PromptLibrary(
+        os.environ["IVR_PROMPT_DIR"], os.environ.get("IVR_PROMPT_BASE_URL", "/prompts/")
+    ).install()
+
+if _SPEECH_INPUT:
+    set_speech_input(True)
+
+# Render every static menu response once, before the first webhook arrives.
+static_responses.warm()
+# Compile (and validate) the menu graph; a broken MENU_STRUCTURE fails here.
+menu_engine = MenuEngine()
+
+
+def _xml(twiml) -> Response:
+    """Wrap a TwiML body (str or pre-encoded bytes) in an XML response."""
+    return Response(content=twiml, media_type="application/xml")
+
+
+def _spoken(speech: Optional[str]) -> Optional[str]:
+    """SpeechResult, if speech input is on; otherwise callers can only key."""
+    return speech if speech_input_enabled() else None
+
+
+def _invalid(route: str) -> bytes:
+    """The invalid-input redirect, counted per route for /metrics."""
+    metrics.count_invalid_input(route)
+    return static_responses.get("invalid_input")
+
 
-app = FastAPI(title="IRCTC IVR Backend", version="1.0.0")
-session_manager = SessionManager()
+@app.exception_handler(SessionUnavailable)
+async def _session_unavailable(request: Request, exc: SessionUnavailable) -> Response:
+    """The session store is down: the caller hears an apology, not an application error."""
+    return _xml(static_responses.get("unavailable"))
 
 
 # ─────────────────────────────────────────────
@@ -34,15 +174,121 @@ async def voice_entry(
 ):
     """
     Twilio calls this endpoint when a user dials the number.
-    Greets the caller and presents the main menu.
+    Greets the caller and presents the main menu. A caller with bookings
+    on record has them fetched and rendered while the greeting plays, and
+    is offered the latest one on BOOKING_KEY.
     """
+    metrics.form_parsed()
+    note_call(CallSid)
     call_sid = CallSid or "unknown"
 
-    # Initialise a fresh session for this call
-    session_manager.create_session(call_sid, caller=From)
+    # Start the call's session (kept if the call was sent back here)
+    await session_manager.acreate_session(call_sid, caller=From)
 
-    twiml = build_welcome_twiml()
-    return Response(content=twiml, media_type="application/xml")
+    bookings = await _caller_bookings(From) if From else []
+    if not bookings:
+        return _xml(static_responses.get("welcome"))
+    await session_manager.aupdate_session(call_sid, booking_pnr=bookings[0]["pnr"])
+    booking_stats["offered"] += 1
+    return _xml(render_welcome_offer(bookings[0]["train_name"]))
+
+
+# ─────────────────────────────────────────────
+# Caller bookings (prefetched on /voice)
+# ─────────────────────────────────────────────
+# /voice waits at most this long for the caller's bookings before greeting
+# without the offer; the prefetch itself carries on in the background.
+_OFFER_WAIT = 0.25
+_prefetches: set[asyncio.Task] = set()
+booking_stats = {"prefetched": 0, "offered": 0, "accepted": 0, "failed": 0}
+
+
+async def _prefetch_bookings(caller: str) -> list[dict]:
+    """
+    Look up and render the caller's recent bookings, leaving them in the
+    lookup and rendered-response caches for when the caller asks.
+    """
+    pnrs = await data_service.get_caller_pnrs(caller)
+    records = await asyncio.gather(*(data_service.get_pnr_status(pnr) for pnr in pnrs))
+    bookings = []
+    for pnr, record in zip(pnrs, records):
+        if record:
+            rendered_results.pnr(pnr, record, pnr_version(pnr))
+            bookings.append(record)
+    booking_stats["prefetched"] += len(bookings)
+    return bookings
+
+
+def _prefetch_done(task: asyncio.Task) -> None:
+    _prefetches.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        booking_stats["failed"] += 1
+
+
+async def _caller_bookings(caller: str) -> list[dict]:
+    """The caller's bookings, latest journey first; [] if they take too long."""
+    task = asyncio.ensure_future(_prefetch_bookings(caller))
+    _prefetches.add(task)
+    task.add_done_callback(_prefetch_done)
+    try:
+        return await asyncio.wait_for(asyncio.shield(task), _OFFER_WAIT)
+    except (asyncio.TimeoutError, BackendUnavailable):
+        return []
+
+
+# ─────────────────────────────────────────────
+# Menu keypresses (compiled from MENU_STRUCTURE)
+# ─────────────────────────────────────────────
+async def _menu_keypress(
+    state: str, call_sid: Optional[str], digits: Optional[str], route: str
+) -> bytes:
+    """Resolve one keypress through the menu engine and apply its session delta."""
+    step = menu_engine.resolve(state, (digits or "").strip())
+    if step is None:
+        return _invalid(route)
+    note_call(flow=step.session.get("flow"))
+
+    # All session changes for this request are committed in one write.
+    async with session_manager.transaction(call_sid or "unknown") as tx:
+        if step.session:
+            tx.set(**step.session)
+        if step.end:
+            tx.end()
+
+    if not step.valid:
+        # Invalid input → redirect back to main menu
+        metrics.count_invalid_input(route)
+    return step.response
+
+
+def _option_for(state: str, target: Optional[str]) -> Optional[str]:
+    """The key of menu `state` that leads to `target` (None if there is none)."""
+    options = (MENU_STRUCTURE.get(state) or {}).get("options") or {}
+    return next((digits for digits, option in options.items() if option == target), None)
+
+
+async def _menu_input(
+    state: str, call_sid: Optional[str], digits: Optional[str], speech: Optional[str], route: str
+) -> bytes:
+    """
+    A keypress, or a spoken request (SpeechResult) resolved as the key that
+    leads where the caller asked to go. A request that also names a PNR or
+    train number ("PNR 2154673890") is answered straight away.
+    """
+    if digits or not speech:
+        return await _menu_keypress(state, call_sid, digits, route)
+    intent = await intent_service.classify(speech)
+    key = _option_for(state, intent.state)
+    if key is None:
+        return _invalid(route)
+    step = menu_engine.resolve(state, key)
+    if step.next_state == "pnr_gather" and intent.pnr:
+        return await _lookup_result("pnr", call_sid or "unknown", intent.pnr, step.session)
+    if step.next_state == "train_gather" and intent.train_number:
+        return await _lookup_result(
+            "train", call_sid or "unknown", intent.train_number, step.session
+        )
+    return await _menu_keypress(state, call_sid, key, route)
 
 
 # ─────────────────────────────────────────────
@@ -52,35 +298,29 @@ async def voice_entry(
 async def handle_menu(
     CallSid: Optional[str] = Form(None),
     Digits: Optional[str] = Form(None),
+    SpeechResult: Optional[str] = Form(None),
 ):
     """
     Processes the caller's top-level menu choice:
         1 → PNR Status inquiry
         2 → Train Schedule / Info inquiry
         9 → Goodbye
+    or the same choices spoken ("check my PNR", "train timings" …), and
+        3 → status of the booking offered at the welcome, if there was one
     """
-    call_sid = CallSid or "unknown"
-    digits = (Digits or "").strip()
-
-    session_manager.update_session(call_sid, last_menu="main", last_digit=digits)
-
-    if digits == "1":
-        session_manager.update_session(call_sid, flow="pnr")
-        twiml = build_pnr_gather_twiml()
-
-    elif digits == "2":
-        session_manager.update_session(call_sid, flow="train")
-        twiml = build_train_gather_twiml()
-
-    elif digits == "9":
-        session_manager.end_session(call_sid)
-        twiml = build_goodbye_twiml()
-
-    else:
-        # Invalid input → redirect back to main menu
-        twiml = build_invalid_input_twiml(redirect_to="/voice")
-
-    return Response(content=twiml, media_type="application/xml")
+    metrics.form_parsed()
+    note_call(CallSid, Digits, SpeechResult)
+    if (Digits or "").strip() == BOOKING_KEY:
+        session = await session_manager.aget_session(CallSid or "unknown")
+        pnr = session.get("booking_pnr") if session is not None else None
+        if pnr:
+            booking_stats["accepted"] += 1
+            return _xml(await _lookup_result("pnr", CallSid or "unknown", pnr, {
+                "flow": "pnr", "last_menu": "main", "last_digit": BOOKING_KEY,
+            }))
+    return _xml(await _menu_input(
+        "main", CallSid, Digits, _spoken(SpeechResult), "/handle-menu"
+    ))
 
 
 # ─────────────────────────────────────────────
@@ -90,24 +330,21 @@ async def handle_menu(
 async def handle_pnr(
     CallSid: Optional[str] = Form(None),
     Digits: Optional[str] = Form(None),
+    SpeechResult: Optional[str] = Form(None),
 ):
     """
-    Receives a 10-digit PNR number, queries the mock data store,
-    and reads back the booking status, coach, and berth.
+    Receives a 10-digit PNR number (keyed or spoken), queries the mock
+    data store, and reads back the booking status, coach, and berth.
     """
-    from data_store import get_pnr_status
-
-    call_sid = CallSid or "unknown"
+    metrics.form_parsed()
+    note_call(CallSid, Digits, SpeechResult, flow="pnr")
     pnr = (Digits or "").strip()
+    if not pnr and _spoken(SpeechResult):
+        pnr = (await intent_service.classify(SpeechResult)).pnr or ""
 
     if len(pnr) != 10 or not pnr.isdigit():
-        twiml = build_invalid_input_twiml(redirect_to="/voice")
-        return Response(content=twiml, media_type="application/xml")
-
-    session_manager.update_session(call_sid, last_pnr=pnr)
-    result = get_pnr_status(pnr)
-    twiml = build_pnr_result_twiml(pnr, result)
-    return Response(content=twiml, media_type="application/xml")
+        return _xml(_invalid("/handle-pnr"))
+    return _xml(await _lookup_result("pnr", CallSid or "unknown", pnr))
 
 
 # ─────────────────────────────────────────────
@@ -117,24 +354,135 @@ async def handle_pnr(
 async def handle_train(
     CallSid: Optional[str] = Form(None),
     Digits: Optional[str] = Form(None),
+    SpeechResult: Optional[str] = Form(None),
 ):
     """
-    Receives a 5-digit train number, queries the mock data store,
-    and reads back the train schedule.
+    Receives a 5-digit train number (keyed or spoken), queries the mock
+    data store, and reads back the train schedule.
     """
-    from data_store import get_train_info
-
-    call_sid = CallSid or "unknown"
+    metrics.form_parsed()
+    note_call(CallSid, Digits, SpeechResult, flow="train")
     train_number = (Digits or "").strip()
+    if not train_number and _spoken(SpeechResult):
+        train_number = (await intent_service.classify(SpeechResult)).train_number or ""
 
     if len(train_number) != 5 or not train_number.isdigit():
-        twiml = build_invalid_input_twiml(redirect_to="/voice")
-        return Response(content=twiml, media_type="application/xml")
+        return _xml(_invalid("/handle-train"))
+    return _xml(await _lookup_result("train", CallSid or "unknown", train_number))
 
-    session_manager.update_session(call_sid, last_train=train_number)
-    result = get_train_info(train_number)
-    twiml = build_train_result_twiml(train_number, result)
-    return Response(content=twiml, media_type="application/xml")
+
+# ─────────────────────────────────────────────
+# PNR / train lookups (shared with lambda_handler via ivr_flow)
+# ─────────────────────────────────────────────
+async def _lookup_result(
+    kind: str, call_sid: str, key: str, changes: Optional[Mapping] = None
+) -> bytes:
+    """
+    Look up and render a "pnr" / "train" number (a train's first page);
+    `changes` are staged on the same session write. What is written and
+    said is decided by ivr_flow, as in lambda_handler.
+    """
+    note_call(flow=kind)
+    async with session_manager.transaction(call_sid) as tx:
+        tx.set(**ivr_flow.lookup_fields(kind, key, changes))
+        try:
+            with metrics.timed("lookup"):
+                result = await _record(kind, key)
+                wanted = ivr_flow.correction_wanted(result)
+                suggestion = await _correction(kind, key) if wanted else None
+        except BackendUnavailable:
+            return static_responses.get("unavailable")
+        tx.set(**ivr_flow.result_fields(kind, key, result, suggestion))
+    with metrics.timed("render"):
+        return ivr_flow.result_response(kind, key, result, suggestion)
+
+
+async def _record(kind: str, key: str) -> Optional[dict]:
+    """The "pnr" / "train" record of `key`, from the data backend."""
+    if kind == "pnr":
+        return await data_service.get_pnr_status(key)
+    return await data_service.get_train_info(key)
+
+
+# ─────────────────────────────────────────────
+# "Did you mean …?" corrections of numbers not found
+# ─────────────────────────────────────────────
+correction_stats = {
+    (kind, outcome): 0
+    for kind in ("pnr", "train") for outcome in ("offered", "accepted", "unmatched")
+}
+
+
+async def _correction(kind: str, key: str) -> Optional[tuple[str, dict]]:
+    """
+    The "pnr" / "train" number that `key`, not found, was probably mistyped
+    from, and its record; None if there is none. A failed correction lookup
+    only costs the suggestion: the caller still hears "not found".
+    """
+    try:
+        corrected = await data_service.correct(kind, key)
+        record = None if corrected is None else await _record(kind, corrected)
+    except BackendUnavailable:
+        return None
+    if not record:
+        correction_stats[(kind, "unmatched")] += 1
+        return None
+    correction_stats[(kind, "offered")] += 1
+    return corrected, record
+
+
+async def _suggestion_input(
+    kind: str, call_sid: Optional[str], digits: Optional[str], speech: Optional[str], route: str
+) -> bytes:
+    """
+    1 (or a spoken "yes") answers with the number offered for the one not
+    found; the other keys are ordinary options of the `suggest` menu.
+    """
+    state = ivr_flow.suggestion_state(kind)
+    accepted = (digits or "").strip() == "1"
+    if not accepted and not digits and speech:
+        accepted = (await intent_service.classify(speech)).state == "yes"
+    if not accepted:
+        return await _menu_input(state, call_sid, digits, speech, route)
+
+    session = await session_manager.aget_session(call_sid or "unknown")
+    accepted = ivr_flow.accepted_suggestion(kind, session)
+    if accepted is None:
+        return _invalid(route)
+    correction_stats[(kind, "accepted")] += 1
+    return await _lookup_result(kind, call_sid or "unknown", *accepted)
+
+
+# ─────────────────────────────────────────────
+# POST /handle-pnr-suggestion — Answer to "Did you mean P.N.R. …?"
+# ─────────────────────────────────────────────
+@app.post("/handle-pnr-suggestion")
+async def handle_pnr_suggestion(
+    CallSid: Optional[str] = Form(None),
+    Digits: Optional[str] = Form(None),
+    SpeechResult: Optional[str] = Form(None),
+):
+    metrics.form_parsed()
+    note_call(CallSid, Digits, SpeechResult, flow="pnr")
+    return _xml(await _suggestion_input(
+        "pnr", CallSid, Digits, _spoken(SpeechResult), "/handle-pnr-suggestion"
+    ))
+
+
+# ─────────────────────────────────────────────
+# POST /handle-train-suggestion — Answer to "Did you mean train …?"
+# ─────────────────────────────────────────────
+@app.post("/handle-train-suggestion")
+async def handle_train_suggestion(
+    CallSid: Optional[str] = Form(None),
+    Digits: Optional[str] = Form(None),
+    SpeechResult: Optional[str] = Form(None),
+):
+    metrics.form_parsed()
+    note_call(CallSid, Digits, SpeechResult, flow="train")
+    return _xml(await _suggestion_input(
+        "train", CallSid, Digits, _spoken(SpeechResult), "/handle-train-suggestion"
+    ))
 
 
 # ─────────────────────────────────────────────
@@ -144,20 +492,13 @@ async def handle_train(
 async def handle_pnr_options(
     CallSid: Optional[str] = Form(None),
     Digits: Optional[str] = Form(None),
+    SpeechResult: Optional[str] = Form(None),
 ):
-    digits = (Digits or "").strip()
-
-    if digits == "1":
-        twiml = build_pnr_gather_twiml()
-    elif digits == "2":
-        twiml = build_main_menu_twiml()
-    elif digits == "9":
-        session_manager.end_session(CallSid or "unknown")
-        twiml = build_goodbye_twiml()
-    else:
-        twiml = build_invalid_input_twiml(redirect_to="/voice")
-
-    return Response(content=twiml, media_type="application/xml")
+    metrics.form_parsed()
+    note_call(CallSid, Digits, SpeechResult)
+    return _xml(await _menu_input(
+        "pnr_options", CallSid, Digits, _spoken(SpeechResult), "/handle-pnr-options"
+    ))
 
 
 # ─────────────────────────────────────────────
@@ -167,20 +508,118 @@ async def handle_pnr_options(
 async def handle_train_options(
     CallSid: Optional[str] = Form(None),
     Digits: Optional[str] = Form(None),
+    SpeechResult: Optional[str] = Form(None),
+):
+    metrics.form_parsed()
+    note_call(CallSid, Digits, SpeechResult)
+    return _xml(await _menu_input(
+        "train_options", CallSid, Digits, _spoken(SpeechResult), "/handle-train-options"
+    ))
+
+
+# ─────────────────────────────────────────────
+# POST /handle-train-stops — Paging through a long schedule
+# ─────────────────────────────────────────────
+@app.post("/handle-train-stops")
+async def handle_train_stops(
+    CallSid: Optional[str] = Form(None),
+    Digits: Optional[str] = Form(None),
+    SpeechResult: Optional[str] = Form(None),
 ):
+    """
+    1 (or "more stops") reads the next page of halts of the caller's last
+    train; the other keys are ordinary train_stops menu options.
+    """
+    metrics.form_parsed()
+    note_call(CallSid, Digits, SpeechResult, flow="train")
     digits = (Digits or "").strip()
+    if not digits and _spoken(SpeechResult):
+        intent = await intent_service.classify(SpeechResult)
+        more = intent.state in ("more", "yes")
+        digits = "1" if more else _option_for("train_stops", intent.state) or ""
+    if digits != "1":
+        return _xml(await _menu_keypress("train_stops", CallSid, digits, "/handle-train-stops"))
+
+    async with session_manager.transaction(CallSid or "unknown") as tx:
+        await tx.load()
+        pending = ivr_flow.pending_stops(tx)
+        if pending is None:
+            return _xml(_invalid("/handle-train-stops"))
+        train_number, page = pending
+        try:
+            with metrics.timed("lookup"):
+                result = await data_service.get_train_info(train_number)
+        except BackendUnavailable:
+            return _xml(static_responses.get("unavailable"))
+        fields = ivr_flow.stops_fields(train_number, page, result)
+        if fields is None:
+            return _xml(_invalid("/handle-train-stops"))
+        tx.set(**fields)
+    with metrics.timed("render"):
+        return _xml(ivr_flow.stops_response(train_number, result, page))
 
-    if digits == "1":
-        twiml = build_train_gather_twiml()
-    elif digits == "2":
-        twiml = build_main_menu_twiml()
-    elif digits == "9":
-        session_manager.end_session(CallSid or "unknown")
-        twiml = build_goodbye_twiml()
-    else:
-        twiml = build_invalid_input_twiml(redirect_to="/voice")
 
-    return Response(content=twiml, media_type="application/xml")
+# ─────────────────────────────────────────────
+# POST /ivr/{state}  — Any other menu in MENU_STRUCTURE
+# ─────────────────────────────────────────────
+@app.post("/ivr/{state}")
+async def handle_menu_state(
+    state: str,
+    CallSid: Optional[str] = Form(None),
+    Digits: Optional[str] = Form(None),
+    SpeechResult: Optional[str] = Form(None),
+):
+    """
+    Generic webhook for menus that declare no action of their own: new
+    menus added to MENU_STRUCTURE need no handler here.
+    """
+    metrics.form_parsed()
+    note_call(CallSid, Digits, SpeechResult)
+    return _xml(await _menu_input(state, CallSid, Digits, _spoken(SpeechResult), "/ivr"))
+
+
+# ─────────────────────────────────────────────
+# POST /admin/pnr-updates — Batch PNR status updates
+# ─────────────────────────────────────────────
+@app.post("/admin/pnr-updates")
+async def pnr_updates(request: Request):
+    """
+    Applies a JSON list of PNR updates as one atomic batch (see
+    change_feed.py). Requires "Authorization: Bearer <IVR_UPDATE_TOKEN>".
+    With --workers, the router sends the batch to every worker.
+    """
+    if not _UPDATE_TOKEN:
+        return JSONResponse({"detail": "Not Found"}, status_code=404)
+    supplied = request.headers.get("authorization", "").encode()
+    if not hmac.compare_digest(supplied, f"Bearer {_UPDATE_TOKEN}".encode()):
+        return JSONResponse({"detail": "invalid or missing token"}, status_code=401)
+    try:
+        updates = json.loads(await request.body())
+    except ValueError:
+        updates = None
+    if not isinstance(updates, list):
+        return JSONResponse({"detail": "body must be a JSON list of updates"}, status_code=400)
+    try:
+        applied = change_feed.apply(updates)
+    except UpdateError as exc:
+        return JSONResponse({"detail": "batch rejected", "errors": exc.problems},
+                            status_code=422)
+    return {"applied": applied}
+
+
+# ─────────────────────────────────────────────
+# GET /prompts/{name}  — Pre-synthesized prompt audio
+# ─────────────────────────────────────────────
+@app.get("/prompts/{name}")
+async def prompt_audio_file(name: str):
+    """Audio for <Play>; file names are content hashes, so never stale."""
+    audio = prompt_library.get(name) if prompt_library is not None else None
+    if audio is None:
+        return Response(status_code=404)
+    return Response(
+        content=audio, media_type="audio/wav",
+        headers={"Cache-Control": "public, max-age=31536000, immutable"},
+    )
 
 
 # ─────────────────────────────────────────────
@@ -191,8 +630,136 @@ async def health():
     return {"status": "ok", "service": "IRCTC IVR Backend", "version": "1.0.0"}
 
 
+# ─────────────────────────────────────────────
+# GET /metrics  — Prometheus scrape target
+# ─────────────────────────────────────────────
+def _all_cache_stats() -> dict:
+    return {
+        **cache_stats(),
+        "speech":   speech_cache.stats(),
+        "rendered": rendered_results.stats(),
+    }
+
+
+def _cache_series(field: str) -> list[tuple[str, int]]:
+    return [
+        (f'cache="{name}"', stats[field])
+        for name, stats in _all_cache_stats().items() if stats is not None
+    ]
+
+
+def _hit_ratio_series() -> list[tuple[str, float]]:
+    return [
+        (f'cache="{name}"', round(stats["hits"] / max(1, stats["hits"] + stats["misses"]), 4))
+        for name, stats in _all_cache_stats().items() if stats is not None
+    ]
+
+
+metrics.collector("ivr_cache_hits_total", "Cache hits.", "counter",
+                  lambda: _cache_series("hits"))
+metrics.collector("ivr_cache_misses_total", "Cache misses.", "counter",
+                  lambda: _cache_series("misses"))
+metrics.collector("ivr_cache_hit_ratio", "Share of cache lookups that hit, since startup.",
+                  "gauge", _hit_ratio_series)
+metrics.collector("ivr_cache_evictions_total", "Cache evictions.", "counter",
+                  lambda: _cache_series("evictions"))
+metrics.collector("ivr_cache_entries", "Entries held by each cache.", "gauge",
+                  lambda: _cache_series("size"))
+metrics.collector("ivr_rendered_cache_bytes", "Size of the cached rendered responses.",
+                  "gauge", lambda: [("", rendered_results.stats()["bytes"])])
+metrics.collector("ivr_backend_requests_total", "Lookups sent to the data backend.", "counter",
+                  lambda: [("", data_service.backend_requests)])
+metrics.collector("ivr_coalesced_lookups_total",
+                  "Lookups that shared another caller's in-flight request.", "counter",
+                  lambda: [("", data_service.coalesced)])
+metrics.collector("ivr_pnr_updates_total", "PNR updates applied from the change feed.",
+                  "counter", lambda: [("", change_feed.applied)])
+metrics.collector("ivr_pnr_updates_rejected_total", "PNR updates rejected as invalid.",
+                  "counter", lambda: [("", change_feed.rejected)])
+metrics.collector("ivr_speech_inputs_total", "Spoken inputs classified.", "counter",
+                  lambda: [("", intent_service.requests)])
+metrics.collector("ivr_speech_batches_total", "Batches sent to the classifier processes.",
+                  "counter", lambda: [("", intent_service.batches)])
+metrics.collector("ivr_speech_unrecognized_total", "Spoken inputs matching no intent.",
+                  "counter", lambda: [("", intent_service.unrecognized)])
+if journal is not None:
+    metrics.collector("ivr_journal_records_total", "Call journal records by kind.", "counter",
+                      lambda: [(f'kind="{k}"', v) for k, v in journal.records.items()])
+    metrics.collector("ivr_journal_dropped_total", "Journal records dropped: buffer full.",
+                      "counter", lambda: [(f'kind="{k}"', v) for k, v in journal.dropped.items()])
+    metrics.collector("ivr_journal_buffered", "Journal records waiting to be written.",
+                      "gauge", lambda: [("", journal.buffered())])
+    metrics.collector("ivr_journal_write_errors_total", "Failed journal segment writes.",
+                      "counter", lambda: [("", journal.write_errors)])
+metrics.collector("ivr_booking_prefetches_total",
+                  "Caller bookings fetched and rendered ahead of the caller asking.", "counter",
+                  lambda: [("", booking_stats["prefetched"])])
+metrics.collector("ivr_booking_offers_total",
+                  "Welcomes offering the caller's booking, and offers taken up.", "counter",
+                  lambda: [('outcome="offered"', booking_stats["offered"]),
+                           ('outcome="accepted"', booking_stats["accepted"])])
+metrics.collector("ivr_booking_prefetch_failures_total",
+                  "Caller booking lookups that failed or timed out.", "counter",
+                  lambda: [("", booking_stats["failed"])])
+metrics.collector("ivr_corrections_total",
+                  "Numbers not found: corrections offered and accepted, and misses with none.",
+                  "counter", lambda: [(f'kind="{kind}",outcome="{outcome}"', count)
+                                      for (kind, outcome), count in correction_stats.items()])
+metrics.collector("ivr_in_flight_requests", "Requests being handled.", "gauge",
+                  lambda: [("", admission.in_flight)])
+metrics.collector("ivr_event_loop_lag_seconds", "How late the event loop runs timers.",
+                  "gauge", lambda: [("", round(admission.current_lag(), 6))])
+metrics.collector("ivr_admission_shed_total",
+                  "Webhooks answered with the busy message: new calls, and call webhooks "
+                  "without a session, by overload signal.", "counter",
+                  lambda: [(f'kind="{kind}",reason="{reason}"', count)
+                           for (kind, reason), count in admission.shed.items()])
+metrics.collector("ivr_admission_in_progress_total",
+                  "Webhooks of calls in progress admitted while overloaded.", "counter",
+                  lambda: [("", admission.in_progress_admitted)])
+# A shared store could only count live sessions by scanning its keyspace on
+# every scrape; the in-process store keeps its count as sessions come and go.
+if isinstance(session_manager.backend.inner, InMemorySessionBackend):
+    metrics.collector("ivr_active_sessions", "Calls with a live, un-ended session.", "gauge",
+                      lambda: [("", session_manager.active_sessions())])
+
+
+@app.get("/metrics")
+async def metrics_endpoint():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
+# ─────────────────────────────────────────────
+# Fast-path ASGI entry point (IVR_FAST_PATH=1)
+# ─────────────────────────────────────────────
+# Same endpoints, but the Twilio webhooks skip FastAPI's routing and form
+# parsing. Built after every route above is registered.
+def _wrap_fast(inner):
+    for middleware, options in _MIDDLEWARE:
+        inner = middleware(inner, **options)
+    return inner
+
+
+fast_app = FastPathApp(app, wrap=_wrap_fast)
+
+
 # ─────────────────────────────────────────────
 # Dev server entry point
 # ─────────────────────────────────────────────
 if __name__ == "__main__":
-    uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
+    import argparse
+
+    parser = argparse.ArgumentParser(description="IRCTC IVR Backend")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument(
+        "--workers", type=int, default=1,
+        help="run N workers behind a CallSid-sharding router (production mode)",
+    )
+    args = parser.parse_args()
+
+    if args.workers > 1:
+        from cluster import run_cluster
+        run_cluster(args.workers, args.host, args.port)
+    else:
+        uvicorn.run(asgi_target(), host=args.host, port=args.port, reload=True)
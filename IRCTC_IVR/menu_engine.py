@@ -0,0 +1,171 @@
+"""
+IRCTC Conversational IVR - Menu State Machine
+Compiles MENU_STRUCTURE into a validated dispatch table, so every menu
+keypress is resolved with one dictionary lookup:
+
+    (state, digits) → Transition(next_state, response bytes, session delta)
+
+Menus are pure data: a new menu (seat availability, fare enquiry …) only
+needs an entry in MENU_STRUCTURE. Its keypresses are posted to
+/ivr/<state> unless it names its own action. States that take free-form
+input (PNR, train number) have no options and keep their own handlers.
+"""
+
+from types import MappingProxyType
+from typing import Callable, Mapping, NamedTuple, Optional
+
+import ivr_logic
+from ivr_logic import TWILIO_VOICE
+
+ENTRY_STATE = "main"
+
+# States that finish the call rather than prompting again.
+TERMINALS: dict[str, Callable[..., str]] = {
+    "goodbye": ivr_logic.build_goodbye_twiml,
+}
+
+_KEYPAD = frozenset("0123456789*#")
+_FOLLOW_UPS = ("next", "more", "suggest")   # states a handler may offer after its answer
+_NO_CHANGES: Mapping = MappingProxyType({})
+
+
+class MenuError(ValueError):
+    """MENU_STRUCTURE is inconsistent (dangling target, unreachable state …)."""
+
+
+class Transition(NamedTuple):
+    next_state: str
+    response: bytes          # pre-encoded TwiML
+    session: Mapping         # fields to stage on the session transaction
+    end: bool = False        # the call ends (terminal state)
+    valid: bool = True       # False for the invalid-input redirect
+
+
+# ─────────────────────────────────────────────
+# Validation
+# ─────────────────────────────────────────────
+
+def validate_menu(menu: Mapping) -> None:
+    """
+    Check the menu graph; raises MenuError listing every problem found.
+
+    - every state has a prompt and a positive num_digits
+    - option keys are keypad strings of num_digits keys
+    - option, `next`, `more` and `suggest` targets name a state or a terminal
+    - states without options declare the handler (action) that serves them
+    - no two states share an action
+    - every state is reachable from the entry state
+    """
+    problems = []
+    if ENTRY_STATE not in menu:
+        problems.append(f"entry state {ENTRY_STATE!r} is missing")
+
+    actions: dict[str, str] = {}
+    for name, state in menu.items():
+        if not state.get("prompt"):
+            problems.append(f"{name}: no prompt")
+        num_digits = state.get("num_digits")
+        if not isinstance(num_digits, int) or num_digits < 1:
+            problems.append(f"{name}: num_digits must be a positive integer")
+        options = state.get("options") or {}
+        for digits, target in options.items():
+            if len(digits) != num_digits or not set(digits) <= _KEYPAD:
+                problems.append(f"{name}: option {digits!r} is not {num_digits} keypad key(s)")
+            if target not in menu and target not in TERMINALS:
+                problems.append(f"{name}: option {digits!r} leads to unknown state {target!r}")
+        for key in _FOLLOW_UPS:
+            follow_up = state.get(key)
+            if follow_up is not None and follow_up not in menu:
+                problems.append(f"{name}: {key} leads to unknown state {follow_up!r}")
+        if not options and not state.get("action"):
+            problems.append(f"{name}: free-input state needs an action to handle it")
+
+        action = state.get("action") or f"/ivr/{name}"
+        if action in actions:
+            problems.append(f"{name}: action {action} already used by {actions[action]}")
+        actions[action] = name
+
+    reachable, frontier = set(), [ENTRY_STATE] if ENTRY_STATE in menu else []
+    while frontier:
+        name = frontier.pop()
+        if name in reachable or name not in menu:
+            continue
+        reachable.add(name)
+        frontier += (menu[name].get("options") or {}).values()
+        frontier += [menu[name][key] for key in _FOLLOW_UPS if menu[name].get(key)]
+    for name in menu:
+        if name not in reachable:
+            problems.append(f"{name}: unreachable from {ENTRY_STATE!r}")
+
+    if problems:
+        raise MenuError("invalid MENU_STRUCTURE:\n  " + "\n  ".join(problems))
+
+
+# ─────────────────────────────────────────────
+# Engine
+# ─────────────────────────────────────────────
+
+class MenuEngine:
+    """
+    Dispatch table for every (state, keypress) of MENU_STRUCTURE, with
+    responses pre-rendered for one voice.
+
+    Like StaticResponseCache, the table is stamped with the identity and
+    version of MENU_STRUCTURE and recompiled (and revalidated) after an edit.
+    """
+
+    def __init__(self, voice: str = TWILIO_VOICE):
+        self.voice = voice
+        self._table: dict[tuple[str, str], Transition] = {}
+        self._invalid: dict[str, Transition] = {}
+        self._tracked: frozenset = frozenset()
+        self._stamp: Optional[tuple[int, int]] = None
+        self._compile()
+
+    def resolve(self, state: str, digits: str) -> Optional[Transition]:
+        """The transition for `digits` pressed in `state` (None: no such menu)."""
+        if self._stamp != (id(ivr_logic.MENU_STRUCTURE), ivr_logic._MENU_VERSION):
+            self._compile()
+        step = self._table.get((state, digits))
+        if step is not None:
+            return step
+        invalid = self._invalid.get(state)
+        if invalid is None or state not in self._tracked:
+            return invalid
+        return invalid._replace(session={"last_menu": state, "last_digit": digits})
+
+    def _compile(self) -> None:
+        menu = ivr_logic.MENU_STRUCTURE
+        stamp = (id(menu), ivr_logic._MENU_VERSION)
+        validate_menu(menu)
+
+        voice = self.voice
+        responses = {
+            name: ivr_logic.build_menu_twiml(name, voice).encode("utf-8") for name in menu
+        }
+        responses.update(
+            {name: build(voice=voice).encode("utf-8") for name, build in TERMINALS.items()}
+        )
+        invalid_response = ivr_logic.build_invalid_input_twiml(voice=voice).encode("utf-8")
+
+        table, invalid, tracked = {}, {}, set()
+        for name, state in menu.items():
+            options = state.get("options")
+            if not options:
+                continue
+            invalid[name] = Transition(name, invalid_response, _NO_CHANGES, valid=False)
+            if state.get("tracked"):
+                tracked.add(name)
+            for digits, target in options.items():
+                delta = {}
+                if state.get("tracked"):
+                    delta.update(last_menu=name, last_digit=digits)
+                if target in menu and menu[target].get("flow"):
+                    delta["flow"] = menu[target]["flow"]
+                table[(name, digits)] = Transition(
+                    target, responses[target], MappingProxyType(delta) if delta else _NO_CHANGES,
+                    end=target in TERMINALS,
+                )
+
+        self._table, self._invalid, self._tracked = table, invalid, frozenset(tracked)
+        self._stamp = stamp
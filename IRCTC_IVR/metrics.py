@@ -0,0 +1,280 @@
+"""
+IRCTC Conversational IVR - Metrics
+Per-route latency histograms, per-phase timings (form parsing, session
+access, data lookups, TwiML rendering) and counters, exposed in the
+Prometheus text format at GET /metrics.
+
+Every histogram is allocated up front with fixed bucket bounds, and
+recording is a bisect plus two list/float updates on the event-loop
+thread, so the webhook path takes no locks and never creates a series.
+"""
+
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Callable, Optional
+
+# Seconds. Webhooks are sub-millisecond when served from memory; the upper
+# buckets catch backend lookups and Twilio's 15 s webhook timeout.
+LATENCY_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+    0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 15.0,
+)
+
+ROUTES = (
+    "/voice", "/handle-menu", "/handle-pnr", "/handle-train",
+    "/handle-pnr-options", "/handle-train-options", "/handle-train-stops",
+    "/handle-pnr-suggestion", "/handle-train-suggestion",
+    "/health", "/metrics",
+)
+OTHER_ROUTE = "other"   # unknown paths share one series to bound cardinality
+
+PHASES = ("form", "session", "lookup", "render")
+
+_request_started: ContextVar[float] = ContextVar("ivr_request_started", default=0.0)
+
+
+# ─────────────────────────────────────────────
+# Primitives
+# ─────────────────────────────────────────────
+
+class Histogram:
+    """Fixed-bucket histogram; `counts[i]` holds observations <= bounds[i]."""
+
+    __slots__ = ("bounds", "counts", "sum")
+
+    def __init__(self, bounds: tuple = LATENCY_BUCKETS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)   # last slot is +Inf
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+    @property
+    def count(self) -> int:
+        return sum(self.counts)
+
+    def render(self, name: str, labels: str) -> list[str]:
+        sep = "," if labels else ""
+        lines, cumulative = [], 0
+        for bound, count in zip(self.bounds, self.counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{{{labels}{sep}le="{bound}"}} {cumulative}')
+        cumulative += self.counts[-1]
+        lines.append(f'{name}_bucket{{{labels}{sep}le="+Inf"}} {cumulative}')
+        lines.append(f"{name}_sum{{{labels}}} {self.sum:.6f}")
+        lines.append(f"{name}_count{{{labels}}} {cumulative}")
+        return lines
+
+
+# ─────────────────────────────────────────────
+# Registry
+# ─────────────────────────────────────────────
+
+class Metrics:
+    """
+    All series the IVR records. Label sets are fixed at construction
+    (ROUTES × PHASES), so recording never creates a series.
+    """
+
+    def __init__(self, routes: tuple = ROUTES, phases: tuple = PHASES):
+        names = routes + (OTHER_ROUTE,)
+        self.requests = {route: Histogram() for route in names}
+        self.server_errors = dict.fromkeys(names, 0)
+        self.phases = {phase: Histogram() for phase in phases}
+        self.invalid_input = dict.fromkeys(names, 0)
+        # name -> (help, type, callable returning [(labels, value)])
+        self._collectors: dict[str, tuple[str, str, Callable[[], list]]] = {}
+
+    # ── Recording ─────────────────────────────
+
+    def observe_request(self, path: str, seconds: float, status: int) -> None:
+        route = path if path in self.requests else OTHER_ROUTE
+        self.requests[route].observe(seconds)
+        if status >= 500:
+            self.server_errors[route] += 1
+
+    def observe_phase(self, phase: str, seconds: float) -> None:
+        self.phases[phase].observe(seconds)
+
+    def timed(self, phase: str) -> "_PhaseTimer":
+        """`with metrics.timed("render"):` times the block into a phase."""
+        return _PhaseTimer(self.phases[phase])
+
+    def form_parsed(self) -> None:
+        """
+        Called on entry to a handler: the time since the request reached
+        the middleware is routing plus form parsing.
+        """
+        started = _request_started.get()
+        if started:
+            self.phases["form"].observe(time.perf_counter() - started)
+
+    def count_invalid_input(self, route: str) -> None:
+        self.invalid_input[route if route in self.invalid_input else OTHER_ROUTE] += 1
+
+    def collector(self, name: str, help_text: str, kind: str,
+                  read: Callable[[], list[tuple[str, float]]]) -> None:
+        """
+        Register a series whose values are read at scrape time, e.g. cache
+        counters or the active session count. `read` returns
+        [(labels, value), ...] with labels like 'cache="pnr"' or ''.
+        """
+        self._collectors[name] = (help_text, kind, read)
+
+    # ── Exposition ────────────────────────────
+
+    def render(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)."""
+        lines = [
+            "# HELP ivr_request_duration_seconds Webhook latency by route.",
+            "# TYPE ivr_request_duration_seconds histogram",
+        ]
+        for route, histogram in self.requests.items():
+            lines += histogram.render("ivr_request_duration_seconds", f'route="{route}"')
+        lines += [
+            "# HELP ivr_phase_duration_seconds Time spent per request phase.",
+            "# TYPE ivr_phase_duration_seconds histogram",
+        ]
+        for phase, histogram in self.phases.items():
+            lines += histogram.render("ivr_phase_duration_seconds", f'phase="{phase}"')
+        lines += _counter_lines(
+            "ivr_server_errors_total", "Responses with a 5xx status.",
+            self.server_errors, "route",
+        )
+        lines += _counter_lines(
+            "ivr_invalid_input_total", "Invalid keypresses redirected to the main menu.",
+            self.invalid_input, "route",
+        )
+        for name, (help_text, kind, read) in self._collectors.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in read():
+                lines.append(f"{name}{{{labels}}} {value}" if labels else f"{name} {value}")
+        return "\n".join(lines) + "\n"
+
+
+class _PhaseTimer:
+    # A plain slotted context manager: several times cheaper than a
+    # @contextmanager generator, and safe across awaits (one per block).
+    __slots__ = ("histogram", "start")
+
+    def __init__(self, histogram: Histogram):
+        self.histogram = histogram
+
+    def __enter__(self) -> None:
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc) -> None:
+        self.histogram.observe(time.perf_counter() - self.start)
+
+
+def _counter_lines(name: str, help_text: str, values: dict, label: str) -> list[str]:
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+    lines += [f'{name}{{{label}="{key}"}} {value}' for key, value in values.items()]
+    return lines
+
+
+# ─────────────────────────────────────────────
+# ASGI middleware
+# ─────────────────────────────────────────────
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware (no extra task per request, unlike Starlette's
+    BaseHTTPMiddleware) recording each HTTP request's latency and status.
+    """
+
+    def __init__(self, app, metrics: Metrics):
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        token = _request_started.set(start)
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _request_started.reset(token)
+            self.metrics.observe_request(scope["path"], time.perf_counter() - start, status)
+
+
+# ─────────────────────────────────────────────
+# Session backend timing
+# ─────────────────────────────────────────────
+
+class TimedSessionBackend:
+    """
+    Wraps a SessionBackend and records every call in the "session" phase.
+    `on_close` reads and sets the wrapped backend's hook.
+    """
+
+    def __init__(self, backend, metrics: Metrics):
+        self.inner = backend
+        self._histogram = metrics.phases["session"]
+
+    @property
+    def on_close(self):
+        return self.inner.on_close
+
+    @on_close.setter
+    def on_close(self, hook) -> None:
+        self.inner.on_close = hook
+
+    def _timed(self, method, *args):
+        start = time.perf_counter()
+        try:
+            return method(*args)
+        finally:
+            self._histogram.observe(time.perf_counter() - start)
+
+    def create(self, call_sid: str, caller: Optional[str] = None):
+        return self._timed(self.inner.create, call_sid, caller)
+
+    def get(self, call_sid: str):
+        return self._timed(self.inner.get, call_sid)
+
+    def update(self, call_sid: str, changes: dict):
+        return self._timed(self.inner.update, call_sid, changes)
+
+    def end(self, call_sid: str):
+        return self._timed(self.inner.end, call_sid)
+
+    def count_active(self) -> int:
+        return self.inner.count_active()
+
+    async def _atimed(self, method, *args):
+        start = time.perf_counter()
+        try:
+            return await method(*args)
+        finally:
+            self._histogram.observe(time.perf_counter() - start)
+
+    async def acreate(self, call_sid: str, caller: Optional[str] = None):
+        return await self._atimed(self.inner.acreate, call_sid, caller)
+
+    async def aget(self, call_sid: str):
+        return await self._atimed(self.inner.aget, call_sid)
+
+    async def aupdate(self, call_sid: str, changes: dict):
+        return await self._atimed(self.inner.aupdate, call_sid, changes)
+
+    async def aend(self, call_sid: str):
+        return await self._atimed(self.inner.aend, call_sid)
+
+
+metrics = Metrics()
@@ -0,0 +1,351 @@
+"""
+IRCTC Conversational IVR - Speech Intent Recognition
+Maps what a caller says (Twilio's SpeechResult, with speech input enabled)
+onto the menus that keypresses drive:
+
+    "check my PNR status"             → pnr_gather
+    "Rajdhani timing"                 → train_gather
+    "PNR two one five four six seven three eight nine zero"
+                                      → pnr_gather, pnr "2154673890"
+
+The classifier is a TF-IDF model over word unigrams and bigrams of a
+small set of example utterances per intent, scored by cosine similarity
+to each intent's centroid: no dependencies, microseconds per utterance.
+Spoken numbers ("one two nine five two", "double five", "twelve", Hindi
+"ek do teen" …) are extracted separately.
+
+Classification runs in a worker process pool, never on the event loop.
+IntentService collects the utterances of concurrent calls for a couple of
+milliseconds and sends them as one batch, so the round trip to the pool
+is paid once per batch rather than once per call.
+"""
+
+import asyncio
+import math
+import multiprocessing
+import re
+from collections import Counter
+from concurrent.futures import BrokenExecutor, Executor, ProcessPoolExecutor
+from typing import NamedTuple, Optional
+
+# Example utterances per intent. Intents are named after the MENU_STRUCTURE
+# state they lead to; "more" asks for the next page of a train schedule and
+# "yes" accepts what was just offered (a corrected PNR or train number).
+INTENT_EXAMPLES: dict[str, tuple[str, ...]] = {
+    "pnr_gather": (
+        "check my pnr", "pnr status", "pnr enquiry", "booking status", "ticket status",
+        "is my ticket confirmed", "confirm my ticket", "waiting list status",
+        "waitlist position", "rac status", "my seat and berth number", "coach and berth",
+        "reservation status", "check my booking", "has the chart been prepared",
+    ),
+    "train_gather": (
+        "train information", "train timing", "train schedule", "train time table",
+        "when does the train leave", "when will the train arrive", "departure time",
+        "arrival time", "which stations does the train stop at", "train route",
+        "running days", "rajdhani timing", "shatabdi express time", "duronto schedule",
+        "vande bharat timing", "garib rath", "express train", "mail train", "rajdhani",
+        "shatabdi", "duronto", "tejas express", "humsafar express", "sampark kranti",
+    ),
+    "more": (
+        "more stops", "next stops", "continue", "tell me more", "go on", "next halts",
+        "remaining stations", "yes more", "what are the other stops",
+    ),
+    "yes": (
+        "yes", "yes please", "haan", "haan ji", "ji haan", "right", "correct",
+        "that is correct", "that is right", "sure", "okay", "exactly",
+    ),
+    "main": (
+        "main menu", "go back", "back to the menu", "start again", "start over",
+        "repeat the menu", "home",
+    ),
+    "goodbye": (
+        "bye", "goodbye", "exit", "that is all", "nothing else", "no thanks",
+        "thank you bye", "end the call", "hang up", "quit",
+    ),
+}
+
+MIN_SCORE = 0.15    # below this an utterance is not understood
+
+_UNITS = {
+    "zero": "0", "oh": "0", "nil": "0", "one": "1", "two": "2", "three": "3", "four": "4",
+    "five": "5", "six": "6", "seven": "7", "eight": "8", "nine": "9",
+    # Hindi, as en-IN recognition transcribes it
+    "shunya": "0", "ek": "1", "do": "2", "teen": "3", "char": "4", "chaar": "4",
+    "paanch": "5", "panch": "5", "chhe": "6", "chhah": "6", "saat": "7", "aath": "8",
+    "nau": "9",
+}
+_TEENS = {
+    "ten": "10", "eleven": "11", "twelve": "12", "thirteen": "13", "fourteen": "14",
+    "fifteen": "15", "sixteen": "16", "seventeen": "17", "eighteen": "18", "nineteen": "19",
+}
+_TENS = {
+    "twenty": "2", "thirty": "3", "forty": "4", "fifty": "5", "sixty": "6",
+    "seventy": "7", "eighty": "8", "ninety": "9",
+}
+_REPEATS = {"double": 2, "triple": 3}
+# Words that carry no intent; dropped before classification.
+_STOPWORDS = frozenset({
+    "a", "an", "the", "is", "are", "am", "i", "me", "my", "to", "of", "for", "please",
+    "can", "could", "you", "want", "know", "what", "which", "when", "will", "does", "at",
+    "be", "been", "has", "have", "it", "and", "this", "that", "on", "in", "about",
+})
+_WORD = re.compile(r"[a-z0-9']+")
+
+
+class Intent(NamedTuple):
+    state: Optional[str]            # MENU_STRUCTURE state (or "more"); None: not understood
+    score: float                    # cosine similarity of the best intent
+    pnr: Optional[str] = None       # a spoken 10-digit number
+    train_number: Optional[str] = None   # a spoken 5-digit number
+
+
+UNKNOWN = Intent(None, 0.0)
+
+
+# ─────────────────────────────────────────────
+# Text processing
+# ─────────────────────────────────────────────
+
+def _tokens(text: str) -> list[str]:
+    """Lower-cased words; runs of spelled-out letters ("p n r") are joined up."""
+    words = _WORD.findall(text.lower().replace("'", ""))
+    joined: list[str] = []
+    letters: list[str] = []
+    for word in words + [""]:
+        if len(word) == 1 and word.isalpha():
+            letters.append(word)
+            continue
+        if len(letters) > 1:
+            joined.append("".join(letters))
+        else:
+            joined += letters
+        letters = []
+        if word:
+            joined.append(word)
+    return joined
+
+
+def split_digits(words: list[str]) -> tuple[list[str], list[str]]:
+    """
+    Separate spoken numbers from the other words: returns (digit runs,
+    remaining words). Consecutive number words form one run, so "one two
+    nine five two" and "12 952" both give "12952".
+    """
+    runs: list[str] = []
+    rest: list[str] = []
+    current: list[str] = []
+    repeat = 1
+    i = 0
+    while i < len(words):
+        word = words[i]
+        digits = None
+        if word.isdigit():
+            digits = word
+        elif word in _UNITS:
+            digits = _UNITS[word]
+        elif word in _TEENS:
+            digits = _TEENS[word]
+        elif word in _TENS:
+            following = words[i + 1] if i + 1 < len(words) else ""
+            if following in _UNITS and _UNITS[following] != "0":
+                digits = _TENS[word] + _UNITS[following]
+                i += 1
+            else:
+                digits = _TENS[word] + "0"
+        elif word in _REPEATS and i + 1 < len(words) and words[i + 1] in _UNITS:
+            repeat = _REPEATS[word]
+            i += 1
+            continue
+        if digits is None:
+            if current:
+                runs.append("".join(current))
+                current = []
+            rest.append(word)
+        else:
+            current.append(digits * repeat)
+        repeat = 1
+        i += 1
+    if current:
+        runs.append("".join(current))
+    return runs, rest
+
+
+# ─────────────────────────────────────────────
+# Classifier
+# ─────────────────────────────────────────────
+
+def _features(words: list[str]) -> Counter:
+    """Unigrams and bigrams of lightly stemmed words (plural s dropped)."""
+    stems = [w[:-1] if len(w) > 3 and w.endswith("s") and not w.endswith("ss") else w
+             for w in words if w not in _STOPWORDS]
+    features = Counter(stems)
+    features.update(f"{a} {b}" for a, b in zip(stems, stems[1:]))
+    return features
+
+
+class IntentModel:
+    """TF-IDF centroids per intent, built from INTENT_EXAMPLES."""
+
+    def __init__(self, examples: dict[str, tuple[str, ...]] = INTENT_EXAMPLES):
+        counts = {
+            intent: sum((_features(_tokens(text)) for text in texts), Counter())
+            for intent, texts in examples.items()
+        }
+        documents = Counter(feature for feature_counts in counts.values()
+                            for feature in feature_counts)
+        self.idf = {feature: math.log(1 + len(counts) / df) for feature, df in documents.items()}
+        self.centroids = {
+            intent: self._vector(feature_counts) for intent, feature_counts in counts.items()
+        }
+
+    def _vector(self, features: Counter) -> dict[str, float]:
+        vector = {
+            feature: (1 + math.log(count)) * self.idf[feature]
+            for feature, count in features.items() if feature in self.idf
+        }
+        norm = math.sqrt(sum(value * value for value in vector.values())) or 1.0
+        return {feature: value / norm for feature, value in vector.items()}
+
+    def classify(self, text: str) -> Intent:
+        runs, words = split_digits(_tokens(text))
+        pnr = next((run for run in runs if len(run) == 10), None)
+        train_number = next((run for run in runs if len(run) == 5), None)
+
+        query = self._vector(_features(words))
+        state, score = None, 0.0
+        for intent, centroid in self.centroids.items():
+            similarity = sum(value * centroid.get(feature, 0.0) for feature, value in query.items())
+            if similarity > score:
+                state, score = intent, similarity
+        if score < MIN_SCORE:
+            state = None
+        if state is None and (pnr or train_number):
+            # A bare number: a PNR or a train by its length.
+            state, score = ("pnr_gather" if pnr else "train_gather"), 1.0
+        return Intent(state, round(score, 3), pnr, train_number)
+
+
+_MODEL: Optional[IntentModel] = None
+
+
+def classify_batch(texts: list[str]) -> list[Intent]:
+    """Classify utterances (runs in the worker processes)."""
+    global _MODEL
+    if _MODEL is None:
+        _MODEL = IntentModel()
+    return [_MODEL.classify(text) for text in texts]
+
+
+# ─────────────────────────────────────────────
+# Micro-batching service
+# ─────────────────────────────────────────────
+
+class IntentService:
+    """
+    Classifies utterances off the event loop. Requests arriving within
+    `max_delay` seconds of each other (up to `max_batch`) share one trip
+    to the worker pool. The `workers` processes are started by start(),
+    which must be called (at application startup) before classify(); with
+    workers=0 batches run on the loop's default thread pool instead.
+    A batch that fails is answered as not understood; other batches are
+    unaffected, and a pool that lost a worker process is replaced.
+    """
+
+    def __init__(self, workers: int = 1, max_batch: int = 32, max_delay: float = 0.002):
+        self.workers = workers
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self._executor: Optional[Executor] = None
+        self._pending: list[tuple[str, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self.requests = 0
+        self.batches = 0
+        self.unrecognized = 0
+        self.errors = 0
+
+    def start(self) -> None:
+        """Start the worker processes, and load the model in each."""
+        if self._executor is None and self.workers:
+            self._executor = ProcessPoolExecutor(
+                self.workers, mp_context=multiprocessing.get_context("spawn")
+            )
+            for _ in range(self.workers):
+                self._executor.submit(classify_batch, [""])     # load the model
+
+    async def classify(self, text: str) -> Intent:
+        if self._executor is None and self.workers:
+            raise RuntimeError("IntentService.start() has not been called")
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((text, future))
+        self.requests += 1
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_delay, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        self.batches += 1
+        executor = self._executor
+        try:
+            done = asyncio.get_running_loop().run_in_executor(
+                executor, classify_batch, [text for text, _ in batch]
+            )
+        except Exception:       # the pool has broken
+            self._failed(batch)
+            self._replace(executor)
+            return
+        done.add_done_callback(lambda result: self._resolve(batch, executor, result))
+
+    def _resolve(self, batch: list, executor: Optional[Executor], result: asyncio.Future) -> None:
+        if result.cancelled():
+            self._failed(batch)
+            return
+        error = result.exception()
+        if error is not None:
+            self._failed(batch)
+            if isinstance(error, BrokenExecutor):
+                self._replace(executor)
+            return
+        for (_, future), intent in zip(batch, result.result()):
+            if intent.state is None:
+                self.unrecognized += 1
+            if not future.done():
+                future.set_result(intent)
+
+    def _failed(self, batch: list) -> None:
+        """
+        Answer a batch as not understood: callers hear the invalid-input
+        prompt, and can still use the keypad.
+        """
+        self.errors += 1
+        self.unrecognized += len(batch)
+        for _, future in batch:
+            if not future.done():
+                future.set_result(UNKNOWN)
+
+    def _replace(self, executor: Optional[Executor]) -> None:
+        """
+        Swap a pool that lost a worker process (it refuses all further
+        work) for a new one. Other batches still on the broken pool fail on
+        their own, and only the first replaces it. The dead pool is reaped
+        on a thread, off the event loop.
+        """
+        if executor is None or executor is not self._executor:
+            return
+        self._executor = None
+        asyncio.get_running_loop().run_in_executor(None, executor.shutdown)
+        self.start()
+
+    def close(self) -> None:
+        """Stop the pool: queued batches are cancelled, running ones finish."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,208 @@
+"""
+IRCTC Conversational IVR - Prompt Audio
+Pre-synthesizes the IVR's fixed prompts (welcome, menus, errors, goodbye)
+so calls <Play> recorded audio instead of having Twilio run TTS on the same
+sentences on every call:
+
+    python prompt_audio.py --dir prompts --engine polly     # offline, once
+    IVR_PROMPT_DIR=prompts python main.py
+
+The texts come from ivr_logic.static_prompt_texts(), i.e. MENU_STRUCTURE
+and the response builders; results read back to a caller stay on <Say>.
+Audio files are content-addressed (named by a hash of engine, voice and
+text), so rebuilding after a menu edit only synthesizes the changed
+prompts, and any prompt without audio simply falls back to <Say>.
+
+Engines: "polly" (Amazon Polly via boto3, the voices Twilio uses) and
+"stub" (a local tone generator, for development and tests).
+"""
+
+import argparse
+import hashlib
+import io
+import json
+import math
+import os
+import time
+import wave
+from typing import Optional, Protocol
+
+import ivr_logic
+
+MANIFEST = "manifest.json"
+SAMPLE_RATE = 8000      # telephony audio; anything finer is resampled by Twilio
+
+
+# ─────────────────────────────────────────────
+# TTS engines
+# ─────────────────────────────────────────────
+
+class TTSEngine(Protocol):
+    name: str
+
+    def synthesize(self, text: str, voice: str) -> bytes:
+        """WAV audio of `text` spoken in `voice` (a Twilio voice name)."""
+        ...
+
+
+def _wav(pcm: bytes) -> bytes:
+    """16-bit mono PCM at SAMPLE_RATE wrapped in a WAV container."""
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as out:
+        out.setnchannels(1)
+        out.setsampwidth(2)
+        out.setframerate(SAMPLE_RATE)
+        out.writeframes(pcm)
+    return buffer.getvalue()
+
+
+class StubEngine:
+    """
+    Deterministic stand-in: a quiet tone per word, as long as the sentence
+    would take to say (~2.5 words/s). No network, no credentials.
+    """
+
+    name = "stub"
+
+    def synthesize(self, text: str, voice: str) -> bytes:
+        samples = bytearray()
+        for word in text.split():
+            pitch = 300 + int.from_bytes(hashlib.blake2b(word.encode()).digest()[:2], "big") % 400
+            for n in range(int(SAMPLE_RATE * 0.3)):
+                value = int(3000 * math.sin(2 * math.pi * pitch * n / SAMPLE_RATE))
+                samples += value.to_bytes(2, "little", signed=True)
+            samples += bytes(int(SAMPLE_RATE * 0.1) * 2)
+        return _wav(bytes(samples))
+
+
+class PollyEngine:
+    """Amazon Polly (boto3, credentials from the usual AWS environment)."""
+
+    name = "polly"
+
+    def __init__(self):
+        try:
+            import boto3
+        except ImportError as exc:
+            raise RuntimeError("the polly engine needs boto3: pip install boto3") from exc
+        self._client = boto3.client("polly")
+
+    def synthesize(self, text: str, voice: str) -> bytes:
+        reply = self._client.synthesize_speech(
+            Text=text,
+            VoiceId=voice.split(".", 1)[-1],      # "Polly.Aditi" -> "Aditi"
+            OutputFormat="pcm",
+            SampleRate=str(SAMPLE_RATE),
+        )
+        return _wav(reply["AudioStream"].read())
+
+
+ENGINES = {"stub": StubEngine, "polly": PollyEngine}
+
+
+# ─────────────────────────────────────────────
+# Building the prompt directory
+# ─────────────────────────────────────────────
+
+def prompt_file(engine: str, voice: str, text: str) -> str:
+    """Content-addressed file name for one prompt."""
+    digest = hashlib.sha256(f"{engine}\0{voice}\0{text}".encode("utf-8")).hexdigest()
+    return f"{digest[:32]}.wav"
+
+
+def build_prompts(
+    directory: str, engine: TTSEngine, voices: tuple[str, ...] = (ivr_logic.TWILIO_VOICE,)
+) -> dict:
+    """
+    Synthesize every static prompt missing from `directory` and rewrite
+    its manifest. Returns counts of synthesized and reused files.
+    """
+    os.makedirs(directory, exist_ok=True)
+    entries, synthesized, reused = [], 0, 0
+    for voice in voices:
+        for text in ivr_logic.static_prompt_texts(voice):
+            name = prompt_file(engine.name, voice, text)
+            path = os.path.join(directory, name)
+            if os.path.exists(path):
+                reused += 1
+            else:
+                _write_atomic(path, engine.synthesize(text, voice))
+                synthesized += 1
+            entries.append({"file": name, "voice": voice, "text": text})
+    manifest = {"engine": engine.name, "prompts": entries}
+    _write_atomic(os.path.join(directory, MANIFEST),
+                  json.dumps(manifest, ensure_ascii=False, indent=1).encode("utf-8"))
+    return {"prompts": len(entries), "synthesized": synthesized, "reused": reused}
+
+
+def _write_atomic(path: str, data: bytes) -> None:
+    with open(path + ".tmp", "wb") as fh:
+        fh.write(data)
+    os.replace(path + ".tmp", path)
+
+
+# ─────────────────────────────────────────────
+# Serving
+# ─────────────────────────────────────────────
+
+class PromptLibrary:
+    """
+    The audio of a built prompt directory, held in memory (a few hundred
+    KB) and served by GET /prompts/<file>. `url` is the resolver installed
+    into ivr_logic.
+    """
+
+    def __init__(self, directory: str, base_url: str = "/prompts/"):
+        self.base_url = base_url
+        self._urls: dict[tuple[str, str], str] = {}
+        self._audio: dict[str, bytes] = {}
+        with open(os.path.join(directory, MANIFEST), encoding="utf-8") as fh:
+            manifest = json.load(fh)
+        for entry in manifest["prompts"]:
+            path = os.path.join(directory, entry["file"])
+            if not os.path.exists(path):
+                continue            # not synthesized: that prompt stays on <Say>
+            if entry["file"] not in self._audio:
+                with open(path, "rb") as fh:
+                    self._audio[entry["file"]] = fh.read()
+            self._urls[(entry["text"], entry["voice"])] = base_url + entry["file"]
+
+    def url(self, text: str, voice: str) -> Optional[str]:
+        return self._urls.get((text, voice))
+
+    def get(self, name: str) -> Optional[bytes]:
+        """Audio for a file name from a <Play> URL (None if unknown)."""
+        return self._audio.get(name)
+
+    def __len__(self) -> int:
+        return len(self._urls)
+
+    def install(self) -> "PromptLibrary":
+        """Make the response builders <Play> this library's prompts."""
+        ivr_logic.set_prompt_audio(self.url)
+        return self
+
+
+# ─────────────────────────────────────────────
+# CLI
+# ─────────────────────────────────────────────
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Pre-synthesize the IVR's static prompts")
+    parser.add_argument("--dir", required=True, help="prompt directory (IVR_PROMPT_DIR)")
+    parser.add_argument("--engine", choices=sorted(ENGINES), default="stub")
+    parser.add_argument("--voice", action="append", metavar="VOICE",
+                        help=f"Twilio voice name; repeatable (default {ivr_logic.TWILIO_VOICE})")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    report = build_prompts(args.dir, ENGINES[args.engine](),
+                           tuple(args.voice or (ivr_logic.TWILIO_VOICE,)))
+    print(
+        f"{args.dir}: {report['prompts']} prompts ({report['synthesized']} synthesized, "
+        f"{report['reused']} reused) in {time.perf_counter() - start:.1f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
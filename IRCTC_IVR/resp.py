@@ -0,0 +1,317 @@
+"""
+IRCTC Conversational IVR - RESP Client
+Small synchronous client for Redis-compatible servers (RESP2 protocol),
+plus an in-process fake server for tests.
+
+Only what the session backend needs is implemented: single commands,
+pipelines (many commands, one round trip) and the hash / TTL / scan
+commands used to store sessions.
+"""
+
+import fnmatch
+import socket
+import socketserver
+import threading
+import time
+from typing import Optional, Union
+
+Reply = Union[None, int, bytes, list, "RespError"]
+
+
+class RespError(Exception):
+    """Error reply from the server (also returned in place inside pipelines)."""
+
+
+class RespConnectionError(Exception):
+    """The server could not be reached or closed the connection."""
+
+
+# ─────────────────────────────────────────────
+# Wire format
+# ─────────────────────────────────────────────
+
+def _to_bytes(value) -> bytes:
+    if isinstance(value, bytes):
+        return value
+    if isinstance(value, str):
+        return value.encode("utf-8")
+    return repr(value).encode("ascii") if isinstance(value, float) else str(value).encode("ascii")
+
+
+def encode_command(*args) -> bytes:
+    """Encode one command as a RESP array of bulk strings."""
+    out = [b"*%d\r\n" % len(args)]
+    for arg in args:
+        data = _to_bytes(arg)
+        out.append(b"$%d\r\n%s\r\n" % (len(data), data))
+    return b"".join(out)
+
+
+def read_reply(stream) -> Reply:
+    """Read one reply from a buffered binary stream."""
+    line = stream.readline()
+    if not line:
+        raise RespConnectionError("connection closed by server")
+    kind, rest = line[:1], line[1:-2]
+    if kind == b"+":
+        return rest
+    if kind == b"-":
+        return RespError(rest.decode("utf-8", "replace"))
+    if kind == b":":
+        return int(rest)
+    if kind == b"$":
+        length = int(rest)
+        if length < 0:
+            return None
+        data = stream.read(length + 2)
+        return data[:-2]
+    if kind == b"*":
+        length = int(rest)
+        if length < 0:
+            return None
+        return [read_reply(stream) for _ in range(length)]
+    raise RespConnectionError(f"bad reply line {line!r}")
+
+
+# ─────────────────────────────────────────────
+# Client
+# ─────────────────────────────────────────────
+
+class RespClient:
+    """
+    Blocking RESP client over one TCP connection.
+
+    Safe to share between threads (requests are serialised by a lock).
+    A broken connection is re-opened once before the error is raised.
+    `round_trips` counts network exchanges, which makes pipelining visible
+    in benchmarks and tests.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 6379, timeout: float = 1.0):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self._sock: Optional[socket.socket] = None
+        self._stream = None
+        self._lock = threading.Lock()
+        self.round_trips = 0
+
+    def execute(self, *args) -> Reply:
+        """Run one command; error replies are raised."""
+        reply = self.pipeline([args])[0]
+        if isinstance(reply, RespError):
+            raise reply
+        return reply
+
+    def pipeline(self, commands: list[tuple]) -> list[Reply]:
+        """
+        Send every command in one write and read all replies back.
+        Error replies are returned in place, not raised.
+        """
+        payload = b"".join(encode_command(*command) for command in commands)
+        with self._lock:
+            for attempt in range(2):
+                try:
+                    if self._sock is None:
+                        self._connect()
+                    self._sock.sendall(payload)
+                    replies = [read_reply(self._stream) for _ in commands]
+                    self.round_trips += 1
+                    return replies
+                except (OSError, RespConnectionError) as exc:
+                    self._disconnect()
+                    if attempt:
+                        raise RespConnectionError(f"{self.host}:{self.port}: {exc}") from exc
+        raise AssertionError("unreachable")
+
+    def _connect(self) -> None:
+        self._sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        self._sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._stream = self._sock.makefile("rb")
+
+    def _disconnect(self) -> None:
+        if self._sock is not None:
+            self._stream.close()
+            self._sock.close()
+        self._sock = self._stream = None
+
+    def close(self) -> None:
+        with self._lock:
+            self._disconnect()
+
+
+# ─────────────────────────────────────────────
+# Fake server (tests / local development)
+# ─────────────────────────────────────────────
+
+class FakeRespServer:
+    """
+    Threaded in-memory RESP server implementing the commands the session
+    backend uses: PING, DEL, EXISTS, EXPIRE, PEXPIRE, TTL, HSET, HSETNX,
+    HGET, HGETALL, HDEL, SCAN and FLUSHALL. Key expiry is honoured lazily.
+
+        server = FakeRespServer().start()
+        client = RespClient(port=server.port)
+        ...
+        server.stop()
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        self._hashes: dict[bytes, dict[bytes, bytes]] = {}
+        self._deadlines: dict[bytes, float] = {}
+        self._lock = threading.Lock()
+        self.commands = 0
+
+        fake = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                while True:
+                    try:
+                        request = read_reply(self.rfile)
+                    except (RespConnectionError, OSError, ValueError):
+                        return
+                    if not isinstance(request, list) or not request:
+                        return
+                    self.wfile.write(fake._dispatch(request))
+                    self.wfile.flush()
+
+        self._server = socketserver.ThreadingTCPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        self.port: int = self._server.server_address[1]
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "FakeRespServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    # ── Command handling ─────────────────────
+
+    def _dispatch(self, request: list) -> bytes:
+        name, args = request[0].upper().decode("ascii"), request[1:]
+        handler = getattr(self, f"_cmd_{name.lower()}", None)
+        with self._lock:
+            self.commands += 1
+            if handler is None:
+                return _encode_reply(RespError(f"ERR unknown command '{name}'"))
+            try:
+                return _encode_reply(handler(*args))
+            except TypeError:
+                return _encode_reply(RespError(f"ERR wrong number of arguments for '{name}'"))
+
+    def _live_hash(self, key: bytes) -> Optional[dict]:
+        deadline = self._deadlines.get(key)
+        if deadline is not None and deadline <= time.monotonic():
+            self._hashes.pop(key, None)
+            self._deadlines.pop(key, None)
+        return self._hashes.get(key)
+
+    def _cmd_ping(self, *args):
+        return args[0] if args else RespSimple(b"PONG")
+
+    def _cmd_flushall(self):
+        self._hashes.clear()
+        self._deadlines.clear()
+        return RespSimple(b"OK")
+
+    def _cmd_del(self, *keys):
+        removed = 0
+        for key in keys:
+            if self._live_hash(key) is not None:
+                del self._hashes[key]
+                self._deadlines.pop(key, None)
+                removed += 1
+        return removed
+
+    def _cmd_exists(self, *keys):
+        return sum(1 for key in keys if self._live_hash(key) is not None)
+
+    def _cmd_expire(self, key, seconds):
+        return self._cmd_pexpire(key, int(seconds) * 1000)
+
+    def _cmd_pexpire(self, key, millis):
+        if self._live_hash(key) is None:
+            return 0
+        self._deadlines[key] = time.monotonic() + int(millis) / 1000
+        return 1
+
+    def _cmd_ttl(self, key):
+        if self._live_hash(key) is None:
+            return -2
+        deadline = self._deadlines.get(key)
+        return -1 if deadline is None else max(0, round(deadline - time.monotonic()))
+
+    def _cmd_hset(self, key, *pairs):
+        if not pairs or len(pairs) % 2:
+            raise TypeError
+        fields = self._live_hash(key)
+        if fields is None:
+            fields = self._hashes[key] = {}
+        added = 0
+        for field, value in zip(pairs[::2], pairs[1::2]):
+            added += field not in fields
+            fields[field] = value
+        return added
+
+    def _cmd_hsetnx(self, key, field, value):
+        fields = self._live_hash(key)
+        if fields is None:
+            fields = self._hashes[key] = {}
+        if field in fields:
+            return 0
+        fields[field] = value
+        return 1
+
+    def _cmd_hget(self, key, field):
+        return (self._live_hash(key) or {}).get(field)
+
+    def _cmd_hgetall(self, key):
+        fields = self._live_hash(key) or {}
+        return [item for pair in fields.items() for item in pair]
+
+    def _cmd_hdel(self, key, *fields):
+        stored = self._live_hash(key)
+        if stored is None:
+            return 0
+        removed = sum(1 for field in fields if stored.pop(field, None) is not None)
+        if not stored:
+            del self._hashes[key]
+            self._deadlines.pop(key, None)
+        return removed
+
+    def _cmd_scan(self, cursor, *options):
+        pattern = b"*"
+        for flag, value in zip(options[::2], options[1::2]):
+            if flag.upper() == b"MATCH":
+                pattern = value
+        keys = [
+            key for key in list(self._hashes)
+            if self._live_hash(key) is not None
+            and fnmatch.fnmatchcase(key.decode("utf-8"), pattern.decode("utf-8"))
+        ]
+        return [b"0", keys]
+
+
+class RespSimple(bytes):
+    """Marks a simple-string reply for the fake server's encoder."""
+
+
+def _encode_reply(value) -> bytes:
+    if isinstance(value, RespError):
+        return b"-%s\r\n" % str(value).encode("utf-8")
+    if isinstance(value, RespSimple):
+        return b"+%s\r\n" % value
+    if value is None:
+        return b"$-1\r\n"
+    if isinstance(value, int):
+        return b":%d\r\n" % value
+    if isinstance(value, bytes):
+        return b"$%d\r\n%s\r\n" % (len(value), value)
+    if isinstance(value, list):
+        return b"*%d\r\n" % len(value) + b"".join(_encode_reply(item) for item in value)
+    raise TypeError(f"cannot encode {value!r}")
@@ -2,18 +2,530 @@
 IRCTC Conversational IVR - Session Manager
 Tracks the user's position and context across menu levels within a call.
 In production, back this with Redis or another distributed store.
+
+Every operation has a blocking form (create_session, `with transaction`)
+and an awaitable one (acreate_session, `async with transaction`) for the
+webhook handlers, so a round trip to a remote store never stalls the
+event loop.
 """
 
+import sys
 import time
-from typing import Optional
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from enum import Enum
+from typing import TYPE_CHECKING, Callable, Iterator, Optional, Protocol
+
+if TYPE_CHECKING:
+    import resp
 
 # Session TTL: discard stale sessions after 30 minutes
 _SESSION_TTL_SECONDS = 30 * 60
 
 
+# ─────────────────────────────────────────────
+# Session record
+# ─────────────────────────────────────────────
+
+class Flow(str, Enum):
+    """Sub-flow the caller is in."""
+    PNR   = "pnr"
+    TRAIN = "train"
+
+
+class Menu(str, Enum):
+    """Menus a caller can have been presented."""
+    MAIN = "main"
+
+
+def _interned(enum_cls: type[Enum], value):
+    """Map known values onto shared enum members; intern any other string."""
+    if value is None or isinstance(value, enum_cls):
+        return value
+    try:
+        return enum_cls(value)
+    except ValueError:
+        return sys.intern(value) if isinstance(value, str) else value
+
+
+_FIELDS = (
+    "created_at", "updated_at", "caller", "flow", "last_menu",
+    "last_digit", "last_pnr", "last_train", "stops_page", "booking_pnr",
+    "suggestion", "ended",
+)
+_FIELD_SET = frozenset(_FIELDS)
+_INTERNED_FIELDS = {"flow": Flow, "last_menu": Menu}
+
+
+class SessionUnavailable(Exception):
+    """The session store could not be reached."""
+
+
+class SessionRecord(MutableMapping):
+    """
+    Fixed-schema session stored in __slots__ instead of a per-call dict.
+
+    Behaves as a mapping over the documented session fields, so existing
+    `session["flow"]` / `session.update(...)` / `session.get(...)` callers
+    keep working; unknown keys raise KeyError. `flow` and `last_menu` are
+    interned to Flow / Menu members (which compare equal to their string
+    values).
+    """
+
+    __slots__ = _FIELDS
+
+    def __init__(self, created_at: float, caller: Optional[str] = None):
+        self.created_at  = created_at
+        self.updated_at  = created_at
+        self.caller      = caller
+        self.flow        = None
+        self.last_menu   = None
+        self.last_digit  = None
+        self.last_pnr    = None
+        self.last_train  = None
+        self.stops_page  = None
+        self.booking_pnr = None
+        self.suggestion  = None
+        self.ended       = False
+
+    def __getitem__(self, key: str):
+        if key not in _FIELD_SET:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __setitem__(self, key: str, value) -> None:
+        if key not in _FIELD_SET:
+            raise KeyError(f"unknown session field {key!r}")
+        enum_cls = _INTERNED_FIELDS.get(key)
+        if enum_cls is not None:
+            value = _interned(enum_cls, value)
+        setattr(self, key, value)
+
+    def __delitem__(self, key: str) -> None:
+        raise TypeError("session fields cannot be deleted")
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(_FIELDS)
+
+    def __len__(self) -> int:
+        return len(_FIELDS)
+
+    def to_dict(self) -> dict:
+        """Plain-dict snapshot with enum members flattened to strings."""
+        return {
+            key: value.value if isinstance(value, Enum) else value
+            for key, value in ((key, getattr(self, key)) for key in _FIELDS)
+        }
+
+    def __repr__(self) -> str:
+        return f"SessionRecord({self.to_dict()!r})"
+
+
+# ─────────────────────────────────────────────
+# Storage backends
+# ─────────────────────────────────────────────
+
+# on_close(call_sid, session, reason): a session ended ("ended") or expired
+# ("expired").
+CloseHook = Callable[[str, SessionRecord, str], None]
+
+
+class SessionBackend(Protocol):
+    """
+    Storage for session records. Every method is a single operation
+    against the store (one network round trip for remote backends), and
+    each has an awaitable twin (acreate, aget, aupdate, aend) for use on
+    the event loop. `on_close`, when set, is called as sessions finish,
+    on the thread that made the call. A store that cannot be reached
+    raises SessionUnavailable.
+    """
+
+    on_close: Optional[CloseHook]
+
+    def create(self, call_sid: str, caller: Optional[str]) -> SessionRecord: ...
+
+    def get(self, call_sid: str) -> Optional[SessionRecord]: ...
+
+    def update(self, call_sid: str, changes: dict) -> SessionRecord: ...
+
+    def end(self, call_sid: str) -> None: ...
+
+    def count_active(self) -> int: ...
+
+    async def acreate(self, call_sid: str, caller: Optional[str]) -> SessionRecord: ...
+
+    async def aget(self, call_sid: str) -> Optional[SessionRecord]: ...
+
+    async def aupdate(self, call_sid: str, changes: dict) -> SessionRecord: ...
+
+    async def aend(self, call_sid: str) -> None: ...
+
+
+class InMemorySessionBackend:
+    """
+    Process-local store.
+
+    Sessions are kept in an OrderedDict ordered by `updated_at` (every write
+    moves the session to the end), so expiry only ever looks at the oldest
+    entries and costs time proportional to the number of sessions actually
+    expired. The number of non-ended sessions is maintained incrementally.
+    """
+
+    def __init__(
+        self, ttl_seconds: float = _SESSION_TTL_SECONDS, on_close: Optional[CloseHook] = None
+    ):
+        self._ttl = ttl_seconds
+        self._store: OrderedDict[str, SessionRecord] = OrderedDict()
+        self._live = 0   # sessions in _store with ended == False
+        self.on_close = on_close
+
+    def create(self, call_sid: str, caller: Optional[str]) -> SessionRecord:
+        now = time.time()
+        previous = self.get(call_sid)
+        if previous is not None and not previous.ended:
+            return self._resumed(call_sid, previous, caller, now)
+        session = SessionRecord(now, caller)
+        self._store.pop(call_sid, None)
+        self._store[call_sid] = session
+        self._live += 1
+        self._purge_stale(now)
+        return session
+
+    def _resumed(
+        self, call_sid: str, session: SessionRecord, caller: Optional[str], now: float
+    ) -> SessionRecord:
+        if caller is not None:
+            session.caller = caller
+        session.updated_at = now
+        self._store.move_to_end(call_sid)
+        return session
+
+    def get(self, call_sid: str) -> Optional[SessionRecord]:
+        session = self._store.get(call_sid)
+        if session is None:
+            return None
+        if time.time() - session.updated_at > self._ttl:
+            self._discard(call_sid)
+            return None
+        return session
+
+    def update(self, call_sid: str, changes: dict) -> SessionRecord:
+        session = self.get(call_sid)
+        if session is None:
+            session = self.create(call_sid, None)
+
+        was_ended = session.ended
+        session.update(changes)
+        session.updated_at = time.time()
+        self._store.move_to_end(call_sid)
+        if session.ended != was_ended:
+            self._live += 1 if was_ended else -1
+            if session.ended:
+                self._closed(call_sid, session, "ended")
+        return session
+
+    def end(self, call_sid: str) -> None:
+        session = self.get(call_sid)
+        if session is not None:
+            newly_ended = not session.ended
+            if newly_ended:
+                session.ended = True
+                self._live -= 1
+            session.updated_at = time.time()
+            self._store.move_to_end(call_sid)
+            if newly_ended:
+                self._closed(call_sid, session, "ended")
+
+    def count_active(self) -> int:
+        self._purge_stale()
+        return self._live
+
+    # Nothing here waits, so the awaitable forms just run in place.
+
+    async def acreate(self, call_sid: str, caller: Optional[str]) -> SessionRecord:
+        return self.create(call_sid, caller)
+
+    async def aget(self, call_sid: str) -> Optional[SessionRecord]:
+        return self.get(call_sid)
+
+    async def aupdate(self, call_sid: str, changes: dict) -> SessionRecord:
+        return self.update(call_sid, changes)
+
+    async def aend(self, call_sid: str) -> None:
+        self.end(call_sid)
+
+    def _discard(self, call_sid: str) -> None:
+        session = self._store.pop(call_sid)
+        if not session.ended:
+            self._live -= 1
+            self._closed(call_sid, session, "expired")
+
+    def _closed(self, call_sid: str, session: SessionRecord, reason: str) -> None:
+        if self.on_close is not None:
+            self.on_close(call_sid, session, reason)
+
+    def _purge_stale(self, now: Optional[float] = None) -> None:
+        """
+        Remove expired sessions to prevent unbounded memory growth.
+        Stops at the first session that is still fresh, since every later
+        entry was updated more recently.
+        """
+        cutoff = (now if now is not None else time.time()) - self._ttl
+        store = self._store
+        while store:
+            oldest = next(iter(store))
+            if store[oldest].updated_at >= cutoff:
+                break
+            self._discard(oldest)
+
+
+def _encode_value(value) -> str:
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    if isinstance(value, Enum):
+        return value.value
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+def _decode_record(flat: list) -> Optional[SessionRecord]:
+    """Build a SessionRecord from an HGETALL reply (None if the key is gone)."""
+    if not flat:
+        return None
+    fields = {
+        flat[i].decode("utf-8"): flat[i + 1].decode("utf-8")
+        for i in range(0, len(flat), 2)
+    }
+    created_at = float(fields.pop("created_at", fields.get("updated_at", 0.0)))
+    session = SessionRecord(created_at)
+    for key, value in fields.items():
+        if key == "updated_at":
+            session.updated_at = float(value)
+        elif key == "ended":
+            session.ended = value == "1"
+        elif key == "stops_page":
+            session.stops_page = int(value)
+        elif key in _FIELD_SET:
+            session[key] = value
+    return session
+
+
+class RespSessionBackend:
+    """
+    Redis-compatible store shared by every worker process.
+
+    Each session is a hash at `<prefix><CallSid>` whose lifetime is managed
+    by the server's native key TTL, refreshed on every write. Every method
+    issues exactly one pipelined round trip; None-valued fields are stored
+    as absent hash fields. Writes are upserts, except that end() of an
+    unknown session leaves nothing behind, and create() of an ended one
+    starts afresh (each at the cost of a second round trip in that case
+    only). The first write that ends a call also sets a
+    `closed` marker with HSETNX, so `on_close` hears of each call once
+    however many workers end it. `count_active()` scans the keyspace and is
+    meant for diagnostics only. Sessions expire inside the server, so
+    `on_close` only hears of ended ones.
+
+    The client blocks, so the awaitable methods run its round trip on a
+    worker thread; replies are decoded, and `on_close` called, back on the
+    caller's event loop.
+    """
+
+    def __init__(
+        self,
+        client: "resp.RespClient",
+        ttl_seconds: float = _SESSION_TTL_SECONDS,
+        prefix: str = "ivr:session:",
+        on_close: Optional[CloseHook] = None,
+    ):
+        import resp
+
+        self.client = client
+        self.prefix = prefix
+        self._ttl_ms = int(ttl_seconds * 1000)
+        self.on_close = on_close
+        self._unreachable = (resp.RespConnectionError, OSError)
+
+    def _pipeline(self, commands: list[tuple]) -> list:
+        try:
+            return self.client.pipeline(commands)
+        except self._unreachable as exc:
+            raise SessionUnavailable(str(exc)) from exc
+
+    async def _apipeline(self, commands: list[tuple]) -> list:
+        import asyncio
+
+        try:
+            return await asyncio.to_thread(self.client.pipeline, commands)
+        except self._unreachable as exc:
+            raise SessionUnavailable(str(exc)) from exc
+
+    # Each operation is split into the commands it sends and what it makes
+    # of the replies, shared by the blocking and awaitable forms.
+
+    def _create_commands(self, call_sid: str, session: SessionRecord) -> list[tuple]:
+        """Start `session`, unless the call already has a live one to refresh."""
+        key = self.prefix + call_sid
+        refreshed = ["updated_at", _encode_value(session.updated_at)]
+        if session.caller is not None:
+            refreshed += ["caller", session.caller]
+        return [
+            ("HGET", key, "ended"),
+            ("HSETNX", key, "created_at", _encode_value(session.created_at)),
+            ("HSETNX", key, "ended", "0"),
+            ("HSET", key, *refreshed),
+            ("PEXPIRE", key, self._ttl_ms),
+            ("HGETALL", key),
+        ]
+
+    def _replace_commands(self, call_sid: str, session: SessionRecord) -> list[tuple]:
+        key = self.prefix + call_sid
+        fields = [
+            item
+            for name, value in session.items() if value is not None
+            for item in (name, _encode_value(value))
+        ]
+        return [("DEL", key), ("HSET", key, *fields), ("PEXPIRE", key, self._ttl_ms)]
+
+    def _create_reply(
+        self, call_sid: str, session: SessionRecord, replies: list
+    ) -> tuple[SessionRecord, Optional[list[tuple]]]:
+        """The stored session; the commands to start afresh if the call had ended."""
+        if replies[0] == b"1":
+            return session, self._replace_commands(call_sid, session)
+        return _decode_record(replies[-1]), None
+
+    @staticmethod
+    def _get_reply(replies: list) -> Optional[SessionRecord]:
+        reply = replies[0]
+        if isinstance(reply, Exception):
+            raise reply
+        return _decode_record(reply)
+
+    def _update_commands(self, call_sid: str, changes: dict) -> list[tuple]:
+        key = self.prefix + call_sid
+        now = changes["updated_at"]
+        for name in changes:
+            if name not in _FIELD_SET:
+                raise KeyError(f"unknown session field {name!r}")
+        to_set = [
+            item
+            for name, value in changes.items() if value is not None
+            for item in (name, _encode_value(value))
+        ]
+        to_clear = [name for name, value in changes.items() if value is None]
+
+        # HSETNX keeps created_at on existing sessions and fills it in when
+        # the session has to be created on the fly.
+        commands = [("HSETNX", key, "created_at", _encode_value(now))]
+        if "ended" not in changes:
+            commands.append(("HSETNX", key, "ended", "0"))
+        commands.append(("HSET", key, *to_set))
+        if "ended" in changes and not changes["ended"]:
+            to_clear.append("closed")
+        if to_clear:
+            commands.append(("HDEL", key, *to_clear))
+        if changes.get("ended"):
+            commands.append(("HSETNX", key, "closed", "1"))
+        commands += [("PEXPIRE", key, self._ttl_ms), ("HGETALL", key)]
+        return commands
+
+    def _update_reply(self, call_sid: str, changes: dict, replies: list) -> SessionRecord:
+        session = _decode_record(replies[-1])
+        # replies[-3] answers the HSETNX of the `closed` marker
+        if changes.get("ended") and replies[-3] == 1:
+            self._closed(call_sid, session)
+        return session
+
+    def _end_commands(self, call_sid: str, now: float) -> list[tuple]:
+        key = self.prefix + call_sid
+        return [
+            ("HGETALL", key),
+            ("HSETNX", key, "closed", "1"),
+            ("HSET", key, "ended", "1", "updated_at", _encode_value(now)),
+            ("PEXPIRE", key, self._ttl_ms),
+        ]
+
+    def _end_reply(self, call_sid: str, now: float, replies: list) -> Optional[list[tuple]]:
+        """Fire on_close if this ended the call; the clean-up to run if it was unknown."""
+        session = _decode_record(replies[0])
+        if session is None:
+            return [("DEL", self.prefix + call_sid)]
+        if replies[1] == 1:
+            session.ended = True
+            session.updated_at = now
+            self._closed(call_sid, session)
+        return None
+
+    def _closed(self, call_sid: str, session: SessionRecord) -> None:
+        if self.on_close is not None:
+            self.on_close(call_sid, session, "ended")
+
+    def create(self, call_sid: str, caller: Optional[str]) -> SessionRecord:
+        session = SessionRecord(time.time(), caller)
+        replies = self._pipeline(self._create_commands(call_sid, session))
+        session, replace = self._create_reply(call_sid, session, replies)
+        if replace:
+            self._pipeline(replace)
+        return session
+
+    def get(self, call_sid: str) -> Optional[SessionRecord]:
+        return self._get_reply(self._pipeline([("HGETALL", self.prefix + call_sid)]))
+
+    def update(self, call_sid: str, changes: dict) -> SessionRecord:
+        changes = {**changes, "updated_at": time.time()}
+        replies = self._pipeline(self._update_commands(call_sid, changes))
+        return self._update_reply(call_sid, changes, replies)
+
+    def end(self, call_sid: str) -> None:
+        now = time.time()
+        cleanup = self._end_reply(call_sid, now, self._pipeline(self._end_commands(call_sid, now)))
+        if cleanup:
+            self._pipeline(cleanup)
+
+    async def acreate(self, call_sid: str, caller: Optional[str]) -> SessionRecord:
+        session = SessionRecord(time.time(), caller)
+        replies = await self._apipeline(self._create_commands(call_sid, session))
+        session, replace = self._create_reply(call_sid, session, replies)
+        if replace:
+            await self._apipeline(replace)
+        return session
+
+    async def aget(self, call_sid: str) -> Optional[SessionRecord]:
+        return self._get_reply(await self._apipeline([("HGETALL", self.prefix + call_sid)]))
+
+    async def aupdate(self, call_sid: str, changes: dict) -> SessionRecord:
+        changes = {**changes, "updated_at": time.time()}
+        replies = await self._apipeline(self._update_commands(call_sid, changes))
+        return self._update_reply(call_sid, changes, replies)
+
+    async def aend(self, call_sid: str) -> None:
+        now = time.time()
+        replies = await self._apipeline(self._end_commands(call_sid, now))
+        cleanup = self._end_reply(call_sid, now, replies)
+        if cleanup:
+            await self._apipeline(cleanup)
+
+    def count_active(self) -> int:
+        keys = []
+        cursor = b"0"
+        while True:
+            cursor, batch = self._pipeline([("SCAN", cursor, "MATCH", self.prefix + "*")])[0]
+            keys += batch
+            if cursor == b"0":
+                break
+        if not keys:
+            return 0
+        flags = self._pipeline([("HGET", key, "ended") for key in keys])
+        return sum(1 for flag in flags if flag == b"0")
+
+
+# ─────────────────────────────────────────────
+# Session manager
+# ─────────────────────────────────────────────
+
 class SessionManager:
     """
-    In-memory key-value session store keyed by Twilio's CallSid.
+    Key-value session store keyed by Twilio's CallSid.
 
     Session schema:
         created_at  : float          — Unix timestamp of creation
@@ -24,75 +536,192 @@ class SessionManager:
         last_digit  : str | None     — Last digit(s) the caller pressed
         last_pnr    : str | None     — Most recently queried PNR
         last_train  : str | None     — Most recently queried train number
+        stops_page  : int | None     — Next schedule page of last_train to read
+        booking_pnr : str | None     — Caller's booking offered at the welcome menu
+        suggestion  : str | None     — PNR / train number offered for a mistyped one
         ended       : bool           — Whether the call has ended
+
+    Each session is a SessionRecord (slotted, mapping-compatible). Storage
+    is delegated to a SessionBackend: in-process by default, or
+    RespSessionBackend to share sessions between worker processes.
     """
 
-    def __init__(self):
-        self._store: dict[str, dict] = {}
+    def __init__(
+        self,
+        backend: Optional[SessionBackend] = None,
+        ttl_seconds: float = _SESSION_TTL_SECONDS,
+    ):
+        self.backend = backend if backend is not None else InMemorySessionBackend(ttl_seconds)
 
     # ── Lifecycle ─────────────────────────────
 
-    def create_session(self, call_sid: str, caller: Optional[str] = None) -> dict:
-        """Initialise a new session for a call. Overwrites any stale session."""
-        now = time.time()
-        session = {
-            "created_at": now,
-            "updated_at": now,
-            "caller":     caller,
-            "flow":       None,
-            "last_menu":  None,
-            "last_digit": None,
-            "last_pnr":   None,
-            "last_train": None,
-            "ended":      False,
-        }
-        self._store[call_sid] = session
-        self._purge_stale()
-        return session
+    def create_session(self, call_sid: str, caller: Optional[str] = None) -> SessionRecord:
+        """
+        Initialise a new session for a call. A live session of the same call
+        (Twilio sends callers back to /voice after invalid input) is kept,
+        with only `caller` and updated_at refreshed; an ended one is replaced.
+        """
+        return self.backend.create(call_sid, caller)
 
-    def get_session(self, call_sid: str) -> Optional[dict]:
+    def get_session(self, call_sid: str) -> Optional[SessionRecord]:
         """Retrieve a session, or None if it does not exist / has expired."""
-        session = self._store.get(call_sid)
-        if session is None:
-            return None
-        if time.time() - session["updated_at"] > _SESSION_TTL_SECONDS:
-            del self._store[call_sid]
-            return None
-        return session
+        return self.backend.get(call_sid)
 
-    def update_session(self, call_sid: str, **kwargs) -> dict:
+    def update_session(self, call_sid: str, **kwargs) -> SessionRecord:
         """
         Update specific fields in an existing session.
         Creates a minimal session if one does not exist (graceful degradation).
         """
-        session = self.get_session(call_sid)
-        if session is None:
-            session = self.create_session(call_sid)
-
-        session.update(kwargs)
-        session["updated_at"] = time.time()
-        self._store[call_sid] = session
-        return session
+        return self.backend.update(call_sid, kwargs)
 
     def end_session(self, call_sid: str) -> None:
         """Mark a session as ended (caller hung up or said goodbye)."""
-        session = self.get_session(call_sid)
-        if session:
-            session["ended"] = True
-            session["updated_at"] = time.time()
+        self.backend.end(call_sid)
+
+    async def acreate_session(self, call_sid: str, caller: Optional[str] = None) -> SessionRecord:
+        """create_session() without blocking the event loop."""
+        return await self.backend.acreate(call_sid, caller)
+
+    async def aget_session(self, call_sid: str) -> Optional[SessionRecord]:
+        """get_session() without blocking the event loop."""
+        return await self.backend.aget(call_sid)
 
-    # ── Internal helpers ──────────────────────
+    async def aupdate_session(self, call_sid: str, **kwargs) -> SessionRecord:
+        """update_session() without blocking the event loop."""
+        return await self.backend.aupdate(call_sid, kwargs)
 
-    def _purge_stale(self) -> None:
-        """Remove expired sessions to prevent unbounded memory growth."""
-        cutoff = time.time() - _SESSION_TTL_SECONDS
-        stale = [sid for sid, s in self._store.items() if s["updated_at"] < cutoff]
-        for sid in stale:
-            del self._store[sid]
+    async def aend_session(self, call_sid: str) -> None:
+        """end_session() without blocking the event loop."""
+        await self.backend.aend(call_sid)
+
+    def transaction(self, call_sid: str) -> "SessionTransaction":
+        """
+        Start a unit of work for one webhook request:
+
+            with session_manager.transaction(call_sid) as tx:
+                tx.set(last_menu="main", last_digit=digits)
+                if digits == "9":
+                    tx.end()
+
+        Changes are committed with a single backend write when the block
+        exits normally, and discarded if it raises. On the event loop use
+        `async with`, and `await tx.load()` before reading with tx.get().
+        """
+        return SessionTransaction(self.backend, call_sid)
 
     # ── Diagnostics ───────────────────────────
 
     def active_sessions(self) -> int:
         """Return the number of currently active (non-ended) sessions."""
-        self._purge_stale()
-        return sum(1 for s in self._store.values() if not s.get("ended"))
+        return self.backend.count_active()
+
+
+class SessionTransaction:
+    """
+    Collects the session changes made while handling one request and
+    writes them in one backend call on commit(). The current session is
+    read at most once, and only if the handler asks for it.
+    """
+
+    __slots__ = ("_backend", "call_sid", "_changes", "_session", "_loaded")
+
+    def __init__(self, backend: SessionBackend, call_sid: str):
+        self._backend = backend
+        self.call_sid = call_sid
+        self._changes: dict = {}
+        self._session: Optional[SessionRecord] = None
+        self._loaded = False
+
+    @property
+    def session(self) -> Optional[SessionRecord]:
+        """The session as stored before this transaction (None if absent)."""
+        if not self._loaded:
+            self._session = self._backend.get(self.call_sid)
+            self._loaded = True
+        return self._session
+
+    async def load(self) -> Optional[SessionRecord]:
+        """Read the session (once) without blocking the event loop."""
+        if not self._loaded:
+            self._session = await self._backend.aget(self.call_sid)
+            self._loaded = True
+        return self._session
+
+    def get(self, key: str, default=None):
+        """A field value, with pending changes taking precedence."""
+        if key in self._changes:
+            return self._changes[key]
+        session = self.session
+        return default if session is None else session.get(key, default)
+
+    def set(self, **changes) -> None:
+        """Stage field changes."""
+        self._changes.update(changes)
+
+    def end(self) -> None:
+        """Stage marking the call as ended."""
+        self._changes["ended"] = True
+
+    def commit(self) -> Optional[SessionRecord]:
+        """Write staged changes (if any) and return the stored session."""
+        changes, self._changes = self._changes, {}
+        if not changes:
+            return self._session
+        if _only_ends(changes):
+            # end_session() semantics: never resurrect an unknown call
+            self._backend.end(self.call_sid)
+            return None
+        self._session = self._backend.update(self.call_sid, changes)
+        self._loaded = True
+        return self._session
+
+    async def acommit(self) -> Optional[SessionRecord]:
+        """commit() without blocking the event loop."""
+        changes, self._changes = self._changes, {}
+        if not changes:
+            return self._session
+        if _only_ends(changes):
+            await self._backend.aend(self.call_sid)
+            return None
+        self._session = await self._backend.aupdate(self.call_sid, changes)
+        self._loaded = True
+        return self._session
+
+    def __enter__(self) -> "SessionTransaction":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.commit()
+        else:
+            self._changes.clear()
+
+    async def __aenter__(self) -> "SessionTransaction":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            await self.acommit()
+        else:
+            self._changes.clear()
+
+
+def _only_ends(changes: dict) -> bool:
+    return changes.keys() == {"ended"} and changes["ended"] is True
+
+
+def session_manager_from_url(url: Optional[str]) -> SessionManager:
+    """
+    Build a SessionManager from a backend URL:
+        None / ""               → in-process store
+        resp://host:port        → Redis-compatible server
+    """
+    if not url:
+        return SessionManager()
+    scheme, _, address = url.partition("://")
+    if scheme not in ("resp", "redis"):
+        raise ValueError(f"unsupported session backend {url!r}")
+    import resp
+
+    host, _, port = address.rstrip("/").rpartition(":")
+    return SessionManager(RespSessionBackend(resp.RespClient(host, int(port))))
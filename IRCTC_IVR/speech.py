@@ -0,0 +1,181 @@
+"""
+IRCTC Conversational IVR - Speech Rendering
+Turns train records into text that en-IN TTS reads well, split into pages
+of halts so long schedules are read a few stops at a time:
+
+    "16:55"               → "4:55 P.M."
+    "8:35 AM (next day)"  → "8:35 A.M., next day"
+    "Agra Cantt", "LTT"   → "Agra Cantonment", "L.T.T."
+    "12952"               → "1 2 9 5 2"   (train numbers are read digit by digit)
+
+The normalized pages are cached per record, so a caller paging through a
+30-halt schedule (or many callers asking for the same train) costs one
+normalization.
+"""
+
+import re
+from collections import OrderedDict
+from typing import NamedTuple
+
+HALTS_PER_PAGE = 4
+
+_TIME = re.compile(r"\b(\d{1,2}):(\d{2})(?:\s*([AaPp])\.?\s*[Mm]\.?(?![A-Za-z]))?")
+_ASIDE = re.compile(r"\s*\(([^()]*)\)")
+
+# Station-name abbreviations as printed in timetables.
+_ABBREVIATIONS = {
+    "Jn": "Junction", "Jct": "Junction", "Cantt": "Cantonment", "Cant": "Cantonment",
+    "Stn": "Station", "Rd": "Road", "Ter": "Terminus", "Tml": "Terminus",
+}
+# Names read letter by letter. Any other all-caps word ("KOTA", "MEMU") is
+# read as a word, so only codes callers know as letters belong here.
+_ACRONYMS = frozenset({
+    "LTT", "CSMT", "CST", "KSR", "MGR", "SMVT", "HSR", "AC", "SF", "EMU",
+})
+_DAYS = {
+    "Mon": "Monday", "Tue": "Tuesday", "Tues": "Tuesday", "Wed": "Wednesday",
+    "Thu": "Thursday", "Thur": "Thursday", "Thurs": "Thursday", "Fri": "Friday",
+    "Sat": "Saturday", "Sun": "Sunday",
+}
+
+
+# ─────────────────────────────────────────────
+# Normalizers
+# ─────────────────────────────────────────────
+
+def _speak_clock(match: re.Match) -> str:
+    hour, minute, half = int(match[1]), match[2], match[3]
+    if half is None:                       # 24-hour clock
+        if hour > 23:
+            return match[0]
+        half = "a" if hour < 12 else "p"
+        hour = hour % 12 or 12
+    suffix = "A.M." if half in "Aa" else "P.M."
+    if minute == "00" and hour == 12:
+        return "12 noon" if suffix == "P.M." else "12 midnight"
+    return f"{hour} {suffix}" if minute == "00" else f"{hour}:{minute} {suffix}"
+
+
+def speak_time(text: str) -> str:
+    """Clock times as spoken: 12-hour with A.M./P.M.; asides become clauses."""
+    return _ASIDE.sub(r", \1", _TIME.sub(_speak_clock, text))
+
+
+def _expand(text: str, table: dict[str, str], acronyms: frozenset[str] = frozenset()) -> str:
+    words = []
+    for word in text.split():
+        core = word.rstrip(".,")
+        tail = word[len(core):].lstrip(".")
+        if core.isalpha() and core.isupper() and len(core) > 1 and core not in acronyms:
+            core = core.capitalize()             # "KOTA JN" reads as "Kota Junction"
+            word = core + word[len(core):]
+        if core in table:
+            word = table[core] + tail
+        elif core in acronyms:
+            word = ".".join(core) + "." + tail
+        words.append(word)
+    return " ".join(words)
+
+
+def speak_name(text: str) -> str:
+    """Station or train name with abbreviations expanded and known acronyms spelled."""
+    return _expand(text, _ABBREVIATIONS, _ACRONYMS)
+
+
+def speak_days(text: str) -> str:
+    """Days of operation with abbreviated day names expanded."""
+    return _expand(text, _DAYS)
+
+
+def speak_digits(number: str) -> str:
+    """Read a number digit by digit, as train numbers are announced."""
+    return " ".join(number)
+
+
+def _sentence(text: str) -> str:
+    return text if text.endswith(".") else text + "."
+
+
+# ─────────────────────────────────────────────
+# Train schedules
+# ─────────────────────────────────────────────
+
+class SpokenTrain(NamedTuple):
+    intro: str                  # number, name, route, times, days
+    pages: tuple[str, ...]      # halts, HALTS_PER_PAGE per page
+
+    @property
+    def page_count(self) -> int:
+        return max(1, len(self.pages))
+
+    def text(self, page: int) -> str:
+        """What the caller hears for `page`; page 0 carries the intro."""
+        if page:
+            return self.pages[page]
+        return f"{self.intro} Schedule: {self.pages[0]}" if self.pages else self.intro
+
+
+def speak_train(train_number: str, record: dict, per_page: int = HALTS_PER_PAGE) -> SpokenTrain:
+    """Normalize and page one train record (uncached; see SpeechCache)."""
+    intro = " ".join((
+        f"Train number {speak_digits(train_number)}, {_sentence(speak_name(record['name']))}",
+        f"Runs from {speak_name(record['source'])} to "
+        f"{_sentence(speak_name(record['destination']))}",
+        f"Departure: {_sentence(speak_time(record['departure']))}",
+        f"Arrival: {_sentence(speak_time(record['arrival']))}",
+        f"Days of operation: {_sentence(speak_days(record['days']))}",
+    ))
+    halts = [
+        f"Halt {i}: {speak_name(stop['station'])}, arrives {speak_time(stop['arrival'])}, "
+        f"departs {_sentence(speak_time(stop['departure']))}"
+        for i, stop in enumerate(record.get("stops") or (), 1)
+    ]
+    pages = tuple(" ".join(halts[i:i + per_page]) for i in range(0, len(halts), per_page))
+    return SpokenTrain(intro, pages)
+
+
+class SpeechCache:
+    """
+    Bounded LRU of SpokenTrain per train number. An entry is used only
+    while the record it was built from is the current one (the same object,
+    or an equal one), so timetable updates never serve stale speech.
+    """
+
+    def __init__(self, max_entries: int = 4_096):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[dict, SpokenTrain]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, train_number: str, record: dict) -> SpokenTrain:
+        entry = self._entries.get(train_number)
+        if entry is not None and (entry[0] is record or entry[0] == record):
+            self._entries.move_to_end(train_number)
+            self.hits += 1
+            return entry[1]
+        self.misses += 1
+        spoken = speak_train(train_number, record)
+        self._entries[train_number] = (record, spoken)
+        self._entries.move_to_end(train_number)
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+        return spoken
+
+    def stats(self) -> dict:
+        return {
+            "size":      len(self._entries),
+            "hits":      self.hits,
+            "misses":    self.misses,
+            "evictions": self.evictions,
+        }
+
+
+speech_cache = SpeechCache()
+
+
+def spoken_train(train_number: str, record: dict) -> SpokenTrain:
+    """Cached speak_train()."""
+    return speech_cache.get(train_number, record)
+
@@ -0,0 +1,77 @@
+"""
+IRCTC Conversational IVR - Test helpers
+Drives the ASGI apps in process: no server, no HTTP client.
+"""
+
+import asyncio
+import os
+import sys
+from urllib.parse import urlencode
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+FORM = b"application/x-www-form-urlencoded"
+
+
+async def asgi_post(app, path: str, body: bytes, content_type: bytes = FORM) -> tuple:
+    """One in-process POST; returns (status, headers, body)."""
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": "POST", "scheme": "http", "path": path, "raw_path": path.encode(),
+        "query_string": b"", "root_path": "", "server": ("test", 80),
+        "client": ("127.0.0.1", 0),
+        "headers": [(b"content-type", content_type),
+                    (b"content-length", str(len(body)).encode())],
+    }
+    pending = [{"type": "http.request", "body": body, "more_body": False}]
+    out = {"status": None, "headers": None, "body": b""}
+
+    async def receive():
+        if pending:
+            return pending.pop()
+        await asyncio.Event().wait()
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            out["status"], out["headers"] = message["status"], message["headers"]
+        else:
+            out["body"] += message.get("body", b"")
+
+    await app(scope, receive, send)
+    return out["status"], sorted(out["headers"]), out["body"]
+
+
+def post(app, path: str, **form) -> tuple:
+    """POST `form` to `path` on `app`; returns (status, body as text)."""
+    status, _, body = asyncio.run(asgi_post(app, path, urlencode(form).encode()))
+    return status, body.decode()
+
+
+@pytest.fixture(params=["app", "fast_app"])
+def ivr_app(request):
+    """The FastAPI app and its fast-path wrapper, in turn."""
+    import main
+    return getattr(main, request.param)
+
+
+@pytest.fixture
+def isolated_store(monkeypatch):
+    """
+    data_store's records, indexes, versions and lookup caches swapped for
+    copies, so whatever a test puts into the store is gone after it.
+    """
+    import data_store
+
+    pnrs, trains = dict(data_store._PNR_STORE), dict(data_store._TRAIN_STORE)
+    monkeypatch.setattr(data_store, "_PNR_STORE", pnrs)
+    monkeypatch.setattr(data_store, "_TRAIN_STORE", trains)
+    monkeypatch.setattr(data_store, "_INDEX", data_store.RailwayIndex(trains, pnrs))
+    monkeypatch.setattr(data_store, "_PNR_VERSIONS", dict(data_store._PNR_VERSIONS))
+    monkeypatch.setattr(data_store, "_TRAIN_VERSIONS", dict(data_store._TRAIN_VERSIONS))
+    for name in ("_PNR_CACHE", "_TRAIN_CACHE"):
+        cache = getattr(data_store, name)
+        if cache is not None:
+            cache = data_store.LookupCache(cache.ttl, cache.negative_ttl, cache.max_entries)
+        monkeypatch.setattr(data_store, name, cache)
@@ -0,0 +1,44 @@
+from conftest import post
+
+import main
+
+
+def _busy() -> str:
+    return main._busy().decode()
+
+
+def test_overload_sheds_new_calls_and_admits_calls_in_progress(ivr_app, monkeypatch):
+    monkeypatch.setattr(main.admission, "in_flight", main.admission.max_in_flight)
+    main.session_manager.create_session("CAadmitted")
+    try:
+        assert post(ivr_app, "/voice", CallSid="CAnew", From="+919800000001") == (200, _busy())
+
+        # Invalid input and timeouts send a call in progress back to /voice.
+        status, body = post(ivr_app, "/voice", CallSid="CAadmitted", From="+919800000001")
+        assert status == 200 and body != _busy()
+        assert "<Gather" in body
+
+        status, body = post(ivr_app, "/handle-menu", CallSid="CAadmitted", Digits="1")
+        assert status == 200 and body != _busy()
+        assert post(ivr_app, "/handle-menu", CallSid="CAunknown", Digits="1") == (200, _busy())
+    finally:
+        main.session_manager.end_session("CAadmitted")
+
+
+def test_underload_admits_new_calls(ivr_app):
+    status, body = post(ivr_app, "/voice", CallSid="CAfresh", From="+919800000001")
+    main.session_manager.end_session("CAfresh")
+    assert status == 200 and body != _busy()
+
+
+def test_call_admitted_before_overload_completes(ivr_app, monkeypatch):
+    status, body = post(ivr_app, "/voice", CallSid="CAearly", From="+919800000001")
+    assert status == 200 and body != _busy()
+    monkeypatch.setattr(main.admission, "in_flight", main.admission.max_in_flight)
+    try:
+        for path, digits in (("/handle-menu", "1"), ("/handle-pnr", "2154673890"),
+                             ("/handle-pnr-options", "9")):
+            status, body = post(ivr_app, path, CallSid="CAearly", Digits=digits)
+            assert status == 200 and body != _busy(), path
+    finally:
+        main.session_manager.end_session("CAearly")
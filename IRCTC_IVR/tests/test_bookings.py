@@ -0,0 +1,26 @@
+from conftest import post
+
+import data_store
+import main
+
+
+def test_caller_is_offered_their_booking_and_key_3_reads_it(ivr_app, isolated_store):
+    pnr, mobile = "7000000001", "9100000001"
+    data_store.put_pnr({**data_store._PNR_DB["2154673890"], "pnr": pnr, "mobile": mobile})
+
+    status, welcome = post(ivr_app, "/voice", CallSid="CAbooked", From="+91" + mobile)
+    assert status == 200 and data_store._PNR_DB["2154673890"]["train_name"] in welcome
+    status, offered = post(ivr_app, "/handle-menu", CallSid="CAbooked", Digits="3")
+    assert status == 200 and "P.N.R. number " + " ".join(pnr) in offered
+
+    # Keying the same PNR in hears the same status.
+    post(ivr_app, "/voice", CallSid="CAkeyed", From="+919800000001")
+    post(ivr_app, "/handle-menu", CallSid="CAkeyed", Digits="1")
+    assert post(ivr_app, "/handle-pnr", CallSid="CAkeyed", Digits=pnr) == (200, offered)
+
+
+def test_caller_without_bookings_hears_the_plain_welcome(ivr_app):
+    status, welcome = post(ivr_app, "/voice", CallSid="CAnone", From="+919800000001")
+    assert (status, welcome) == (200, main.static_responses.get("welcome").decode())
+    status, body = post(ivr_app, "/handle-menu", CallSid="CAnone", Digits="3")
+    assert body == main.static_responses.get("invalid_input").decode()
@@ -0,0 +1,89 @@
+import asyncio
+import json
+import os
+import time
+
+import pytest
+from conftest import FORM, asgi_post
+
+import main
+from call_journal import CallJournal, JournalMiddleware
+from fastpath import FastPathApp
+
+_CALL = [
+    ("/voice",                b"CallSid=SID&From=%2B919800000001"),
+    ("/handle-menu",          b"CallSid=SID&Digits=1"),
+    ("/handle-pnr",           b"CallSid=SID&Digits=2154673890"),
+    ("/handle-pnr-options",   b"CallSid=SID&Digits=2"),
+    ("/handle-menu",          b"CallSid=SID&Digits=2"),
+    ("/handle-train",         b"CallSid=SID&Digits=12952"),
+    ("/handle-train-options", b"CallSid=SID&Digits=9"),
+]
+
+
+@pytest.mark.parametrize("capacity, stall", [(65_536, 0.0), (64, 0.2)])
+def test_every_record_is_on_disk_or_counted_as_dropped(tmp_path, monkeypatch, capacity, stall):
+    """With a healthy disk, and with one that stalls on every write until records drop."""
+    calls, concurrency = 40, 10
+    journal = CallJournal(str(tmp_path), capacity=capacity, segment_bytes=2**14)
+    if stall:
+        write = journal._write
+        monkeypatch.setattr(journal, "_write",
+                            lambda records: (time.sleep(stall), write(records)))
+    monkeypatch.setattr(main.session_manager.backend, "on_close", journal.session_closed)
+    app = FastPathApp(main.app, wrap=lambda inner: JournalMiddleware(inner, journal))
+
+    async def caller(offset: int) -> None:
+        for i in range(offset, calls, concurrency):
+            sid = f"CAjournal{capacity}x{i}".encode()
+            for path, body in _CALL:
+                await asgi_post(app, path, body.replace(b"SID", sid), FORM)
+                await asyncio.sleep(0)
+
+    async def run() -> None:
+        drainer = asyncio.ensure_future(journal.run())
+        await asyncio.gather(*(caller(i) for i in range(concurrency)))
+        drainer.cancel()
+
+    asyncio.run(run())
+    journal.close()
+    stats = journal.stats()
+    on_disk = []
+    for name in sorted(os.listdir(tmp_path)):
+        with open(tmp_path / name, encoding="utf-8") as fh:
+            on_disk += [json.loads(line) for line in fh]
+
+    assert len(on_disk) == stats["written"] == sum(stats["records"].values())
+    assert stats["records"]["event"] + stats["dropped"]["event"] == calls * len(_CALL)
+    assert stats["records"]["cdr"] + stats["dropped"]["cdr"] == calls
+    assert (sum(stats["dropped"].values()) > 0) == bool(stall)
+
+
+def test_call_sent_back_to_voice_has_one_cdr(tmp_path, monkeypatch, ivr_app):
+    """Invalid input redirects to /voice; the call keeps its session and ends once."""
+    journal = CallJournal(str(tmp_path))
+    monkeypatch.setattr(main.session_manager.backend, "on_close", journal.session_closed)
+    steps = [
+        ("/voice",       b"CallSid=CAagain&From=%2B919800000001"),
+        ("/handle-menu", b"CallSid=CAagain&Digits=1"),
+        ("/handle-pnr",  b"CallSid=CAagain&Digits=123"),
+        ("/voice",       b"CallSid=CAagain&From=%2B919800000001"),
+        ("/handle-menu", b"CallSid=CAagain&Digits=9"),
+    ]
+
+    async def run() -> None:
+        for i, (path, body) in enumerate(steps):
+            if i == 3:
+                await asyncio.sleep(0.05)   # the CDR's duration spans the redirect
+            await asgi_post(ivr_app, path, body, FORM)
+
+    asyncio.run(run())
+    journal.close()
+    cdrs = []
+    for name in os.listdir(tmp_path):
+        with open(tmp_path / name, encoding="utf-8") as fh:
+            cdrs += [r for r in map(json.loads, fh) if r["type"] == "cdr"]
+
+    assert [cdr["call"] for cdr in cdrs] == ["CAagain"]
+    assert cdrs[0]["reason"] == "ended" and cdrs[0]["flow"] == "pnr"
+    assert cdrs[0]["duration"] >= 0.04 and cdrs[0]["last_digit"] == "9"
@@ -0,0 +1,65 @@
+import asyncio
+import json
+import random
+import time
+
+import data_store
+from change_feed import ChangeFeed
+from data_backend import DataService, InMemoryBackend
+
+
+def _sequence(record: dict) -> int:
+    return int(record["status"].rsplit(" ", 1)[1])
+
+
+def test_reads_during_a_10k_per_second_update_stream(tmp_path, isolated_store):
+    """Readers never see a record older than the store held when they asked,
+    and once the log is applied every PNR serves its last update."""
+    template = next(iter(data_store._PNR_DB.values()))
+    pnrs = [f"{8_100_000_000 + i:010d}" for i in range(500)]
+    for pnr in pnrs:
+        data_store.put_pnr({**template, "pnr": pnr, "status": "RAC 0"})
+    log = tmp_path / "updates.jsonl"
+    log.touch()
+
+    async def run():
+        service, feed, rng = DataService(InMemoryBackend()), ChangeFeed(), random.Random(5)
+        written, reads, stale = {}, 0, 0
+        deadline = time.perf_counter() + 0.5
+
+        async def reader():
+            nonlocal reads, stale
+            while time.perf_counter() < deadline:
+                pnr = rng.choice(pnrs)
+                floor = _sequence(data_store._fetch_pnr(pnr))
+                stale += _sequence(await service.get_pnr_status(pnr)) < floor
+                reads += 1
+                await asyncio.sleep(0)
+
+        async def writer():
+            sequence, begun = 0, time.perf_counter()
+            with open(log, "a", encoding="utf-8") as fh:
+                while time.perf_counter() < deadline:
+                    lines = []
+                    for _ in range(int((time.perf_counter() - begun) * 10_000) - sequence):
+                        sequence += 1
+                        pnr = rng.choice(pnrs)
+                        written[pnr] = sequence
+                        lines.append(json.dumps({"pnr": pnr, "status": f"RAC {sequence}"}) + "\n")
+                    fh.write("".join(lines))
+                    fh.flush()
+                    await asyncio.sleep(0.01)
+            return sequence
+
+        tailer = asyncio.ensure_future(feed.tail(str(log), interval=0.02))
+        total, *_ = await asyncio.gather(writer(), *(reader() for _ in range(20)))
+        while feed.applied < total:
+            await asyncio.sleep(0.02)
+        tailer.cancel()
+        served = {pnr: _sequence(await service.get_pnr_status(pnr)) for pnr in written}
+        return total, reads, stale, served, written
+
+    total, reads, stale, served, written = asyncio.run(asyncio.wait_for(run(), 30))
+    assert total >= 2_000 and reads > 0
+    assert stale == 0
+    assert served == written
@@ -0,0 +1,72 @@
+import asyncio
+import json
+import socket
+
+from cluster import merge_broadcast, serve_router
+from http_pool import HttpConnectionPool, read_headers
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def _worker(status: int, seen: list) -> asyncio.Server:
+    """A stand-in app worker: records each request path, answers `status`."""
+    async def on_connection(reader, writer):
+        while request_line := await reader.readline():
+            headers = await read_headers(reader)
+            await reader.readexactly(int(headers.get("content-length", "0")))
+            seen.append(request_line.split()[1].decode())
+            body = json.dumps({"applied": 1}).encode()
+            writer.write(f"HTTP/1.1 {status} X\r\ncontent-length: {len(body)}\r\n\r\n".encode()
+                         + body)
+            await writer.drain()
+        writer.close()
+
+    return await asyncio.start_server(on_connection, "127.0.0.1", 0)
+
+
+def _through_router(statuses: list[int], requests: list[tuple[str, bytes]]):
+    """Send `requests` through a router over workers answering `statuses`."""
+    async def run():
+        seen = [[] for _ in statuses]
+        workers = [await _worker(status, paths) for status, paths in zip(statuses, seen)]
+        ports = [worker.sockets[0].getsockname()[1] for worker in workers]
+        port = _free_port()
+        router = asyncio.ensure_future(serve_router("127.0.0.1", port, ports))
+        await asyncio.sleep(0.05)
+        client = HttpConnectionPool("127.0.0.1", port)
+        try:
+            replies = [await client.request("POST", path, body) for path, body in requests]
+        finally:
+            await client.close()
+            router.cancel()
+            for worker in workers:
+                worker.close()
+        return replies, seen
+
+    return asyncio.run(run())
+
+
+def test_pnr_updates_reach_every_worker_and_webhooks_one():
+    replies, seen = _through_router([200, 200, 200], [
+        ("/admin/pnr-updates", b'[{"pnr": "4521987630", "status": "CNF"}]'),
+        ("/handle-menu", b"CallSid=CAone&Digits=1"),
+    ])
+    assert [status for status, _, _ in replies] == [200, 200]
+    assert json.loads(replies[0][2]) == {"applied": 1}
+    assert all(paths[0] == "/admin/pnr-updates" for paths in seen)
+    assert sum(paths.count("/handle-menu") for paths in seen) == 1
+
+
+def test_pnr_updates_not_applied_everywhere_are_an_error():
+    replies, _ = _through_router([200, 500], [("/admin/pnr-updates", b"[]")])
+    status, _, body = replies[0]
+    assert status == 502 and sorted(json.loads(body)["workers"].values()) == [200, 500]
+
+
+def test_workers_answering_alike_give_their_answer():
+    rejected = (422, {}, b'{"detail": "batch rejected"}')
+    assert merge_broadcast({9100: rejected, 9101: rejected}) == rejected
@@ -0,0 +1,32 @@
+import pytest
+from conftest import post
+
+import data_store
+import main
+
+PNR, TYPO = "2154673890", "2154673809"
+STATUS = "P.N.R. number " + " ".join(PNR) + ". Train"
+
+
+def test_one_slip_is_corrected():
+    assert data_store.correct_pnr(TYPO) == PNR
+    assert data_store.correct_pnr(" " + TYPO + " ") == PNR
+
+
+def test_no_match_is_not_corrected():
+    assert data_store.correct_pnr("0000000000") is None
+
+
+@pytest.mark.parametrize("steps", [
+    [("/handle-pnr-suggestion", "1")],
+    [("/handle-pnr-suggestion", "2"), ("/handle-pnr", PNR)],
+], ids=["take the suggestion", "re-key the PNR"])
+def test_mistyped_pnr_reaches_status(ivr_app, steps):
+    try:
+        status, body = post(ivr_app, "/handle-pnr", CallSid="CAfix", Digits=TYPO)
+        assert status == 200 and " ".join(PNR) in body and STATUS not in body
+        for path, digits in steps:
+            status, body = post(ivr_app, path, CallSid="CAfix", Digits=digits)
+        assert status == 200 and STATUS in body
+    finally:
+        main.session_manager.end_session("CAfix")
@@ -0,0 +1,59 @@
+import asyncio
+
+import pytest
+
+import data_store
+from data_backend import BackendUnavailable, DataService, HttpBackend, serve_standin
+
+
+def _against_standin(test, latency: float = 0.0, timeout: float = 2.0):
+    """Run `test(service, standin)` with a DataService over a local stand-in."""
+    async def run():
+        standin = await serve_standin(latency=latency)
+        service = DataService(HttpBackend("127.0.0.1", standin.port), timeout=timeout)
+        try:
+            return await test(service, standin)
+        finally:
+            await service.close()
+            await standin.close()
+
+    return asyncio.run(run())
+
+
+def test_concurrent_lookups_of_one_train_share_one_request():
+    data_store.invalidate_train("12952")
+
+    async def test(service, standin):
+        results = await asyncio.gather(*(service.get_train_info("12952") for _ in range(200)))
+        assert standin.requests == service.backend_requests == 1
+        assert service.coalesced == 199
+        assert all(result == data_store._TRAIN_STORE["12952"] for result in results)
+
+    _against_standin(test, latency=0.05)
+
+
+def test_slow_backend_is_unavailable_and_the_pool_recovers():
+    data_store.invalidate_pnr("2154673890")
+    data_store.invalidate_pnr("4521987630")
+
+    async def test(service, standin):
+        with pytest.raises(BackendUnavailable):
+            await service.get_pnr_status("2154673890")
+        with pytest.raises(BackendUnavailable):
+            await service.correct("pnr", "2154673809")
+        service.timeout = 2.0
+        # The timed-out response must not be read as the answer to this one.
+        assert await service.get_pnr_status("4521987630") == \
+            data_store._PNR_STORE["4521987630"]
+        assert await service.correct("pnr", "2154673809") == "2154673890"
+
+    _against_standin(test, latency=0.2, timeout=0.05)
+
+
+def test_unknown_numbers_are_none_not_errors():
+    async def test(service, standin):
+        assert await service.get_train_info("99999") is None
+        assert await service.correct("train", "00000") is None
+        assert await service.get_caller_pnrs("+910000000000") == []
+
+    _against_standin(test)
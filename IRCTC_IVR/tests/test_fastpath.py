@@ -0,0 +1,39 @@
+import asyncio
+
+from conftest import FORM, asgi_post
+
+import main
+
+# Run in order: the fast path must leave the session where FastAPI would.
+CASES = [
+    ("/voice",                b"CallSid=CAfp&From=%2B919800000001", FORM),
+    ("/handle-menu",          b"CallSid=CAfp&Digits=1", FORM),
+    ("/handle-pnr",           b"CallSid=CAfp&Digits=2154673890", FORM),
+    ("/handle-pnr",           b"CallSid=CAfp&Digits=0000000000", FORM),
+    ("/handle-pnr",           b"CallSid=CAfp&Digits=12", FORM),
+    ("/handle-pnr",           b"CallSid=CAfp&Digits=+2154673890+", FORM),
+    ("/handle-pnr-options",   b"CallSid=CAfp&Digits=2", FORM),
+    ("/handle-menu",          b"CallSid=CAfp&Digits=2", FORM),
+    ("/handle-train",         b"CallSid=CAfp&Digits=12952", FORM),
+    ("/handle-train",         b"CallSid=CAfp&Digits=1295", FORM),
+    ("/handle-train-options", b"CallSid=CAfp&Digits=7", FORM),
+    ("/handle-menu",          b"CallSid=CAfp&Digits=", FORM),
+    ("/handle-menu",          b"CallSid=&Digits=1", FORM),
+    ("/handle-menu",          b"Digits=5&Digits=9&CallSid=CAfp", FORM),
+    ("/handle-menu",          b"", FORM),
+    ("/handle-menu",          b"CallSid=CAfp&Digits=1", FORM + b"; charset=UTF-8"),
+    ("/handle-menu",          b'{"Digits": "1"}', b"application/json"),
+    ("/nowhere",              b"CallSid=CAfp", FORM),
+    ("/handle-train-options", b"CallSid=CAfp&Digits=9", FORM),
+]
+
+
+def test_fast_path_answers_like_fastapi():
+    async def run():
+        for path, body, content_type in CASES:
+            slow = await asgi_post(main.app, path, body, content_type)
+            fast = await asgi_post(main.fast_app, path, body, content_type)
+            assert slow == fast, (path, body)
+
+    asyncio.run(run())
+
@@ -0,0 +1,60 @@
+import random
+
+import pytest
+
+from data_store import RailwayIndex, station_key
+
+
+def _timetable(trains: int = 400, stations: int = 60, seed: int = 7) -> tuple[dict, dict]:
+    rng = random.Random(seed)
+    names = [f"Station {i} Junction" for i in range(stations)]
+    train_db = {}
+    for i in range(trains):
+        route = rng.sample(names, rng.randint(2, 20))
+        number = f"{10000 + i:05d}"
+        train_db[number] = {
+            "number": number, "name": f"Express {number}",
+            "source": route[0], "destination": route[-1],
+            "stops": [{"station": s, "arrival": "", "departure": ""} for s in route[1:-1]],
+        }
+    pnr_db = {
+        f"{i:010d}": {"pnr": f"{i:010d}", "train_number": rng.choice(list(train_db))}
+        for i in range(trains * 10)
+    }
+    return train_db, pnr_db
+
+
+def _route(record: dict) -> list:
+    stops = [s["station"] for s in record["stops"]]
+    return [station_key(s) for s in [record["source"], *stops, record["destination"]]]
+
+
+TRAIN_DB, PNR_DB = _timetable()
+INDEX = RailwayIndex(TRAIN_DB, PNR_DB)
+PAIRS = [(f"Station {a} Junction", f"Station {b} Junction")
+         for a, b in random.Random(1).sample([(a, b) for a in range(60) for b in range(60)], 40)]
+
+
+@pytest.mark.parametrize("origin, destination", PAIRS)
+def test_trains_between_matches_a_full_scan(origin, destination):
+    start, end = station_key(origin), station_key(destination)
+    expected = [
+        number for number, record in TRAIN_DB.items()
+        if start in (route := _route(record)) and end in route[route.index(start) + 1:]
+    ]
+    assert sorted(r["number"] for r in INDEX.trains_between(origin, destination)) == expected
+
+
+def test_trains_halting_at_and_from_match_a_full_scan():
+    for station in ("Station 0 Junction", "Station 17 Junction"):
+        key = station_key(station)
+        halting = sorted(n for n, r in TRAIN_DB.items() if key in _route(r)[1:-1])
+        starting = sorted(n for n, r in TRAIN_DB.items() if _route(r)[0] == key)
+        assert sorted(r["number"] for r in INDEX.trains_halting_at(station)) == halting
+        assert sorted(r["number"] for r in INDEX.trains_from(station)) == starting
+
+
+def test_pnrs_for_train_matches_a_full_scan():
+    for number in list(TRAIN_DB)[:20]:
+        expected = sorted(p for p, r in PNR_DB.items() if r["train_number"] == number)
+        assert sorted(r["pnr"] for r in INDEX.pnrs_for_train(number)) == expected
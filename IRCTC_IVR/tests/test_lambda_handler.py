@@ -0,0 +1,73 @@
+import asyncio
+from urllib.parse import urlencode
+
+import pytest
+from conftest import asgi_post
+
+import lambda_handler
+import main
+from resp import RespClient
+from session_manager import RespSessionBackend
+
+# One call through every kind of route the serverless handler serves.
+FLOW = [
+    ("/voice",                   {"CallSid": "CAcs", "From": "+919800000001"}),
+    ("/handle-menu",             {"CallSid": "CAcs", "Digits": "1"}),
+    ("/handle-pnr",              {"CallSid": "CAcs", "Digits": "2154673890"}),
+    ("/handle-pnr",              {"CallSid": "CAcs", "Digits": "0000000000"}),
+    ("/handle-pnr",              {"CallSid": "CAcs", "Digits": "12"}),
+    ("/handle-pnr",              {"CallSid": "CAcs", "Digits": "2154673809"}),
+    ("/handle-pnr-suggestion",   {"CallSid": "CAcs", "Digits": "7"}),
+    ("/handle-pnr-suggestion",   {"CallSid": "CAcs", "Digits": "1"}),
+    ("/handle-pnr-options",      {"CallSid": "CAcs", "Digits": "7"}),
+    ("/handle-pnr-options",      {"CallSid": "CAcs", "Digits": "2"}),
+    ("/handle-menu",             {"CallSid": "CAcs", "Digits": "3"}),
+    ("/handle-menu",             {"CallSid": "CAcs"}),
+    ("/handle-menu",             {"CallSid": "CAcs", "Digits": " 2 "}),
+    ("/handle-train",            {"CallSid": "CAcs", "Digits": "12216"}),
+    ("/handle-train-stops",      {"CallSid": "CAcs", "Digits": "1"}),
+    ("/handle-train-stops",      {"CallSid": "CAcs", "Digits": "1"}),
+    ("/handle-train-stops",      {"CallSid": "CAcs", "Digits": "3"}),
+    ("/handle-train",            {"CallSid": "CAcs", "Digits": "99999"}),
+    ("/handle-train",            {"CallSid": "CAcs", "Digits": "1295"}),
+    ("/handle-train",            {"CallSid": "CAcs", "Digits": "12925"}),
+    ("/handle-train-suggestion", {"CallSid": "CAcs", "Digits": "1"}),
+    ("/handle-train-suggestion", {"CallSid": "CAcs", "Digits": "1"}),
+    ("/handle-train",            {"CallSid": "CAcs", "Digits": "12592"}),
+    ("/handle-train-suggestion", {"CallSid": "CAcs", "Digits": "2"}),
+    ("/handle-train-options",    {"CallSid": "CAcs", "Digits": "1"}),
+    ("/ivr/nowhere",             {"CallSid": "CAcs", "Digits": "1"}),
+    ("/nowhere",                 {"CallSid": "CAcs"}),
+    ("/handle-train-options",    {"Digits": "9"}),
+    ("/handle-menu",             {"CallSid": "CAcs", "Digits": "9"}),
+]
+
+
+@pytest.fixture(scope="module", autouse=True)
+def tables(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("lambda") / "ivr_tables.marshal")
+    lambda_handler.build_tables(path)
+    return lambda_handler.load_tables(path)
+
+
+def test_handler_answers_like_main():
+    async def run() -> list[tuple]:
+        return [await asgi_post(main.app, path, urlencode(form).encode())
+                for path, form in FLOW]
+
+    # The handler runs its own event loop, so the two are replayed in turn.
+    for (path, form), (status, headers, body) in zip(FLOW, asyncio.run(run())):
+        reply = lambda_handler.handler(lambda_handler.invocation_event(path, form))
+        assert reply["statusCode"] == status, (path, form)
+        assert reply["headers"]["content-type"].encode() == dict(headers)[b"content-type"]
+        assert reply["body"].encode("utf-8") == body, (path, form)
+
+
+def test_unreachable_session_store_answers_unavailable(monkeypatch):
+    backend = RespSessionBackend(RespClient("127.0.0.1", 1, timeout=0.2))
+    monkeypatch.setattr(lambda_handler.session_manager, "backend", backend)
+    reply = lambda_handler.handler(lambda_handler.invocation_event(
+        "/handle-menu", {"CallSid": "CAdown", "Digits": "1"}
+    ))
+    assert reply["statusCode"] == 200
+    assert reply["body"].encode("utf-8") == main.static_responses.get("unavailable")
@@ -0,0 +1,84 @@
+import pytest
+from conftest import post
+
+import ivr_logic
+import main
+from menu_engine import MenuError, validate_menu
+
+
+def _menu() -> dict:
+    """A plain-dict copy of MENU_STRUCTURE to break."""
+    return {
+        name: {key: dict(value) if isinstance(value, dict) else value
+               for key, value in state.items()}
+        for name, state in ivr_logic.MENU_STRUCTURE.items()
+    }
+
+
+def test_shipped_menu_is_valid():
+    validate_menu(ivr_logic.MENU_STRUCTURE)
+
+
+def _unreachable(menu):
+    menu["orphan"] = {"prompt": "Nobody gets here.", "num_digits": 1, "options": {"1": "main"}}
+
+
+def _dangling_option(menu):
+    menu["main"]["options"]["4"] = "fare_enquiry"
+
+
+def _dangling_next(menu):
+    menu["pnr_gather"]["next"] = "pnr_extras"
+
+
+def _dangling_suggest(menu):
+    menu["train_gather"]["suggest"] = "train_guess"
+
+
+def _duplicate_action(menu):
+    menu["train_options"]["action"] = menu["pnr_options"]["action"]
+
+
+@pytest.mark.parametrize("breakage, problem", [
+    (_unreachable, "orphan: unreachable from 'main'"),
+    (_dangling_option, "main: option '4' leads to unknown state 'fare_enquiry'"),
+    (_dangling_next, "pnr_gather: next leads to unknown state 'pnr_extras'"),
+    (_dangling_suggest, "train_gather: suggest leads to unknown state 'train_guess'"),
+    (_duplicate_action, "train_options: action /handle-pnr-options already used by pnr_options"),
+])
+def test_broken_menu_raises_menu_error(breakage, problem):
+    menu = _menu()
+    breakage(menu)
+    with pytest.raises(MenuError) as raised:
+        validate_menu(menu)
+    assert problem in str(raised.value)
+
+
+@pytest.fixture
+def help_menu():
+    """A new `help` state, offered as key 4 after a train result."""
+    menu = ivr_logic.MENU_STRUCTURE
+    menu["help"] = {
+        "prompt": "For the main menu, press 1. To exit, press 9.",
+        "options": {"1": "main", "9": "goodbye"},
+        "num_digits": 1,
+    }
+    menu["train_options"]["options"]["4"] = "help"
+    yield menu["help"]
+    del menu["train_options"]["options"]["4"]
+    del menu["help"]
+
+
+def test_new_menu_state_is_served_without_a_handler(ivr_app, help_menu):
+    try:
+        status, body = post(ivr_app, "/handle-train-options", CallSid="CAhelp", Digits="4")
+        assert status == 200 and help_menu["prompt"] in body and 'action="/ivr/help"' in body
+        status, body = post(ivr_app, "/ivr/help", CallSid="CAhelp", Digits="1")
+        assert status == 200 and body == ivr_logic.build_menu_twiml("main")
+
+        # Edits to the menu are picked up by the next keypress.
+        help_menu["prompt"] = "For the main menu, press 1. To exit, press 9. Thank you."
+        status, body = post(ivr_app, "/handle-train-options", CallSid="CAhelp", Digits="4")
+        assert help_menu["prompt"] in body
+    finally:
+        main.session_manager.end_session("CAhelp")
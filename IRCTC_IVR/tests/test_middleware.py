@@ -0,0 +1,11 @@
+import main
+
+
+def test_fast_path_wraps_endpoints_like_the_fastapi_app():
+    fast, layer = [], main.fast_app._dispatch
+    while hasattr(layer, "app"):
+        fast.append(type(layer))
+        layer = layer.app
+    # user_middleware lists the FastAPI app's middleware outermost first
+    assert fast == [middleware.cls for middleware in main.app.user_middleware]
+    assert fast == [middleware for middleware, _ in reversed(main._MIDDLEWARE)]
@@ -0,0 +1,117 @@
+import asyncio
+import os
+
+import pytest
+from conftest import post
+
+import ivr_logic
+import main
+import nlu
+
+# Utterances not in nlu.INTENT_EXAMPLES:
+# (text, state, pnr, train number)
+HELD_OUT = [
+    ("I want to check my PNR", "pnr_gather", None, None),
+    ("P N R status please", "pnr_gather", None, None),
+    ("is my ticket confirmed or still waiting", "pnr_gather", None, None),
+    ("what is my berth", "pnr_gather", None, None),
+    ("my PNR is four five two one nine eight seven six three zero", "pnr_gather",
+     "4521987630", None),
+    ("2154673890", "pnr_gather", "2154673890", None),
+    ("Rajdhani timing", "train_gather", None, None),
+    ("when does the Shatabdi leave", "train_gather", None, None),
+    ("train schedule for one two nine five two", "train_gather", None, "12952"),
+    ("twelve nine fifty two", "train_gather", None, "12952"),
+    ("arrival time of the Duronto", "train_gather", None, None),
+    ("double two four three nine", "train_gather", None, "22439"),
+    ("next stops", "more", None, None),
+    ("tell me the remaining stops", "more", None, None),
+    ("take me back to the main menu", "main", None, None),
+    ("start over", "main", None, None),
+    ("no thank you, bye", "goodbye", None, None),
+    ("that's all", "goodbye", None, None),
+    ("what's the weather like", None, None, None),
+    ("hello", None, None, None),
+]
+MODEL = nlu.IntentModel()
+
+
+@pytest.mark.parametrize("text, state, pnr, train_number", HELD_OUT)
+def test_held_out_utterances(text, state, pnr, train_number):
+    intent = MODEL.classify(text)
+    assert (intent.state, intent.pnr, intent.train_number) == (state, pnr, train_number)
+
+
+def test_failed_batch_leaves_other_batches_and_the_pool_alone():
+    async def run():
+        service = nlu.IntentService(workers=1, max_batch=1)
+        service.start()
+        pool = service._executor
+        try:
+            # None makes classify_batch raise inside the worker process
+            intents = await asyncio.gather(
+                service.classify(None), service.classify("check my PNR status"),
+                service.classify("train timings"),
+            )
+            return intents, service, service._executor is pool
+        finally:
+            service.close()
+
+    (failed, pnr, train), service, same_pool = asyncio.run(run())
+    assert failed == nlu.UNKNOWN and service.errors == 1 and same_pool
+    assert pnr.state == "pnr_gather" and train.state == "train_gather"
+
+
+def test_pool_that_lost_a_worker_is_replaced():
+    async def run():
+        service = nlu.IntentService(workers=1)
+        service.start()
+        broken = service._executor
+        try:
+            await asyncio.wrap_future(broken.submit(os._exit, 1))
+        except Exception:
+            pass
+        try:
+            first = await service.classify("check my PNR status")
+            second = await service.classify("check my PNR status")
+            return first, second, broken is not service._executor
+        finally:
+            service.close()
+
+    first, second, replaced = asyncio.run(run())
+    assert first == nlu.UNKNOWN and replaced
+    assert second.state == "pnr_gather"
+
+
+def test_classify_needs_an_explicitly_started_pool():
+    service = nlu.IntentService(workers=1)
+    with pytest.raises(RuntimeError):
+        asyncio.run(service.classify("check my PNR status"))
+    assert service._executor is None
+
+
+@pytest.fixture
+def speech_input(monkeypatch):
+    """Speech input on, classified on the loop's thread pool."""
+    monkeypatch.setattr(main, "intent_service", nlu.IntentService(workers=0))
+    ivr_logic.set_speech_input(True)
+    yield main.intent_service
+    ivr_logic.set_speech_input(False)
+
+
+def _spoken_menu_choice(app):
+    return post(app, "/handle-menu", CallSid="CAspeech", SpeechResult="check my PNR status")
+
+
+def test_speech_is_ignored_when_speech_input_is_off(ivr_app, monkeypatch):
+    monkeypatch.setattr(main, "intent_service", nlu.IntentService(workers=1))
+    _, body = _spoken_menu_choice(ivr_app)
+    assert body == main.static_responses.get("invalid_input").decode()
+    assert main.intent_service.requests == 0
+
+
+def test_speech_is_classified_when_speech_input_is_on(ivr_app, speech_input):
+    _, body = _spoken_menu_choice(ivr_app)
+    main.session_manager.end_session("CAspeech")
+    assert speech_input.requests == 1
+    assert "P.N.R." in body and body != main.static_responses.get("invalid_input").decode()
@@ -0,0 +1,33 @@
+import re
+
+import ivr_logic
+import prompt_audio
+from data_store import _PNR_DB
+
+_PLAY_URL = re.compile(rb"<Play>(.*?)</Play>")
+
+
+def _responses() -> dict[str, bytes]:
+    responses = {name: ivr_logic.static_responses.get(name)
+                 for name in ivr_logic.static_responses._builders}
+    for name in ivr_logic.MENU_STRUCTURE:
+        responses[f"menu:{name}"] = ivr_logic.build_menu_twiml(name).encode()
+    record = next(iter(_PNR_DB.values()))
+    responses["pnr result"] = ivr_logic.render_pnr_result(record["pnr"], record)
+    responses["pnr not found"] = ivr_logic.render_pnr_result("0000000000", None)
+    return responses
+
+
+def test_every_play_url_is_served_and_uninstalling_restores_say(tmp_path):
+    before = _responses()
+    prompt_audio.build_prompts(str(tmp_path), prompt_audio.StubEngine())
+    library = prompt_audio.PromptLibrary(str(tmp_path)).install()
+    try:
+        after = _responses()
+    finally:
+        ivr_logic.set_prompt_audio(None)
+
+    urls = [url.decode() for body in after.values() for url in _PLAY_URL.findall(body)]
+    assert urls
+    assert all(library.get(url.rsplit("/", 1)[1]) for url in urls)
+    assert _responses() == before
@@ -0,0 +1,30 @@
+import pytest
+
+import data_store
+import ivr_logic
+from data_store import _PNR_DB, _TRAIN_DB
+
+
+@pytest.mark.parametrize("pnr", list(_PNR_DB))
+def test_cached_pnr_result_follows_record_changes(pnr, isolated_store):
+    cache, original = ivr_logic.RenderedResultCache(), _PNR_DB[pnr]
+    # original, updated in the store (new version), changed upstream (same version)
+    for record, local in ((original, False), ({**original, "status": "CNF — S4 / 12"}, True),
+                          ({**original, "coach": "B9"}, False)):
+        if local:
+            data_store.put_pnr(record)
+        for _ in range(2):      # miss, then hit
+            got = cache.pnr(pnr, record, data_store.pnr_version(pnr))
+            assert got == ivr_logic.render_pnr_result(pnr, record)
+
+
+@pytest.mark.parametrize("number", list(_TRAIN_DB))
+def test_cached_train_pages_follow_record_changes(number, isolated_store):
+    cache, original = ivr_logic.RenderedResultCache(), _TRAIN_DB[number]
+    for record in (original, {**original, "days": "Daily"}):
+        if record is not original:
+            data_store.put_train(record)
+        for page in range(ivr_logic.train_page_count(number, record)):
+            for _ in range(2):
+                got = cache.train(number, record, data_store.train_version(number), page=page)
+                assert got == ivr_logic.render_train_result(number, record, page=page), page
@@ -0,0 +1,133 @@
+import socket
+
+import pytest
+from conftest import post
+
+import main
+from metrics import TimedSessionBackend, metrics
+from resp import FakeRespServer, RespClient
+from session_manager import (
+    InMemorySessionBackend, RespSessionBackend, SessionManager, SessionUnavailable,
+)
+
+
+def _closed_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture
+def resp_store(monkeypatch):
+    server = FakeRespServer().start()
+    backend = RespSessionBackend(RespClient("127.0.0.1", server.port))
+    monkeypatch.setattr(main.session_manager, "backend", TimedSessionBackend(backend, metrics))
+    yield backend
+    backend.client.close()
+    server.stop()
+
+
+@pytest.fixture
+def unreachable_store(monkeypatch):
+    backend = RespSessionBackend(RespClient("127.0.0.1", _closed_port(), timeout=0.2))
+    monkeypatch.setattr(main.session_manager, "backend", TimedSessionBackend(backend, metrics))
+    return backend
+
+
+# (path, form, round trips): a webhook that changes the session writes it
+# once; menu moves that leave the session as it is don't touch the store.
+_CALL_FLOW = [
+    ("/voice",                {"CallSid": "CAresp"}, 1),
+    ("/handle-menu",          {"CallSid": "CAresp", "Digits": "1"}, 1),
+    ("/handle-pnr",           {"CallSid": "CAresp", "Digits": "2154673890"}, 1),
+    ("/handle-pnr-options",   {"CallSid": "CAresp", "Digits": "7"}, 0),
+    ("/handle-pnr-options",   {"CallSid": "CAresp", "Digits": "2"}, 0),
+    ("/handle-menu",          {"CallSid": "CAresp", "Digits": "2"}, 1),
+    ("/handle-train",         {"CallSid": "CAresp", "Digits": "12952"}, 1),
+    ("/handle-train-options", {"CallSid": "CAresp", "Digits": "9"}, 1),
+]
+
+
+def test_call_flow_over_resp_costs_one_round_trip_per_webhook(ivr_app, resp_store):
+    for path, form, round_trips in _CALL_FLOW:
+        before = resp_store.client.round_trips
+        status, body = post(ivr_app, path, **form)
+        assert status == 200 and "<Response>" in body, (path, form)
+        assert resp_store.client.round_trips - before == round_trips, (path, form)
+
+    session = resp_store.get("CAresp")
+    assert session["ended"] and session["last_train"] == "12952"
+    assert session["last_pnr"] == "2154673890" and session["last_menu"] == "main"
+
+
+@pytest.mark.parametrize("path, form", [
+    ("/voice", {"CallSid": "CAdown", "From": "+919800000001"}),
+    ("/handle-menu", {"CallSid": "CAdown", "Digits": "1"}),
+    ("/handle-pnr", {"CallSid": "CAdown", "Digits": "2154673890"}),
+    ("/handle-train-stops", {"CallSid": "CAdown", "Digits": "1"}),
+])
+def test_unreachable_store_answers_unavailable(ivr_app, unreachable_store, path, form):
+    assert post(ivr_app, path, **form) == (200, main.static_responses.get("unavailable").decode())
+
+
+def test_unreachable_store_raises_session_unavailable():
+    sessions = SessionManager(RespSessionBackend(RespClient("127.0.0.1", _closed_port(), timeout=0.2)))
+    with pytest.raises(SessionUnavailable):
+        sessions.get_session("CAdown")
+
+
+@pytest.fixture(params=["memory", "resp"])
+def backend(request):
+    if request.param == "memory":
+        yield InMemorySessionBackend()
+        return
+    server = FakeRespServer().start()
+    backend = RespSessionBackend(RespClient("127.0.0.1", server.port))
+    yield backend
+    backend.client.close()
+    server.stop()
+
+
+def test_end_closes_each_call_once(backend):
+    closed = []
+    backend.on_close = lambda call_sid, session, reason: closed.append((call_sid, reason))
+    sessions = SessionManager(backend)
+
+    sessions.end_session("CAunknown")
+    assert sessions.get_session("CAunknown") is None
+
+    sessions.create_session("CA1")
+    sessions.end_session("CA1")
+    sessions.end_session("CA1")
+    sessions.update_session("CA2", last_menu="main", ended=True)
+    sessions.update_session("CA2", last_menu="main", ended=True)
+    assert closed == [("CA1", "ended"), ("CA2", "ended")]
+    assert sessions.get_session("CA1")["ended"]
+
+
+def test_create_keeps_a_live_session_and_replaces_an_ended_one(backend):
+    closed = []
+    backend.on_close = lambda call_sid, session, reason: closed.append((call_sid, reason))
+    sessions = SessionManager(backend)
+
+    first = sessions.create_session("CA1", caller="+919800000001")
+    sessions.update_session("CA1", flow="pnr", last_pnr="2154673890")
+    again = sessions.create_session("CA1")
+    assert again["created_at"] == first["created_at"] and again["flow"] == "pnr"
+    assert again["caller"] == "+919800000001" and not again["ended"]
+    assert closed == []
+
+    sessions.end_session("CA1")
+    fresh = sessions.create_session("CA1", caller="+919800000002")
+    assert fresh["flow"] is None and not fresh["ended"]
+    assert sessions.get_session("CA1")["last_pnr"] is None
+    assert closed == [("CA1", "ended")]
+
+
+def test_timed_backend_passes_on_close_through():
+    closed = []
+    timed = TimedSessionBackend(InMemorySessionBackend(), metrics)
+    timed.on_close = lambda call_sid, session, reason: closed.append(call_sid)
+    timed.create("CA1", None)
+    timed.end("CA1")
+    assert closed == ["CA1"] and timed.inner.on_close is timed.on_close
@@ -0,0 +1,21 @@
+import pytest
+
+import speech
+
+
+@pytest.mark.parametrize("name, spoken", [
+    ("KOTA JN", "Kota Junction"),
+    ("Agra Cantt", "Agra Cantonment"),
+    ("Mumbai LTT", "Mumbai L.T.T."),
+    ("Mumbai CSMT.", "Mumbai C.S.M.T."),
+    ("NEW DELHI", "New Delhi"),
+    ("Pune MEMU", "Pune Memu"),
+    ("St. Thomas Mount", "St. Thomas Mount"),
+    ("Platform 1A", "Platform 1A"),
+])
+def test_speak_name(name, spoken):
+    assert speech.speak_name(name) == spoken
+
+
+def test_speak_days():
+    assert speech.speak_days("Mon, Wed, FRI") == "Monday, Wednesday, Friday"
@@ -0,0 +1,45 @@
+import json
+import random
+
+import pytest
+
+import bulk_loader
+from data_store import _PNR_DB, _TRAIN_DB
+
+
+@pytest.fixture(scope="module")
+def stores(tmp_path_factory):
+    """A mapped store built from a JSONL dump, and the dump loaded into dicts."""
+    tmp = tmp_path_factory.mktemp("store")
+    rng = random.Random(11)
+    template = next(iter(_PNR_DB.values()))
+    dump = tmp / "pnrs.jsonl"
+    with open(dump, "w", encoding="utf-8") as fh:
+        for i, number in enumerate(rng.sample(range(10**10), 5000)):
+            record = {**template, "pnr": f"{number:010d}", "berth_number": str(i % 72 + 1),
+                      "train_number": f"{rng.randrange(10000, 10100)}"}
+            fh.write(json.dumps(record) + "\n")
+    bulk_loader.build_store(str(tmp / "ivr.store"), bulk_loader.read_records(str(dump)),
+                            _TRAIN_DB.values())
+    store = bulk_loader.MappedStore(str(tmp / "ivr.store"))
+    yield store, {r["pnr"]: r for r in bulk_loader.read_records(str(dump))}
+    store.close()
+
+
+def test_lookups_match_the_loaded_dicts(stores):
+    store, loaded = stores
+    rng = random.Random(3)
+    assert len(store.pnrs) == len(loaded)
+    assert all(store.pnrs.get(pnr) == record for pnr, record in loaded.items())
+    misses = [f"{rng.randrange(10**10):010d}" for _ in range(1000)]
+    assert all((pnr in store.pnrs) == (pnr in loaded) for pnr in misses)
+    assert all(store.trains.get(number) == record for number, record in _TRAIN_DB.items())
+
+
+def test_pnrs_for_train_match_the_loaded_dicts(stores):
+    store, loaded = stores
+    by_train = {}
+    for record in loaded.values():
+        by_train.setdefault(record["train_number"], []).append(record["pnr"])
+    for train, pnrs in by_train.items():
+        assert list(store.pnrs_for_train(train)) == sorted(pnrs), train
@@ -0,0 +1,66 @@
+"""The compiled renderers against the reference string builders, byte for byte."""
+
+import pytest
+
+import ivr_logic
+from data_store import _PNR_DB, _TRAIN_DB
+
+AWKWARD_PNR = {
+    "train_name": 'Tom & Jerry "Express" <Special>',
+    "train_number": 12345,
+    "status": "RAC — RAC 2",
+    "coach": "<A1>", "berth": "1 & 2",
+    "journey_date": "1 March 2026",
+    "from_station": "A&B", "to_station": 'C"D',
+}
+AWKWARD_TRAIN = {
+    "name": "Fish & Chips <Mail>", "source": 'Q"R', "destination": "S>T",
+    "departure": "1:00 AM", "arrival": "2:00 AM", "days": "Daily",
+    "stops": [{"station": "X & Y", "arrival": "<1>", "departure": '"2"'}],
+}
+PNR_CASES = [*_PNR_DB.items(), ("0000000000", None), ("1234567890", AWKWARD_PNR)]
+TRAIN_CASES = [*_TRAIN_DB.items(), ("00000", None), ("54321", AWKWARD_TRAIN)]
+
+voices = pytest.mark.parametrize("voice", [ivr_logic.TWILIO_VOICE, ivr_logic.AZURE_VOICE])
+
+
+@voices
+@pytest.mark.parametrize("pnr, record", PNR_CASES)
+def test_pnr_result(voice, pnr, record):
+    expected = ivr_logic.build_pnr_result_twiml(pnr, record, voice).encode("utf-8")
+    assert ivr_logic.render_pnr_result(pnr, record, voice) == expected
+
+
+@voices
+@pytest.mark.parametrize("number, record", TRAIN_CASES)
+def test_train_result_every_page(voice, number, record):
+    pages = ivr_logic.train_page_count(number, record) if record else 1
+    for page in range(pages):
+        expected = ivr_logic.build_train_result_twiml(number, record, voice, page)
+        assert ivr_logic.render_train_result(number, record, voice, page) == \
+            expected.encode("utf-8"), page
+
+
+@voices
+@pytest.mark.parametrize(
+    "name", [record["train_name"] for record in _PNR_DB.values()] + [AWKWARD_PNR["train_name"]]
+)
+def test_welcome_offer(voice, name):
+    expected = ivr_logic.build_welcome_twiml(voice, booking_train=name).encode("utf-8")
+    assert ivr_logic.render_welcome_offer(name, voice) == expected
+
+
+@voices
+@pytest.mark.parametrize("pnr, record", [case for case in PNR_CASES if case[1] is not None])
+def test_pnr_suggestion(voice, pnr, record):
+    expected = ivr_logic.build_pnr_suggestion_twiml("1&2<3", pnr, record, voice)
+    assert ivr_logic.render_pnr_suggestion("1&2<3", pnr, record, voice) == \
+        expected.encode("utf-8")
+
+
+@voices
+@pytest.mark.parametrize("number, record", [case for case in TRAIN_CASES if case[1] is not None])
+def test_train_suggestion(voice, number, record):
+    expected = ivr_logic.build_train_suggestion_twiml(number[::-1], number, record, voice)
+    assert ivr_logic.render_train_suggestion(number[::-1], number, record, voice) == \
+        expected.encode("utf-8")